@@ -4,15 +4,34 @@ if (typeof browser === 'undefined') {
 
 function injectCss(selectors) {
   if (!selectors || selectors.length === 0) return;
+  injectCssText(selectors.map(s => `${s} { display: none !important; visibility: hidden !important; height: 0 !important; width: 0 !important; opacity: 0 !important; pointer-events: none !important; }`).join('\n'));
+}
+
+function injectCssText(css) {
+  if (!css) return;
   const style = document.createElement('style');
-  style.textContent = selectors.map(s => `${s} { display: none !important; visibility: hidden !important; height: 0 !important; width: 0 !important; opacity: 0 !important; pointer-events: none !important; }`).join('\n');
+  style.textContent = css;
   (document.head || document.documentElement).appendChild(style);
 }
 
+// Rules precompiled by adblock_rules.py: global + page language + matching hosts
+function selectCompiledCss(compiled, hostname, lang) {
+  const css = compiled.css || {};
+  let rules = css.global || [];
+  if (css.lang && css.lang[lang]) rules = rules.concat(css.lang[lang]);
+  const byHost = css.host || {};
+  for (const host in byHost) {
+    if (hostname === host || hostname.endsWith('.' + host)) rules = rules.concat(byHost[host]);
+  }
+  return rules.map(r => `${r} { ${compiled.declarations} }`).join('\n');
+}
+
 function getPageLanguage() {
   return document.documentElement.lang.split('-')[0].toLowerCase();
 }
 
+const VIDEO_AD_BUTTON_SELECTOR = '.ytp-ad-skip-button, .ytp-ad-overlay-close-button, .ytp-ad-overlay-slot .close-button';
+
 function autoSkipVideoAds() {
   const trySkip = (root = document) => {
     const skipBtn = root.querySelector('.ytp-ad-skip-button');
@@ -193,27 +212,34 @@ async function main() {
   }
 
   let allElementHidingSelectors = [];
+  let compiledCss = '';
   try {
-    let rules;
-    if (window.adblockRules) {
-      rules = window.adblockRules;
+    if (window.adblockCompiled) {
+      // Desktop browser: merged, deduplicated sheets; filters are already lower-cased
+      const compiled = window.adblockCompiled;
+      compiledCss = selectCompiledCss(compiled, location.hostname, getPageLanguage());
+      hosts = compiled.networkFilters || [];
     } else {
       const response = await fetch(browser.runtime.getURL('rules.json'));
-      rules = await response.json();
-    }
-    const globalSelectors = rules.globalElementHidingSelectors || [];
-    const pageLanguage = getPageLanguage();
-    const languageSpecificSelectors = rules.languageSpecificElementHidingSelectors[pageLanguage] || [];
-    allElementHidingSelectors = [...globalSelectors, ...languageSpecificSelectors];
-    const nf = rules.networkFilters || [];
-    if (Array.isArray(nf) && nf.length) {
-      hosts = nf.map(s => String(s).toLowerCase());
+      const rules = await response.json();
+      const globalSelectors = rules.globalElementHidingSelectors || [];
+      const pageLanguage = getPageLanguage();
+      const languageSpecificSelectors = rules.languageSpecificElementHidingSelectors[pageLanguage] || [];
+      allElementHidingSelectors = [...globalSelectors, ...languageSpecificSelectors];
+      const nf = rules.networkFilters || [];
+      if (Array.isArray(nf) && nf.length) {
+        hosts = nf.map(s => String(s).toLowerCase());
+      }
     }
   } catch (e) {
     console.error('Failed to load rules.json:', e);
   }
   
-  injectCss(allElementHidingSelectors);
+  if (compiledCss) {
+    injectCssText(compiledCss);
+  } else {
+    injectCss(allElementHidingSelectors);
+  }
   guardWindowOpen();
   hookInitialPlayerResponse();
   patchFetch();
@@ -585,23 +611,24 @@ function hideGifAds() {
 
 
 
-function hidePopupsAndModals() {
-  const popupSelectors = [
-    '.popup', '.modal', '.ad-popup', '.ad-modal', '.overlay', '.backdrop', '.dialog',
-    '[class*="-popup"]', '[class*="-modal"]', '[class*="-overlay"]', '[class*="-dialog"]',
-    '[id*="-popup"]', '[id*="-modal"]', '[id*="-overlay"]', '[id*="-dialog"]',
-    'div[aria-modal="true"]', 'div[role="dialog"]',
-    'div[data-qa="modal"]', 'div[data-testid="modal"]',
-    'div[data-adblock-popup]'
-  ];
+const POPUP_SELECTOR = [
+  '.popup', '.modal', '.ad-popup', '.ad-modal', '.overlay', '.backdrop', '.dialog',
+  '[class*="-popup"]', '[class*="-modal"]', '[class*="-overlay"]', '[class*="-dialog"]',
+  '[id*="-popup"]', '[id*="-modal"]', '[id*="-overlay"]', '[id*="-dialog"]',
+  'div[aria-modal="true"]', 'div[role="dialog"]',
+  'div[data-qa="modal"]', 'div[data-testid="modal"]',
+  'div[data-adblock-popup]'
+].join(', ');
+
+const hidePopup = (el) => {
+  if (el.offsetWidth > 0 && el.offsetHeight > 0) { // Only hide visible elements
+    hideEl(el);
+  }
+};
 
+function hidePopupsAndModals() {
   const scan = (root = document) => {
-    const allPopupElements = root.querySelectorAll(popupSelectors.join(', '));
-    allPopupElements.forEach(el => {
-      if (el.offsetWidth > 0 && el.offsetHeight > 0) { // Only hide visible elements
-        hideEl(el);
-      }
-    });
+    root.querySelectorAll(POPUP_SELECTOR).forEach(hidePopup);
 
     // Remove overflow: hidden from body if present (common for modals)
     if (root === document) { // Only apply to document body/documentElement
@@ -617,18 +644,21 @@ function hidePopupsAndModals() {
   return scan;
 }
 
+const FLASH_SELECTOR = 'object, embed';
+
+const removeFlashAd = (el) => {
+  const data = (el.getAttribute('data') || el.getAttribute('src') || '').toLowerCase();
+  const type = (el.getAttribute('type') || '').toLowerCase();
+  const bad = data.endsWith('.swf') || type.includes('flash');
+  const mark = /(ad|ads|banner|promo|sponsor)/.test(data);
+  if (bad && mark) {
+    el.remove();
+  }
+};
+
 function hideFlashObjects() {
   const scan = (root = document) => {
-    const objs = root.querySelectorAll('object, embed');
-    objs.forEach(el => {
-      const data = (el.getAttribute('data') || el.getAttribute('src') || '').toLowerCase();
-      const type = (el.getAttribute('type') || '').toLowerCase();
-      const bad = data.endsWith('.swf') || type.includes('flash');
-      const mark = /(ad|ads|banner|promo|sponsor)/.test(data);
-      if (bad && mark) {
-        el.remove();
-      }
-    });
+    root.querySelectorAll(FLASH_SELECTOR).forEach(removeFlashAd);
   };
   return scan;
 }
@@ -766,12 +796,123 @@ function enhancedFindHideAds() {
   return scan;
 }
 
+// Everything the scanners do besides checkEl, matched per element with one combined selector.
+// checkEl itself covers the gif and enhanced scanners: they only select elements for it.
+const ELEMENT_HANDLERS = [
+  [POPUP_SELECTOR, hidePopup],
+  [FLASH_SELECTOR, removeFlashAd],
+  [VIDEO_AD_BUTTON_SELECTOR, (el) => el.click()]
+];
+const ELEMENT_HANDLER_SELECTOR = ELEMENT_HANDLERS.map(([selector]) => selector).join(', ');
+
+// Main-thread time the scheduler may take per frame
+const SCAN_BUDGET_MS = 4;
+
+// Added subtrees are queued instead of scanned inside the MutationObserver callback:
+// roots are deduplicated, nodes under a queued root are dropped, every element is
+// checked once and the queue is drained a few milliseconds per animation frame.
+function scanScheduler() {
+  const queue = [];
+  let head = 0;
+  const queued = new Set();
+  // Elements whose own attributes changed: looked at one by one, never walked
+  const rechecks = new Set();
+  const seen = new WeakSet();
+  let batch = null;
+  let index = 0;
+  let scheduled = false;
+
+  const nextFrame = (cb) => {
+    if (typeof requestAnimationFrame === 'function') requestAnimationFrame(cb);
+    else setTimeout(cb, 16);
+  };
+
+  const isCovered = (node) => {
+    for (let p = node.parentNode; p; p = p.parentNode) {
+      if (queued.has(p)) return true;
+    }
+    return false;
+  };
+
+  const visit = (el) => {
+    if (seen.has(el) || !el.isConnected) return;
+    seen.add(el);
+    checkEl(el);
+    if (el.matches(ELEMENT_HANDLER_SELECTOR)) {
+      for (const [selector, handler] of ELEMENT_HANDLERS) {
+        if (el.matches(selector)) handler(el);
+      }
+    }
+  };
+
+  const flush = () => {
+    scheduled = false;
+    const deadline = performance.now() + SCAN_BUDGET_MS;
+    while (performance.now() < deadline) {
+      if (rechecks.size) {
+        let n = 0;
+        for (const el of rechecks) {
+          rechecks.delete(el);
+          visit(el);
+          if (++n === 32) break;
+        }
+        continue;
+      }
+      if (!batch) {
+        if (head === queue.length) {
+          queue.length = 0;
+          head = 0;
+          return;
+        }
+        const root = queue[head++];
+        queued.delete(root);
+        if (!root.isConnected) continue; // already gone again
+        visit(root);
+        // Static list: removing an element mid-walk does not cut the walk short
+        batch = root.querySelectorAll('*');
+        index = 0;
+      }
+      // Look at the clock every few elements rather than after each one
+      const end = Math.min(index + 32, batch.length);
+      for (; index < end; index++) visit(batch[index]);
+      if (index === batch.length) batch = null;
+    }
+    scheduled = true;
+    nextFrame(flush);
+  };
+
+  const wake = () => {
+    if (!scheduled) {
+      scheduled = true;
+      nextFrame(flush);
+    }
+  };
+
+  return {
+    // New subtree: the root and all of its descendants
+    add(node) {
+      if (queued.has(node) || (queued.size && isCovered(node))) return;
+      queued.add(node);
+      queue.push(node);
+      wake();
+    },
+    // Changed attributes or a finished load: only the element itself is looked at again
+    recheck(el) {
+      seen.delete(el);
+      if (queued.size && (queued.has(el) || isCovered(el))) return;
+      rechecks.add(el);
+      wake();
+    }
+  };
+}
+
 function observeDOMChanges() {
   const scanGif = hideGifAds();
   const scanPopups = hidePopupsAndModals();
   const scanFlash = hideFlashObjects();
   const scanEnhanced = enhancedFindHideAds();
   const scanVideoAds = autoSkipVideoAds();
+  const scheduler = scanScheduler();
 
   const fullScan = () => {
     scanGif();
@@ -783,27 +924,13 @@ function observeDOMChanges() {
 
   const obs = new MutationObserver((mutations) => {
     for (const mutation of mutations) {
-      if (mutation.type === 'childList' && mutation.addedNodes.length > 0) {
+      if (mutation.type === 'childList') {
         for (const node of mutation.addedNodes) {
-          if (node.nodeType === 1) { // Element node
-            checkEl(node);
-            node.querySelectorAll('*').forEach(checkEl);
-            scanGif(node);
-            scanPopups(node);
-            scanFlash(node);
-            scanEnhanced(node);
-            scanVideoAds(node);
-          }
+          if (node.nodeType === 1) scheduler.add(node); // Element node
         }
-      }
-      if (mutation.type === 'attributes') {
+      } else if (mutation.type === 'attributes') {
         const t = mutation.target;
-        if (t && t.nodeType === 1) {
-          checkEl(t);
-          if (mutation.attributeName && ['src','data-src','srcset','data-srcset','style','class'].includes(mutation.attributeName)) {
-            scanGif(t);
-          }
-        }
+        if (t && t.nodeType === 1) scheduler.recheck(t);
       }
     }
   });
@@ -815,8 +942,7 @@ function observeDOMChanges() {
     const el = e.target;
     if (el && el.nodeType === 1) {
       if (el.tagName === 'IMG' || el.tagName === 'IFRAME') {
-        checkEl(el);
-        scanGif(el);
+        scheduler.recheck(el);
       }
     }
   }, true);
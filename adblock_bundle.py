@@ -0,0 +1,383 @@
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+
+import adblock_rules
+
+# Bump when the bundle layout or the minifier changes: it is part of the cache key
+BUNDLE_FORMAT = 1
+BUNDLE_NAME = "bundle.js"
+_HEADER = "/* yblox-adblock-bundle {key} */\n"
+
+# Обертка, которую раньше собирал f-string в main.py.
+# Код выполняется в каждом фрейме через AddScriptToExecuteOnDocumentCreatedAsync.
+POLYFILL = """(function() {
+  if (window.__adblock_injected) return;
+  window.__adblock_injected = true;
+
+  window.adblockCompiled = /*COMPILED*/;
+
+  const chrome = {
+    storage: {
+      local: {
+        get: (keys) => Promise.resolve({ enabled: true, whitelist: [] }),
+        set: (data) => Promise.resolve()
+      }
+    },
+    runtime: {
+      getURL: (path) => path,
+      onMessage: { addListener: () => {}, sendMessage: () => Promise.resolve() }
+    }
+  };
+  window.chrome = chrome;
+  window.browser = chrome;
+
+/*CONTENT*/
+
+  if(typeof injectAntiAntiAdblock === 'function') injectAntiAntiAdblock();
+  console.log("Adblock polyfill and script executed");
+})();
+"""
+
+
+# --- Tokenizer ---
+# Just enough of JavaScript to strip comments and whitespace safely: strings,
+# template literals (with ${} nesting), regex literals and comments are kept
+# or dropped as a whole, everything else is words and single punctuators.
+
+_WORD = re.compile(r'[\w$\u0080-￿]+')
+_REGEX_AFTER_WORDS = frozenset(("return", "typeof", "case", "do", "else", "in", "instanceof", "new",
+                                "delete", "void", "throw", "yield", "await", "of"))
+_REGEX_AFTER_PUNCT = frozenset("(,=:[!&|?{};+-*%<>~^")
+
+
+class Token:
+    __slots__ = ("kind", "text", "gap")
+
+    def __init__(self, kind, text, gap):
+        self.kind = kind  # "word", "string", "template", "regex", "punct"
+        self.text = text
+        self.gap = gap  # "", " " or "\n": what separated it from the previous token
+
+    def __repr__(self):
+        return f"Token({self.kind}, {self.text!r})"
+
+
+def _skip_string(src, i):
+    quote = src[i]
+    i += 1
+    while i < len(src):
+        ch = src[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if ch == quote:
+            return i + 1
+        if ch == "\n":
+            break
+        i += 1
+    raise ValueError(f"unterminated string at {i}")
+
+
+def _skip_template(src, i):
+    i += 1
+    while i < len(src):
+        ch = src[i]
+        if ch == "\\":
+            i += 2
+        elif ch == "`":
+            return i + 1
+        elif src.startswith("${", i):
+            _, i = _tokenize(src, i + 2, until_brace=True)
+            i += 1
+        else:
+            i += 1
+    raise ValueError("unterminated template literal")
+
+
+def _skip_regex(src, i):
+    j = i + 1
+    in_class = False
+    while j < len(src):
+        ch = src[j]
+        if ch == "\\":
+            j += 2
+            continue
+        if ch == "\n":
+            return None
+        if ch == "[":
+            in_class = True
+        elif ch == "]":
+            in_class = False
+        elif ch == "/" and not in_class:
+            j += 1
+            while j < len(src) and (src[j].isalpha()):
+                j += 1
+            return j
+        j += 1
+    return None
+
+
+def _regex_allowed(prev):
+    if prev is None:
+        return True
+    if prev.kind == "word":
+        return prev.text in _REGEX_AFTER_WORDS
+    return prev.kind == "punct" and prev.text in _REGEX_AFTER_PUNCT
+
+
+def _tokenize(src, i=0, until_brace=False):
+    tokens = []
+    gap = ""
+    depth = 0
+    n = len(src)
+    while i < n:
+        ch = src[i]
+        if ch in " \t\r\n\f\v﻿":
+            gap = "\n" if ch == "\n" or gap == "\n" else " "
+            i += 1
+        elif src.startswith("//", i):
+            end = src.find("\n", i)
+            i = n if end == -1 else end
+            gap = gap or " "
+        elif src.startswith("/*", i):
+            end = src.index("*/", i + 2) + 2
+            gap = "\n" if "\n" in src[i:end] or gap == "\n" else " "
+            i = end
+        elif ch in "'\"":
+            end = _skip_string(src, i)
+            tokens.append(Token("string", src[i:end], gap))
+            i, gap = end, ""
+        elif ch == "`":
+            end = _skip_template(src, i)
+            tokens.append(Token("template", src[i:end], gap))
+            i, gap = end, ""
+        elif ch == "/" and _regex_allowed(tokens[-1] if tokens else None) and _skip_regex(src, i):
+            end = _skip_regex(src, i)
+            tokens.append(Token("regex", src[i:end], gap))
+            i, gap = end, ""
+        else:
+            match = _WORD.match(src, i)
+            if match:
+                tokens.append(Token("word", match.group(), gap))
+                i, gap = match.end(), ""
+                continue
+            if until_brace:
+                if ch == "{":
+                    depth += 1
+                elif ch == "}":
+                    if depth == 0:
+                        return tokens, i
+                    depth -= 1
+            tokens.append(Token("punct", ch, gap))
+            i, gap = i + 1, ""
+    if until_brace:
+        raise ValueError("unterminated template expression")
+    return tokens, i
+
+
+def tokenize(source):
+    return _tokenize(source)[0]
+
+
+# --- Transformations ---
+
+def _function_declarations(tokens):
+    """ (name, start, end) of every top-level function declaration, end exclusive """
+    found = []
+    depth = 0
+    i = 0
+    while i < len(tokens):
+        tok = tokens[i]
+        if tok.kind == "punct" and tok.text in "{([":
+            depth += 1
+        elif tok.kind == "punct" and tok.text in "})]":
+            depth -= 1
+        elif depth == 0 and tok.kind == "word" and tok.text == "function":
+            start = i - 1 if i and tokens[i - 1].text == "async" else i
+            before = tokens[start - 1] if start else None
+            # Statement position only, "x = function f() {}" is an expression
+            name = tokens[i + 1] if i + 1 < len(tokens) else None
+            if (before is None or before.text in ";}") and name is not None and name.kind == "word":
+                j = i + 2
+                while j < len(tokens) and tokens[j].text != "{":
+                    j += 1
+                body_depth = 0
+                for k in range(j, len(tokens)):
+                    if tokens[k].kind != "punct":
+                        continue
+                    if tokens[k].text == "{":
+                        body_depth += 1
+                    elif tokens[k].text == "}":
+                        body_depth -= 1
+                        if body_depth == 0:
+                            found.append((name.text, start, k + 1))
+                            i = k
+                            break
+        i += 1
+    return found
+
+
+def drop_shadowed_functions(tokens):
+    """
+    Remove top-level function declarations that a later declaration of the
+    same name replaces. Declarations are hoisted and the last one wins, so the
+    earlier bodies never run.
+    """
+    declarations = _function_declarations(tokens)
+    last = {name: start for name, start, _ in declarations}
+    dead = [(start, end) for name, start, end in declarations if last[name] != start]
+    if not dead:
+        return tokens, []
+    keep = []
+    pos = 0
+    for start, end in dead:
+        keep.extend(tokens[pos:start])
+        pos = end
+    keep.extend(tokens[pos:])
+    # The token after a removed block inherits a line break, never glue it on
+    for start, _ in dead:
+        index = start - sum(e - s for s, e in dead if s < start)
+        if index < len(keep):
+            keep[index].gap = "\n"
+    return keep, [name for name, start, _ in declarations if last[name] != start]
+
+
+_NO_BREAK_AFTER = frozenset(";{,([")
+_NO_BREAK_BEFORE = frozenset("}),];.:")
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch in "_$" or ord(ch) > 127
+
+
+def render(tokens):
+    """
+    Join tokens back into source with the least whitespace. Line breaks are
+    only dropped where automatic semicolon insertion cannot depend on them.
+    """
+    out = []
+    prev = None
+    for tok in tokens:
+        if prev is not None and tok.gap:
+            if tok.gap == "\n" and prev.text not in _NO_BREAK_AFTER and tok.text not in _NO_BREAK_BEFORE:
+                out.append("\n")
+            else:
+                a, b = prev.text[-1], tok.text[0]
+                if (_is_word_char(a) and _is_word_char(b)) or (a == b and a in "+-") or "/" in (a, b):
+                    out.append(" ")
+        out.append(tok.text)
+        prev = tok
+    return "".join(out)
+
+
+def minify(source):
+    """ Minified source and the names of the dropped duplicate functions """
+    tokens, dropped = drop_shadowed_functions(tokenize(source))
+    return render(tokens), dropped
+
+
+# --- Bundle ---
+
+def bundle_key(rules_data, script_data):
+    digest = hashlib.sha256(f"yblox-adblock:{BUNDLE_FORMAT}:".encode("utf-8"))
+    for data in (rules_data, script_data):
+        digest.update(len(data).to_bytes(8, "little"))
+        digest.update(data)
+    return digest.hexdigest()[:20]
+
+
+def build_bundle(rules_data, script_data):
+    """ rules.json and adblock_content.js bytes -> the script injected into every frame """
+    compiled = "null"
+    if rules_data:
+        compiled = json.dumps(adblock_rules.compile_rules(json.loads(rules_data)), ensure_ascii=False, separators=(",", ":"))
+    content = script_data.decode("utf-8")
+    head, tail = POLYFILL.split("/*CONTENT*/")
+    head = head.replace("/*COMPILED*/", compiled)
+    return render(tokenize(head)) + "\n" + minify(content)[0] + "\n" + render(tokenize(tail))
+
+
+def _read(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return b""
+
+
+def _read_bundle(path, key=None):
+    """ Bundle text, or None if missing or built from other inputs """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+    except OSError:
+        return None
+    header, _, body = text.partition("\n")
+    if not header.startswith("/* yblox-adblock-bundle "):
+        return None
+    if key is not None and header != _HEADER.format(key=key).rstrip("\n"):
+        return None
+    return body
+
+
+def _write_atomic(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="\n") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def write_prebuilt(adblock_dir):
+    """ Build step: writes adblock/bundle.js next to its inputs, returns its path """
+    rules_data = _read(os.path.join(adblock_dir, "rules.json"))
+    script_data = _read(os.path.join(adblock_dir, "adblock_content.js"))
+    key = bundle_key(rules_data, script_data)
+    path = os.path.join(adblock_dir, BUNDLE_NAME)
+    _write_atomic(path, _HEADER.format(key=key) + build_bundle(rules_data, script_data))
+    return path
+
+
+def load_bundle(adblock_dir, cache_dir=None):
+    """
+    The frozen app ships a prebuilt bundle and reads just that file: its
+    inputs are packed into the same executable and cannot change. From a
+    source checkout the inputs are hashed and the bundle is taken from the
+    prebuilt file or the cache directory when the key matches, otherwise it is
+    built and cached.
+    """
+    prebuilt = os.path.join(adblock_dir, BUNDLE_NAME)
+    if getattr(sys, "frozen", False):
+        bundle = _read_bundle(prebuilt)
+        if bundle is not None:
+            return bundle
+
+    rules_data = _read(os.path.join(adblock_dir, "rules.json"))
+    script_data = _read(os.path.join(adblock_dir, "adblock_content.js"))
+    if not script_data:
+        return ""
+    key = bundle_key(rules_data, script_data)
+    bundle = _read_bundle(prebuilt, key)
+    if bundle is not None:
+        return bundle
+    cached = os.path.join(cache_dir, f"adblock-{key}.js") if cache_dir else None
+    if cached:
+        bundle = _read_bundle(cached, key)
+        if bundle is not None:
+            return bundle
+
+    bundle = build_bundle(rules_data, script_data)
+    if cached:
+        try:
+            _write_atomic(cached, _HEADER.format(key=key) + bundle)
+        except OSError as e:
+            print(f"Error caching adblock bundle: {e}")
+    return bundle
+
+
+if __name__ == "__main__":
+    print(f"Adblock bundle written to {write_prebuilt(sys.argv[1] if len(sys.argv) > 1 else 'adblock')}")
@@ -0,0 +1,144 @@
+import json
+import re
+
+# Та же декларация, что injectCss в adblock_content.js навешивает на каждый селектор
+HIDE_DECLARATIONS = ("display: none !important; visibility: hidden !important; height: 0 !important; "
+                     "width: 0 !important; opacity: 0 !important; pointer-events: none !important;")
+
+# Selectors per merged rule. One selector the browser cannot parse drops the
+# whole rule it is in, so lists are kept short enough to limit the damage.
+CHUNK_SIZE = 32
+
+_ATTRIBUTE = re.compile(r'\[\s*[-\w]+\s*(?:[~|^$*]?=\s*(?:"[^"]*"|\'[^\']*\'|[-\w]+)\s*(?:[iIsS]\s*)?)?\]')
+_SUBSTRING_ATTRIBUTE = re.compile(r'\[([-\w]+)\*="([^"]+)"\]')
+
+
+def is_valid_selector(selector):
+    """ Cheap syntax check: brackets, quotes and parentheses must balance """
+    if not selector or any(ch in selector for ch in "{};"):
+        return False
+    rest = _ATTRIBUTE.sub("", selector)
+    if any(ch in rest for ch in "[]\"'"):
+        return False
+    depth = 0
+    for ch in rest:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+            if depth < 0:
+                return False
+    return depth == 0
+
+
+def _subsumed(selectors, base=()):
+    """
+    Selectors that can never match anything a broader one misses: the same
+    selector with a [attr*="..."] value that contains the other's value.
+    """
+    shapes = {}
+    for selector in list(base) + list(selectors):
+        for match in _SUBSTRING_ATTRIBUTE.finditer(selector):
+            shape = (selector[:match.start()], match.group(1), selector[match.end():])
+            shapes.setdefault(shape, set()).add(match.group(2))
+
+    redundant = set()
+    for selector in selectors:
+        for match in _SUBSTRING_ATTRIBUTE.finditer(selector):
+            value = match.group(2)
+            shape = (selector[:match.start()], match.group(1), selector[match.end():])
+            if any(other != value and other in value for other in shapes[shape]):
+                redundant.add(selector)
+                break
+    return redundant
+
+
+def _prune(selectors, base=(), report=None):
+    """ Valid, unique selectors not already covered by base, in original order """
+    seen = set(base)
+    kept = []
+    for selector in selectors:
+        selector = str(selector).strip()
+        if selector in seen:
+            continue
+        seen.add(selector)
+        if not is_valid_selector(selector):
+            if report is not None:
+                report["invalid"].append(selector)
+            continue
+        kept.append(selector)
+    redundant = _subsumed(kept, base)
+    if report is not None:
+        report["subsumed"].extend(s for s in kept if s in redundant)
+    return [s for s in kept if s not in redundant]
+
+
+def merge_selectors(selectors):
+    """ Selector lists, one per CSS rule; the declaration block is added by the content script """
+    # :has() is the expensive one for style invalidation and the first thing an
+    # older engine rejects, so each of those gets a rule of its own
+    plain = [s for s in selectors if ":has(" not in s]
+    rules = [", ".join(plain[i:i + CHUNK_SIZE]) for i in range(0, len(plain), CHUNK_SIZE)]
+    rules.extend(s for s in selectors if ":has(" in s)
+    return rules
+
+
+def build_stylesheet(rules, declarations=HIDE_DECLARATIONS):
+    return "\n".join(f"{rule} {{ {declarations} }}" for rule in rules)
+
+
+def compile_network_filters(filters):
+    # Контент-скрипт сравнивает через includes(): фильтр, содержащий другой, ничего не добавляет
+    unique = list(dict.fromkeys(str(f).strip().lower() for f in filters if str(f).strip()))
+    return [f for f in unique if not any(other != f and other in f for other in unique)]
+
+
+def compile_rules(rules, report=None):
+    """
+    Turn rules.json into the table the content script turns into a single
+    <style>: merged rules for every frame, per page language and per host
+    (matched on the hostname or any of its parent domains), none of them
+    repeating selectors of the global group.
+    Pass a dict as report to collect what was dropped and why.
+    """
+    if report is not None:
+        report.setdefault("invalid", [])
+        report.setdefault("subsumed", [])
+
+    global_selectors = _prune(rules.get("globalElementHidingSelectors") or [], report=report)
+    languages = {}
+    for lang, selectors in (rules.get("languageSpecificElementHidingSelectors") or {}).items():
+        pruned = _prune(selectors or [], global_selectors, report)
+        if pruned:
+            languages[lang.lower()] = merge_selectors(pruned)
+    hosts = {}
+    for host, selectors in (rules.get("hostElementHidingSelectors") or {}).items():
+        pruned = _prune(selectors or [], global_selectors, report)
+        if pruned:
+            hosts[host.lower().lstrip(".")] = merge_selectors(pruned)
+
+    compiled = {
+        "version": 1,
+        "declarations": HIDE_DECLARATIONS,
+        "css": {"global": merge_selectors(global_selectors), "lang": languages, "host": hosts},
+        "networkFilters": compile_network_filters(rules.get("networkFilters") or [])
+    }
+    if report is not None:
+        report["global_selectors"] = len(global_selectors)
+        report["network_filters"] = len(compiled["networkFilters"])
+    return compiled
+
+
+def compile_file(path, report=None):
+    with open(path, "r", encoding="utf-8") as f:
+        return compile_rules(json.load(f), report)
+
+
+def select_css(compiled, hostname, lang):
+    """ Python twin of selectCompiledCss() in adblock_content.js """
+    css = compiled["css"]
+    rules = css["global"] + css["lang"].get(lang, [])
+    for host, host_rules in css["host"].items():
+        if hostname == host or hostname.endswith("." + host):
+            rules += host_rules
+    return build_stylesheet(rules, compiled["declarations"])
@@ -0,0 +1,817 @@
+import os
+import sys
+import threading
+import time
+import webbrowser
+
+# UI Imports
+import customtkinter as ctk
+from PIL import Image
+
+import perf
+import app_settings
+from async_loader import AsyncLoader
+from catalog_service import CatalogService, thumb_url
+from thumbnails import ThumbnailLoader, ThumbnailScheduler, THUMB_SIZE, save_display_size
+from thumb_cache import ThumbnailDiskCache
+from image_cache import ImageCache
+from search_index import SearchIndex
+from virtual_grid import VirtualGrid
+from browser_host import BrowserHostClient
+from startup import GAME_EXECUTABLE, resource_path
+
+# Games shown in the "Recently Played" strip; the database keeps the full history
+RECENT_GAMES_SHOWN = 8
+
+# Pause in typing after which the search runs
+SEARCH_DEBOUNCE_MS = 150
+
+# Script the browser process is started from when not frozen
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+# Games appended per scroll step when paging through the crawled catalog
+CATALOG_PAGE_SIZE = 60
+
+# The background crawl waits for the first page of the catalog to load
+CRAWL_START_DELAY_MS = 5000
+
+class YbloxApp(ctk.CTk):
+    def __init__(self):
+        super().__init__()
+
+        # --- Local Storage ---
+        # Earlier versions kept settings and history in these JSON files; they are imported once
+        self.data_dir = app_settings.data_dir()
+        self.store = app_settings.open_store()
+
+        self.settings = self.load_settings()
+        self.recent_games = self.load_recent_games()
+
+        # --- Diagnostics ---
+        # Spans and counters go to logs/trace-app.jsonl only while tracing is on
+        if self.settings.get("diagnostics_enabled", False) or os.environ.get("YBLOX_TRACE"):
+            perf.tracer.configure(perf.trace_path("app"), process="app")
+        self.diagnostics_panel = None
+        # Opt-in stall finder for the Tk thread; started before any widget registers a callback
+        self.watchdog = None
+        if self.settings.get("watchdog_enabled", False) or os.environ.get("YBLOX_WATCHDOG"):
+            from stall_watchdog import StallWatchdog
+            self.watchdog = StallWatchdog(self, threshold_ms=self.settings.get("watchdog_threshold_ms", 100)).start()
+
+        self.title("Yandex Games Client")
+        self.geometry("1100x700")
+        
+        # Set app icon
+        icon_path = resource_path("icon.ico")
+        if os.path.exists(icon_path):
+            self.iconbitmap(icon_path)
+
+        # Set appearance mode (default is dark)
+        ctk.set_appearance_mode("dark")
+        
+        # Roblox-like theme colors
+        self.colors = {
+            "dark": {
+                "bg": "#1B1D1F",
+                "sidebar": "#232527",
+                "topbar": "#232527",
+                "card": "#232527",
+                "text": "#FFFFFF",
+                "accent": "#00A2FF"
+            },
+            "light": {
+                "bg": "#F2F4F5",
+                "sidebar": "#FFFFFF",
+                "topbar": "#FFFFFF",
+                "card": "#FFFFFF",
+                "text": "#000000",
+                "accent": "#00A2FF"
+            }
+        }
+
+        # Layout configuration
+        self.grid_columnconfigure(1, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+
+        # --- Sidebar ---
+        self.sidebar_frame = ctk.CTkFrame(self, width=200, corner_radius=0, fg_color=("#FFFFFF", "#232527"))
+        self.sidebar_frame.grid(row=0, column=0, rowspan=2, sticky="nsew")
+        self.sidebar_frame.grid_rowconfigure(5, weight=1)
+
+        self.logo_label = ctk.CTkLabel(self.sidebar_frame, text="YBLOX", font=ctk.CTkFont(size=24, weight="bold"), text_color=("#000000", "#FFFFFF"))
+        self.logo_label.grid(row=0, column=0, padx=20, pady=(20, 30))
+
+        self.home_button = ctk.CTkButton(self.sidebar_frame, text="Home", fg_color="transparent", text_color=("#000000", "#FFFFFF"), hover_color=("#E5E5E5", "#393B3D"), anchor="w", command=self.load_games_async)
+        self.home_button.grid(row=1, column=0, padx=10, pady=5, sticky="ew")
+
+        self.discover_button = ctk.CTkButton(self.sidebar_frame, text="Discover", fg_color="transparent", text_color=("#000000", "#FFFFFF"), hover_color=("#E5E5E5", "#393B3D"), anchor="w", command=self.load_games_async)
+        self.discover_button.grid(row=2, column=0, padx=10, pady=5, sticky="ew")
+
+        self.settings_button = ctk.CTkButton(self.sidebar_frame, text="Settings", fg_color="transparent", text_color=("#000000", "#FFFFFF"), hover_color=("#E5E5E5", "#393B3D"), anchor="w", command=self.show_settings)
+        self.settings_button.grid(row=3, column=0, padx=10, pady=5, sticky="ew")
+
+        self.about_button = ctk.CTkButton(self.sidebar_frame, text="About", fg_color="transparent", text_color=("#000000", "#FFFFFF"), hover_color=("#E5E5E5", "#393B3D"), anchor="w", command=self.show_about)
+        self.about_button.grid(row=4, column=0, padx=10, pady=5, sticky="ew")
+
+        # --- Appearance Settings ---
+        self.appearance_mode_label = ctk.CTkLabel(self.sidebar_frame, text="Theme:", anchor="w")
+        self.appearance_mode_label.grid(row=6, column=0, padx=20, pady=(10, 0))
+        self.appearance_mode_optionemenu = ctk.CTkOptionMenu(self.sidebar_frame, values=["Light", "Dark"],
+                                                                       command=self.change_appearance_mode_event,
+                                                                       fg_color=("#E5E5E5", "#393B3D"),
+                                                                       button_color=("#E5E5E5", "#393B3D"),
+                                                                       text_color=("#000000", "#FFFFFF"))
+        self.appearance_mode_optionemenu.grid(row=7, column=0, padx=20, pady=(10, 20))
+        self.appearance_mode_optionemenu.set("Dark")
+
+        # --- Catalog ---
+        # Every game seen so far, searchable while typing; the remote search only adds to it
+        self.search_index = SearchIndex()
+        # All catalog requests run on one asyncio loop; results come back through after()
+        self.catalog_loader = AsyncLoader(deliver=lambda fn: self.after(0, fn))
+        self.catalog = CatalogService(self.store, self.settings, self.catalog_loader, on_games=self.search_index.add)
+
+        # --- Thumbnails ---
+        workers = self.settings.get("thumbnail_workers", 6)
+        self.thumb_disk_cache = ThumbnailDiskCache(os.path.join(self.data_dir, "thumbs"), self.store,
+                                                   max_bytes=self.settings.get("thumbnail_cache_mb", 64) * 1024 * 1024)
+        # Decoded straight at the on-screen size, so CTkImage only has to copy the pixels
+        scaling = ctk.ScalingTracker.get_widget_scaling(self)
+        thumb_size = (round(THUMB_SIZE[0] * scaling), round(THUMB_SIZE[1] * scaling))
+        # cli.py --prewarm fills the disk cache at this size
+        save_display_size(self.store, thumb_size)
+        self.thumb_loader = ThumbnailLoader(size=thumb_size,
+                                            pool_size=workers, disk_cache=self.thumb_disk_cache,
+                                            processes=self.settings.get("thumbnail_decode_processes"))
+        self.thumb_scheduler = ThumbnailScheduler(self.thumb_loader, workers=workers)
+        # Each display_games pass is a new generation; newer cards are served first
+        self._thumb_generation = 0
+        # Decoded images shared by every card and kept across grid rebuilds
+        self.image_cache = ImageCache(max_bytes=self.settings.get("image_cache_mb", 32) * 1024 * 1024)
+        # CTkLabel ignores image=None: a recycled card gets this instead of the previous game's image
+        blank = Image.new("RGBA", THUMB_SIZE, (0, 0, 0, 0))
+        self._blank_thumb = ctk.CTkImage(light_image=blank, dark_image=blank, size=THUMB_SIZE)
+
+        # --- Search ---
+        self._search_after = None
+        threading.Thread(target=self._fill_search_index, daemon=True).start()
+
+        # --- Top Bar ---
+        self.top_bar = ctk.CTkFrame(self, height=60, corner_radius=0, fg_color=("#FFFFFF", "#232527"))
+        self.top_bar.grid(row=0, column=1, sticky="ew")
+        self.top_bar.grid_columnconfigure(0, weight=1)
+
+        self.search_entry = ctk.CTkEntry(self.top_bar, placeholder_text="Search games...", width=400, fg_color=("#F2F4F5", "#1B1D1F"), border_width=0)
+        self.search_entry.grid(row=0, column=0, padx=20, pady=15, sticky="w")
+        self.search_entry.bind("<Return>", self._search_now)
+        self.search_entry.bind("<KeyRelease>", self._on_search_typed)
+
+        self.user_label = ctk.CTkLabel(self.top_bar, text="User_1234", font=ctk.CTkFont(size=14), text_color=("#000000", "#FFFFFF"))
+        self.user_label.grid(row=0, column=1, padx=20, pady=15)
+
+        # --- Main Content (Game Grid) ---
+        # The game grid scrolls itself (see VirtualGrid), so this frame does not
+        self.main_content = ctk.CTkFrame(self, corner_radius=0, fg_color=("#F2F4F5", "#1B1D1F"))
+        self.main_content.grid(row=1, column=1, sticky="nsew")
+        self.main_content.grid_columnconfigure((0, 1, 2, 3), weight=1)
+        self.main_content.grid_rowconfigure(0, weight=1)
+
+        # Views are built once and then only hidden/shown
+        self.views = {}
+        self._recent_cards = {}
+
+        # Catalog paging state for the current query
+        self._catalog_query = ""
+        self._catalog_page = 0
+        self._catalog_token = None
+        self._catalog_page_loading = False
+        # Pages go on screen in order: the next one due and those that arrived ahead of it
+        self._catalog_next_page = 0
+        self._catalog_pages = {}
+        self._catalog_keys = set()
+        # Position in the crawled catalog for the home view
+        self._catalog_offset = 0
+        # Local search results are on screen; the remote ones are appended to them
+        self._catalog_local = False
+
+        # --- Browser Host ---
+        # Optional pre-warmed browser process; games fall back to their own process without it
+        self.browser_host = None
+        if self.settings.get("browser_host_enabled", False):
+            self._start_browser_host()
+
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.bind_all("<Control-Shift-KeyPress-D>", self.toggle_diagnostics_panel)
+
+        self.load_games_async()
+        if self.settings.get("catalog_crawl_enabled", True):
+            self.after(CRAWL_START_DELAY_MS, self._start_crawl)
+
+    def on_close(self):
+        # Workers finishing a download still write to the disk cache and the store
+        self.thumb_scheduler.close()
+        # Persist thumbnail access times collected since the last write
+        self.thumb_disk_cache.flush()
+        self.thumb_loader.close()
+        if self.browser_host is not None:
+            self.browser_host.stop()
+        self.catalog_loader.stop()
+        # Commit whatever the writer thread still has queued
+        self.store.close()
+        if self.watchdog is not None:
+            self.watchdog.stop()
+            # YBLOX_WATCHDOG may name the report file (CI); otherwise it goes next to the traces
+            path = os.environ.get("YBLOX_WATCHDOG", "")
+            self.watchdog.write(path if path.endswith(".json") else os.path.join(self.data_dir, "logs", "watchdog.json"))
+        # Final summary line, then the trace file is closed
+        perf.tracer.disable()
+        self.destroy()
+
+    def load_settings(self):
+        return app_settings.load_settings(self.store)
+
+    def save_settings(self):
+        # Queued; the store's writer thread commits it
+        self.store.put_settings(self.settings)
+
+    def _show_view(self, name):
+        for view_name, view in self.views.items():
+            if view_name != name:
+                view.grid_remove()
+        view = self.views.get(name)
+        if view is None:
+            view = self.views[name] = getattr(self, f"_build_{name}_view")()
+        else:
+            view.grid()
+        return view
+
+    def show_settings(self):
+        self._show_view("settings")
+
+    def _build_settings_view(self):
+        settings_frame = ctk.CTkFrame(self.main_content, fg_color="transparent")
+        settings_frame.grid(row=0, column=0, columnspan=4, sticky="nsew", padx=40, pady=40)
+        
+        title_label = ctk.CTkLabel(settings_frame, text="Settings", font=ctk.CTkFont(size=24, weight="bold"))
+        title_label.pack(pady=(0, 30), anchor="w")
+        
+        # Adblock setting
+        adblock_frame = ctk.CTkFrame(settings_frame, fg_color="transparent")
+        adblock_frame.pack(fill="x", pady=10)
+        
+        adblock_label = ctk.CTkLabel(adblock_frame, text="Adblocker", font=ctk.CTkFont(size=16))
+        adblock_label.pack(side="left")
+        
+        adblock_switch = ctk.CTkSwitch(adblock_frame, text="", 
+                                      command=lambda: self.toggle_adblock(adblock_switch.get()),
+                                      progress_color="#00A2FF")
+        adblock_switch.pack(side="right")
+        if self.settings.get("adblock_enabled", True):
+            adblock_switch.select()
+        else:
+            adblock_switch.deselect()
+            
+        # Info text for adblock
+        adblock_info = ctk.CTkLabel(settings_frame, text="Enables/disables the built-in adblocker for games.", 
+                                   font=ctk.CTkFont(size=12), text_color="gray")
+        adblock_info.pack(pady=(0, 20), anchor="w")
+
+        # Browser host setting
+        host_frame = ctk.CTkFrame(settings_frame, fg_color="transparent")
+        host_frame.pack(fill="x", pady=10)
+
+        host_label = ctk.CTkLabel(host_frame, text="Fast game launch", font=ctk.CTkFont(size=16))
+        host_label.pack(side="left")
+
+        host_switch = ctk.CTkSwitch(host_frame, text="",
+                                   command=lambda: self.toggle_browser_host(host_switch.get()),
+                                   progress_color="#00A2FF")
+        host_switch.pack(side="right")
+        if self.settings.get("browser_host_enabled", False):
+            host_switch.select()
+        else:
+            host_switch.deselect()
+
+        host_info = ctk.CTkLabel(settings_frame, text="Keeps a browser running in the background so games open instantly.",
+                                 font=ctk.CTkFont(size=12), text_color="gray")
+        host_info.pack(pady=(0, 20), anchor="w")
+
+        # Asset cache setting
+        assets_frame = ctk.CTkFrame(settings_frame, fg_color="transparent")
+        assets_frame.pack(fill="x", pady=10)
+
+        assets_label = ctk.CTkLabel(assets_frame, text="Game asset cache", font=ctk.CTkFont(size=16))
+        assets_label.pack(side="left")
+
+        assets_switch = ctk.CTkSwitch(assets_frame, text="",
+                                     command=lambda: self.toggle_asset_proxy(assets_switch.get()),
+                                     progress_color="#00A2FF")
+        assets_switch.pack(side="right")
+        if self.settings.get("asset_proxy_enabled", False):
+            assets_switch.select()
+        else:
+            assets_switch.deselect()
+
+        assets_info = ctk.CTkLabel(settings_frame, text="Keeps game files on disk so relaunched games load faster and ad hosts are blocked.",
+                                   font=ctk.CTkFont(size=12), text_color="gray")
+        assets_info.pack(pady=(0, 20), anchor="w")
+        return settings_frame
+
+    def toggle_adblock(self, value):
+        self.settings["adblock_enabled"] = bool(value)
+        self.save_settings()
+        print(f"Adblock set to: {self.settings['adblock_enabled']}")
+
+    def toggle_browser_host(self, value):
+        self.settings["browser_host_enabled"] = bool(value)
+        self.save_settings()
+        if value and self.browser_host is None:
+            self._start_browser_host()
+        elif not value and self.browser_host is not None:
+            host, self.browser_host = self.browser_host, None
+            threading.Thread(target=host.stop, daemon=True).start()
+        print(f"Browser host set to: {self.settings['browser_host_enabled']}")
+
+    def toggle_asset_proxy(self, value):
+        # New game processes pick it up; a running browser host on its next start
+        self.settings["asset_proxy_enabled"] = bool(value)
+        self.save_settings()
+        print(f"Asset cache set to: {self.settings['asset_proxy_enabled']}")
+
+    def _browser_flags(self):
+        flags = ["--adblock-on" if self.settings.get("adblock_enabled", True) else "--adblock-off"]
+        if self.settings.get("asset_proxy_enabled", False):
+            flags.append("--asset-proxy")
+        return flags
+
+    def _process_command(self, *args):
+        """ Command line for another Yblox process, frozen or run as a script """
+        if getattr(sys, 'frozen', False):
+            return [sys.executable, *args]
+        return [sys.executable, MAIN_SCRIPT, *args]
+
+    def _browser_command(self, *args):
+        """ Game window processes: next to a onefile build the slim YbloxGame.exe unpacks far less """
+        if getattr(sys, 'frozen', False):
+            extension = os.path.splitext(sys.executable)[1]
+            game_exe = os.path.join(os.path.dirname(sys.executable), GAME_EXECUTABLE + extension)
+            if os.path.exists(game_exe):
+                return [game_exe, *args]
+        return self._process_command(*args)
+
+    def _start_browser_host(self):
+        os.makedirs(self.data_dir, exist_ok=True)
+        self.browser_host = BrowserHostClient(self._browser_command("--browser-host", *self._browser_flags()),
+                                              os.path.join(self.data_dir, "browser_host.json"))
+        self.browser_host.start()
+
+    def show_about(self):
+        self._show_view("about")
+
+    def _build_about_view(self):
+        about_frame = ctk.CTkFrame(self.main_content, fg_color="transparent")
+        about_frame.grid(row=0, column=0, columnspan=4, sticky="nsew", padx=40, pady=40)
+        
+        title_label = ctk.CTkLabel(about_frame, text="About Yandex Games Client", font=ctk.CTkFont(size=24, weight="bold"))
+        title_label.pack(pady=(0, 20), anchor="w")
+        
+        version_label = ctk.CTkLabel(about_frame, text="Version: 1.0.0", font=ctk.CTkFont(size=14))
+        version_label.pack(pady=5, anchor="w")
+        
+        desc_text = "A Roblox-style desktop client for Yandex Games with built-in adblocking and recent games history."
+        desc_label = ctk.CTkLabel(about_frame, text=desc_text, font=ctk.CTkFont(size=14), wraplength=600, justify="left")
+        desc_label.pack(pady=20, anchor="w")
+        
+        # GitHub Link
+        github_frame = ctk.CTkFrame(about_frame, fg_color="transparent")
+        github_frame.pack(fill="x", pady=10)
+        
+        github_label = ctk.CTkLabel(github_frame, text="Source Code:", font=ctk.CTkFont(size=14, weight="bold"))
+        github_label.pack(side="left", padx=(0, 10))
+        
+        github_link = ctk.CTkLabel(github_frame, text="github.com/NelikKKL/Yblox", text_color="#00A2FF", cursor="hand2")
+        github_link.pack(side="left")
+        github_link.bind("<Button-1>", lambda e: webbrowser.open("https://github.com/NelikKKL/Yblox"))
+        
+        # License
+        license_label = ctk.CTkLabel(about_frame, text="License: MIT License", font=ctk.CTkFont(size=14))
+        license_label.pack(pady=5, anchor="w")
+        
+        license_btn = ctk.CTkButton(about_frame, text="View License", width=120, height=32,
+                                   fg_color="transparent", border_width=1, border_color="gray",
+                                   command=lambda: webbrowser.open("https://opensource.org/licenses/MIT"))
+        license_btn.pack(pady=20, anchor="w")
+        return about_frame
+
+    def load_games_async(self):
+        self._show_view("games")
+        # Old cards stay on screen until the new results are reconciled into them
+        self.no_games_frame.grid_remove()
+        has_cards = bool(self.game_grid.items or self._recent_cards)
+        self.loading_label.grid(row=0, column=0, columnspan=4, pady=(10, 0) if has_cards else 100)
+        
+        query = self.search_entry.get()
+        # New generation: whatever the previous query still has in flight is dropped
+        self._catalog_token = token = self.catalog_loader.begin("catalog")
+        self._catalog_query = query
+        self._catalog_page = 0
+        self._catalog_page_loading = False
+        self._catalog_next_page = 0
+        self._catalog_pages = {}
+        self._catalog_offset = 0
+        # Games already known are shown right away, the remote search fills in behind them
+        local = self.search_index.search(query) if query.strip() else []
+        self._catalog_local = bool(local)
+        if local:
+            self.display_games(local)
+        url = self.catalog.url(query)
+        self.catalog_loader.submit(token, url, lambda: self.catalog.fetch(url),
+                                   lambda games: self._on_catalog_page(0, games))
+
+    def _on_search_typed(self, event=None):
+        if self._search_after is not None:
+            self.after_cancel(self._search_after)
+            self._search_after = None
+        # Arrows, Shift and the like do not change the query
+        if self.search_entry.get() == self._catalog_query:
+            return
+        self._search_after = self.after(SEARCH_DEBOUNCE_MS, self._search_now)
+
+    def _search_now(self, event=None):
+        if self._search_after is not None:
+            self.after_cancel(self._search_after)
+        self._search_after = None
+        self.load_games_async()
+
+    def _fill_search_index(self):
+        try:
+            for games in self.store.iter_catalog_games():
+                self.search_index.add(games)
+            self.search_index.add(self.store.catalog_games(limit=None))
+            self.search_index.add(self.store.recent_games(limit=None))
+            print(f"Search index: {len(self.search_index)} games")
+        except Exception as e:
+            print(f"Search index error: {e}")
+
+    def _on_games_loaded(self, games, token):
+        # The loader only delivers for the current generation
+        if self._catalog_local:
+            self.loading_label.grid_remove()
+            self._append_new_games(games)
+        else:
+            self.display_games(games)
+
+    def load_more_games(self):
+        if self._catalog_page_loading:
+            return
+        self._catalog_page_loading = True
+        # Not before page 0 is on screen: display_games() would drop what is appended now
+        if not self._catalog_query.strip() and self._catalog_next_page > 0:
+            # The crawled catalog goes well past the home page listing
+            games = self._next_local_catalog_page()
+            if games:
+                self._catalog_page_loading = False
+                self._append_new_games(games)
+                self.game_grid.more_loaded(True)
+                return
+        page = self._catalog_page + 1
+        url = self.catalog.url(self._catalog_query, page)
+        self.catalog_loader.submit(self._catalog_token, url, lambda: self.catalog.fetch(url),
+                                   lambda games: self._on_catalog_page(page, games))
+
+    def _on_catalog_page(self, page, games):
+        """
+        Page 1 may be asked for while page 0 is still loading (local results
+        or the previous query's cards can be scrolled): a page that arrives
+        ahead of the next one due waits in _catalog_pages.
+        """
+        self._catalog_pages[page] = games
+        while self._catalog_next_page in self._catalog_pages:
+            page = self._catalog_next_page
+            games = self._catalog_pages.pop(page)
+            if page and games is None:
+                # Stays the next page due, the next scroll asks for it again
+                self._append_games_page(page, None)
+                return
+            self._catalog_next_page = page + 1
+            if page == 0:
+                self._on_games_loaded(games or [], self._catalog_token)
+            else:
+                self._append_games_page(page, games)
+
+    def _append_games_page(self, page, games):
+        self._catalog_page_loading = False
+        if games is None:
+            # Запрос не удался: страница не пропускается, следующая прокрутка повторит его
+            print(f"Page {page} failed, will retry")
+            self.game_grid.more_loaded(True)
+            return
+        self._catalog_page = page
+        new_games = self._append_new_games(games)
+        print(f"Page {page}: {len(new_games)} new games")
+        # Страница без новых игр — каталог закончился
+        self.game_grid.more_loaded(bool(new_games))
+
+    def _next_local_catalog_page(self):
+        """ Next games of the crawled catalog that are not on screen yet """
+        while True:
+            games = self.store.catalog_games(self._catalog_offset, CATALOG_PAGE_SIZE)
+            self._catalog_offset += len(games)
+            new_games = [g for g in games if self._game_key(g) not in self._catalog_keys]
+            if new_games or not games:
+                return new_games
+
+    def _start_crawl(self):
+        crawler = self.catalog.crawler()
+        # Background work: survives new searches, cancelled on close; progress is checkpointed per page
+        self.catalog_loader.submit(None, "crawl", crawler.run)
+
+    def _append_new_games(self, games):
+        new_games = []
+        for game in games:
+            key = self._game_key(game)
+            if key not in self._catalog_keys:
+                self._catalog_keys.add(key)
+                new_games.append(game)
+        self.game_grid.append_items(new_games)
+        return new_games
+
+    @staticmethod
+    def _game_key(game):
+        return game.get("app_id") or game.get("app_url")
+
+    def load_recent_games(self):
+        try:
+            return self.store.recent_games(RECENT_GAMES_SHOWN)
+        except Exception as e:
+            print(f"Error loading recent games: {e}")
+        return []
+
+    def save_recent_game(self, game):
+        # Remove if already exists to move to front
+        self.recent_games = [g for g in self.recent_games if g['app_url'] != game['app_url']]
+        # Add to front
+        self.recent_games.insert(0, game)
+        self.recent_games = self.recent_games[:RECENT_GAMES_SHOWN]
+        # Play count and time go to the full history in the background
+        self.store.record_play(game)
+
+    def clear_recent_games(self):
+        self.recent_games = []
+        self.store.clear_history()
+        self._refresh_recent_section()
+
+    def _build_games_view(self):
+        view = ctk.CTkFrame(self.main_content, fg_color="transparent")
+        view.grid(row=0, column=0, columnspan=4, sticky="nsew")
+        view.grid_columnconfigure(0, weight=1)
+        view.grid_rowconfigure(2, weight=1)
+
+        self.loading_label = ctk.CTkLabel(view, text="Loading games from Yandex...", font=ctk.CTkFont(size=16))
+
+        self.no_games_frame = ctk.CTkFrame(view, fg_color="transparent")
+        self.no_games_frame.grid(row=1, column=0, pady=100)
+        self.no_games_frame.grid_remove()
+
+        no_games_label = ctk.CTkLabel(self.no_games_frame, text="No games found or connection error.", font=ctk.CTkFont(size=16))
+        no_games_label.pack(pady=10)
+
+        retry_button = ctk.CTkButton(self.no_games_frame, text="Retry", command=self.load_games_async)
+        retry_button.pack(pady=10)
+
+        # Only cards near the viewport exist; they are rebound while scrolling
+        self.game_grid = VirtualGrid(
+            view,
+            card_factory=lambda parent, game, index: self.create_game_card(parent, game, priority=index - self.game_grid.first_visible),
+            bind_card=lambda card, game, index: self.update_game_card(card, game, priority=index - self.game_grid.first_visible),
+            key=self._game_key,
+            on_need_more=self.load_more_games,
+            on_render=self._next_thumb_generation
+        )
+        self.game_grid.grid(row=2, column=0, sticky="nsew")
+
+        # Sections above the grid scroll together with it
+        header = ctk.CTkFrame(self.game_grid.canvas, fg_color=("#F2F4F5", "#1B1D1F"), corner_radius=0)
+        header.grid_columnconfigure(0, weight=1)
+
+        # --- Recently Played Section ---
+        self.recent_header = ctk.CTkFrame(header, fg_color="transparent")
+        self.recent_header.grid(row=0, column=0, padx=20, pady=(20, 10), sticky="ew")
+        self.recent_header.grid_remove()
+
+        recent_label = ctk.CTkLabel(self.recent_header, text="Recently Played", font=ctk.CTkFont(size=20, weight="bold"))
+        recent_label.pack(side="left")
+
+        clear_btn = ctk.CTkButton(self.recent_header, text="Clear History", width=100, height=28,
+                                 fg_color="transparent", border_width=1, border_color="gray",
+                                 text_color=("gray20", "gray80"), hover_color=("#E5E5E5", "#393B3D"),
+                                 command=self.clear_recent_games)
+        clear_btn.pack(side="right")
+
+        self.recent_scroll = ctk.CTkScrollableFrame(header, height=350, orientation="horizontal", fg_color="transparent")
+        self.recent_scroll.grid(row=1, column=0, sticky="ew", padx=10)
+        self.recent_scroll.grid_remove()
+
+        # --- All Games Section ---
+        self.all_games_label = ctk.CTkLabel(header, text="Recommended for You", font=ctk.CTkFont(size=20, weight="bold"))
+        self.all_games_label.grid(row=2, column=0, padx=20, pady=(20, 10), sticky="w")
+        self.all_games_label.grid_remove()
+
+        self.game_grid.set_header(header)
+        return view
+
+    def _next_thumb_generation(self):
+        self._thumb_generation += 1
+
+    def display_games(self, games):
+        with perf.span("ui.display_games", games=len(games)):
+            self._display_games(games)
+
+    def _display_games(self, games):
+        if "games" not in self.views:
+            self._show_view("games")
+        self.loading_label.grid_remove()
+        self._thumb_generation += 1
+
+        if not games and not self.recent_games:
+            self.no_games_frame.grid()
+        else:
+            self.no_games_frame.grid_remove()
+
+        self._refresh_recent_section()
+
+        if games:
+            self.all_games_label.grid()
+        else:
+            self.all_games_label.grid_remove()
+        self._catalog_keys = {self._game_key(g) for g in games}
+        self.game_grid.set_items(games)
+
+    def _refresh_recent_section(self):
+        if "games" not in self.views:
+            return
+        if self.recent_games:
+            self.recent_header.grid()
+            self.recent_scroll.grid()
+        else:
+            self.recent_header.grid_remove()
+            self.recent_scroll.grid_remove()
+        self._recent_cards = self._reconcile_cards(self.recent_scroll, self._recent_cards, self.recent_games)
+
+    def _reconcile_cards(self, parent, pool, games):
+        """ Reuse cards from pool by app_id, create only new ones and destroy the rest """
+        cards = {}
+        for game in games:
+            key = self._game_key(game)
+            if key in cards:
+                continue
+            card = pool.pop(key, None)
+            if card is None:
+                card = self.create_game_card(parent, game, priority=len(cards))
+            else:
+                self.update_game_card(card, game, priority=len(cards))
+            card.grid(row=0, column=len(cards), padx=10, pady=5)
+            cards[key] = card
+        for card in pool.values():
+            card.destroy()
+        return cards
+
+    def create_game_card(self, parent, game, priority=0):
+        with perf.span("ui.card"):
+            return self._create_game_card(parent, game, priority)
+
+    def _create_game_card(self, parent, game, priority=0):
+        card = ctk.CTkFrame(parent, width=200, height=320, fg_color=("#FFFFFF", "#232527"), corner_radius=10)
+        card.game = game
+        
+        # Game thumbnail
+        thumb_label = ctk.CTkLabel(card, text="⌛", font=ctk.CTkFont(size=50), width=180, height=140, fg_color=("#E5E5E5", "#393B3D"), corner_radius=8)
+        thumb_label.pack(pady=10, padx=10)
+        thumb_label.thumb_url = None
+        thumb_label.thumb_ticket = None
+        # Карточка уничтожена — загрузка миниатюры больше не нужна
+        thumb_label.bind("<Destroy>", lambda e: thumb_label.thumb_ticket and thumb_label.thumb_ticket.cancel(), add="+")
+        card.thumb_label = thumb_label
+        
+        self._request_thumbnail(thumb_url(game), thumb_label, priority)
+        
+        card.name_label = ctk.CTkLabel(card, text=game["name"], font=ctk.CTkFont(size=14, weight="bold"), text_color=("#000000", "#FFFFFF"), wraplength=160, height=40)
+        card.name_label.pack(pady=2, padx=10, anchor="w")
+        
+        card.id_label = ctk.CTkLabel(card, text=f"ID: {game.get('app_id', '???')}", font=ctk.CTkFont(size=10), text_color="gray")
+        card.id_label.pack(pady=0, padx=10, anchor="w")
+        
+        card.stats_label = ctk.CTkLabel(card, text=f"⭐ {game['rating']}  👤 {game['plays']}", font=ctk.CTkFont(size=11), text_color="gray")
+        card.stats_label.pack(pady=2, padx=10, anchor="w")
+
+        play_button = ctk.CTkButton(card, text="Play", height=35, fg_color="#00A2FF", hover_color="#0082CC", text_color="white", font=ctk.CTkFont(weight="bold"), command=lambda: self.play_game(card.game))
+        play_button.pack(pady=(10, 15), padx=10, fill="x")
+        
+        return card
+
+    def update_game_card(self, card, game, priority=0):
+        old = card.game
+        card.game = game
+        if old == game:
+            return
+        if old["name"] != game["name"]:
+            card.name_label.configure(text=game["name"])
+        if old.get("app_id") != game.get("app_id"):
+            card.id_label.configure(text=f"ID: {game.get('app_id', '???')}")
+        if (old["rating"], old["plays"]) != (game["rating"], game["plays"]):
+            card.stats_label.configure(text=f"⭐ {game['rating']}  👤 {game['plays']}")
+        if old.get("thumb_url") != game.get("thumb_url"):
+            card.thumb_label.configure(image=self._blank_thumb, text="⌛")
+            self._request_thumbnail(thumb_url(game), card.thumb_label, priority)
+
+    def play_game(self, game):
+        url = game["app_url"]
+        title = game["name"]
+        print(f"Opening game: {title} at {url}")
+        
+        # Save to recent games
+        self.save_recent_game(game)
+        
+        # Refresh only the history strip, the grid stays as it is
+        self._refresh_recent_section()
+
+        adblock_enabled = self.settings.get("adblock_enabled", True)
+        # Pre-warmed browser host first: no interpreter start, no adblock build
+        if self.browser_host is not None:
+            with perf.span("browser.host_open") as span:
+                opened = self.browser_host.open_game(url, title, adblock_enabled)
+                span.set(ok=opened)
+            if opened:
+                return
+
+        # Launch the browser in a SEPARATE PROCESS for stability and to fix white screen
+        import subprocess
+        try:
+            args = self._browser_command("--browser", "--url", url, "--title", title, *self._browser_flags())
+            if perf.tracer.enabled:
+                # The game window reports its start-up time against this
+                args += ["--spawn-ts", f"{time.time():.6f}"]
+
+            print(f"Launching browser process: {args}")
+            subprocess.Popen(args)
+        except Exception as e:
+            print(f"Browser process error: {e}")
+            webbrowser.open(url)
+
+    def _request_thumbnail(self, url, label, priority=0):
+        if label.thumb_ticket is not None:
+            label.thumb_ticket.cancel()
+            label.thumb_ticket = None
+        label.thumb_url = url
+        if url is None:
+            label.configure(image=self._blank_thumb, text="🎮")
+            return
+
+        ctk_img = self.image_cache.get((url, THUMB_SIZE))
+        if ctk_img is not None:
+            label.configure(image=ctk_img, text="")
+            return
+
+        label.thumb_ticket = self.thumb_scheduler.submit(url, lambda thumb: self.after(0, lambda: self._apply_thumbnail(label, url, thumb)),
+                                                         priority=(-self._thumb_generation, priority))
+
+    def _apply_thumbnail(self, label, url, thumb):
+        # Card destroyed or already showing a different game
+        if not label.winfo_exists() or label.thumb_url != url:
+            return
+        if thumb is None:
+            label.configure(image=self._blank_thumb, text="🎮")
+            return
+        key = (url, THUMB_SIZE)
+        # Another card with the same URL may have wrapped this image already
+        ctk_img = self.image_cache.get(key)
+        if ctk_img is None:
+            # Decoded and resized in the pool: here the buffer is only wrapped
+            img = thumb.image()
+            ctk_img = ctk.CTkImage(light_image=img, dark_image=img, size=THUMB_SIZE)
+            self.image_cache.put(key, ctk_img, ImageCache.estimate_cost(THUMB_SIZE))
+        label.configure(image=ctk_img, text="")
+
+    def toggle_diagnostics_panel(self, event=None):
+        if self.diagnostics_panel is None or not self.diagnostics_panel.winfo_exists():
+            from diagnostics import DiagnosticsPanel
+            self.diagnostics_panel = DiagnosticsPanel(self, on_toggle=self.toggle_tracing)
+        elif self.diagnostics_panel.winfo_viewable():
+            self.diagnostics_panel.withdraw()
+        else:
+            self.diagnostics_panel.show()
+
+    def toggle_tracing(self, value):
+        self.settings["diagnostics_enabled"] = bool(value)
+        self.save_settings()
+        if value and not perf.tracer.enabled:
+            perf.tracer.configure(perf.trace_path("app"), process="app")
+        elif not value:
+            perf.tracer.disable()
+        self.diagnostics_panel.refresh()
+
+    def change_appearance_mode_event(self, new_appearance_mode: str):
+        ctk.set_appearance_mode(new_appearance_mode)
+
+    def dummy_command(self):
+        print("Button clicked!")
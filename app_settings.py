@@ -0,0 +1,62 @@
+import os
+
+from store import LocalStore
+
+# Shared by the launcher and the headless cli.py: no UI imports here
+
+DEFAULT_SETTINGS = {
+    "adblock_enabled": True,
+    "theme": "Dark",
+    # Seconds a cached catalog page is served without revalidation
+    "catalog_cache_ttl": 600,
+    # Seconds a stale catalog page may still be shown while revalidating
+    "catalog_cache_max_stale": 86400,
+    "thumbnail_workers": 6,
+    "thumbnail_cache_mb": 64,
+    # Processes decoding and resizing thumbnails: null picks up to 4, 0 decodes in the download threads
+    "thumbnail_decode_processes": None,
+    "image_cache_mb": 32,
+    # Каталог можно направить на локальный сервер (см. benchmarks/run.py)
+    "catalog_base_url": "https://yandex.ru/games",
+    # Keep one browser process running and open games in it
+    "browser_host_enabled": False,
+    # Game windows go through a local proxy (asset_proxy.py) that keeps their assets on disk
+    "asset_proxy_enabled": False,
+    "asset_cache_mb": 512,
+    # Crawl every catalog section in the background into the local catalog
+    "catalog_crawl_enabled": True,
+    # Seconds before a crawled section is fetched again
+    "catalog_crawl_ttl": 43200,
+    "catalog_crawl_delay": 1.0,
+    # Timings of the launcher and game windows (Ctrl+Shift+D)
+    "diagnostics_enabled": False,
+    # Record Tk callbacks that block the window longer than the threshold
+    "watchdog_enabled": False,
+    "watchdog_threshold_ms": 100
+}
+
+
+def appdata_path(*parts):
+    return os.path.join(os.environ.get('APPDATA', os.path.expanduser('~')), *parts)
+
+
+def data_dir():
+    return appdata_path("Yblox")
+
+
+def open_store():
+    """ The launcher database; earlier versions' JSON files are imported on first use """
+    store = LocalStore(os.path.join(data_dir(), "Yblox.db"))
+    store.migrate_json(appdata_path("Yblox_settings.json"), appdata_path("Yblox_recent.json"),
+                       os.path.join(data_dir(), "catalog"), os.path.join(data_dir(), "thumbs"))
+    return store
+
+
+def load_settings(store):
+    settings = dict(DEFAULT_SETTINGS)
+    try:
+        # Update defaults with saved settings to handle new keys
+        settings.update(store.get_settings())
+    except Exception as e:
+        print(f"Error loading settings: {e}")
+    return settings
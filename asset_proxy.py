@@ -0,0 +1,701 @@
+import asyncio
+import contextlib
+import hashlib
+import http.client
+import os
+import sys
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from io import BytesIO
+from urllib.parse import urlsplit
+
+import perf
+
+# Local proxy of the game window (WebView2 --proxy-server), see browser.py
+
+# Hop-by-hop headers (RFC 9110 7.6.1): never forwarded, never stored
+HOP_BY_HOP = frozenset(("connection", "keep-alive", "proxy-connection", "proxy-authenticate",
+                        "proxy-authorization", "te", "trailer", "transfer-encoding", "upgrade"))
+# Not replayed from the cache: framing is recomputed, Age and Date describe the original response
+NOT_STORED = HOP_BY_HOP | {"content-length", "set-cookie", "set-cookie2", "age"}
+CONDITIONALS = ("If-None-Match", "If-Modified-Since")
+
+# Freshness without explicit expiry (RFC 9111 4.2.2): a tenth of the time since Last-Modified, at most a day
+HEURISTIC_FRACTION = 0.1
+HEURISTIC_MAX = 86400
+
+CHUNK = 256 * 1024
+TIMEOUT = 30
+
+
+def parse_cache_control(value):
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip().strip('"')
+    return directives
+
+
+def http_date(value):
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def freshness_lifetime(headers, now):
+    """ Seconds a response stays fresh in a private cache (RFC 9111 4.2.1) """
+    cc = parse_cache_control(headers.get("Cache-Control"))
+    if "no-cache" in cc:
+        return 0
+    if "max-age" in cc:
+        try:
+            return max(0, int(cc["max-age"]))
+        except ValueError:
+            return 0
+    date = http_date(headers.get("Date")) or now
+    if headers.get("Expires") is not None:
+        expires = http_date(headers.get("Expires"))
+        return max(0, expires - date) if expires is not None else 0
+    last_modified = http_date(headers.get("Last-Modified"))
+    if last_modified is not None and last_modified < date:
+        return min(HEURISTIC_MAX, (date - last_modified) * HEURISTIC_FRACTION)
+    return 0
+
+
+def is_storable(headers):
+    """ Whether a 200 response to a plain GET may be kept """
+    if "no-store" in parse_cache_control(headers.get("Cache-Control")):
+        return False
+    # Variants are keyed by Accept-Encoding only
+    vary = {v.strip().lower() for v in headers.get("Vary", "").split(",") if v.strip()}
+    if vary - {"accept-encoding"}:
+        return False
+    return bool(headers.get("ETag") or headers.get("Last-Modified") or freshness_lifetime(headers, time.time()))
+
+
+def _header_list(headers):
+    return [[name, value] for name, value in headers.items() if name.lower() not in NOT_STORED]
+
+
+def _get(header_list, name):
+    name = name.lower()
+    return next((value for key, value in header_list if key.lower() == name), None)
+
+
+@contextlib.contextmanager
+def _locked(path):
+    """ Exclusive lock across processes for the with block """
+    with open(path, "a+b") as f:
+        f.seek(0)
+        if sys.platform == "win32":
+            import msvcrt
+            # Retries for about ten seconds, then OSError
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if sys.platform == "win32":
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            # flock is released when the file closes
+
+
+class AssetCache:
+    """
+    Responses to plain GETs, shared by every game process. Bodies are files
+    named by the SHA-256 of URL and Accept-Encoding; the assets table of the
+    LocalStore keeps their headers, expiry and last access, so lookups and
+    LRU eviction down to max_bytes never have to list the directory. Each
+    process looks up in its own copy of the table; eviction goes by the
+    table itself (_evict).
+    """
+
+    def __init__(self, directory, store, max_bytes=512 * 1024 * 1024, max_entry_bytes=None):
+        self.directory = directory
+        self.store = store
+        self.max_bytes = max_bytes
+        # One bundle may not push everything else out
+        self.max_entry_bytes = max_entry_bytes or max_bytes // 4
+        self._lock = threading.Lock()
+        self._touched = {}
+        os.makedirs(directory, exist_ok=True)
+        self._evict_lock = threading.Lock()
+        self.lock_path = directory.rstrip("/\\") + ".lock"
+        self._index = store.asset_index()
+
+    @staticmethod
+    def key(url, accept_encoding=""):
+        return hashlib.sha256(f"{url}\n{accept_encoding.strip().lower()}".encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is not None:
+                entry["atime"] = time.time()
+                self._touched[key] = entry["atime"]
+            return entry
+
+    def open(self, key, entry):
+        """ Body file of entry, or None when it is gone (the entry is then dropped) """
+        try:
+            return open(os.path.join(self.directory, entry["file"]), "rb")
+        except OSError:
+            self.remove(key)
+            return None
+
+    def temp_path(self, key):
+        return os.path.join(self.directory, f"{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+    def put(self, key, entry, tmp_path):
+        """
+        Move a fully written body in place and index it. Waits on the other
+        game processes and on the store, so the proxy calls it off its loop.
+        """
+        entry = dict(entry, file=key, atime=time.time())
+        try:
+            os.replace(tmp_path, os.path.join(self.directory, key))
+        except OSError as e:
+            print(f"Error saving asset cache entry: {e}")
+            return
+        with self._lock:
+            self._index[key] = entry
+        self.store.put_asset(key, entry)
+        self._evict()
+
+    def refresh(self, key, headers, stored_at, expires):
+        """ After a 304: the new headers replace the stored ones of the same name """
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+            updated = {name.lower(): [name, value] for name, value in _header_list(headers)}
+            entry["headers"] = [updated.pop(name.lower(), [name, value]) for name, value in entry["headers"]]
+            entry["headers"] += list(updated.values())
+            entry.update(stored_at=stored_at, expires=expires)
+            entry = dict(entry)
+        self.store.put_asset(key, entry)
+        return entry
+
+    def remove(self, key):
+        with self._lock:
+            entry = self._index.pop(key, None)
+            if entry is None:
+                return
+            self._touched.pop(key, None)
+        self._delete({key: entry["file"]})
+
+    def _evict(self):
+        """
+        Every game process fills the same directory and its _index only knows
+        what it has seen, so the total and the LRU victims come from the
+        committed assets table, one process at a time under lock_path.
+        """
+        try:
+            with self._evict_lock, _locked(self.lock_path):
+                # Our own entries and access times count too
+                self.flush()
+                self.store.flush()
+                rows = self.store.asset_sizes()
+                total = sum(size for _, _, size in rows)
+                evicted = {}
+                for key, name, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    evicted[key] = name
+                    total -= size
+                with self._lock:
+                    for key in evicted:
+                        self._index.pop(key, None)
+                        self._touched.pop(key, None)
+                self._delete(evicted)
+                # Committed before the next process looks
+                self.store.flush()
+        except OSError as e:
+            print(f"Asset cache eviction skipped: {e}")
+
+    def _delete(self, files):
+        if not files:
+            return
+        self.store.delete_assets(list(files))
+        for name in files.values():
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    def total_bytes(self):
+        """ Committed size of the directory, every process included """
+        return sum(size for _, _, size in self.store.asset_sizes())
+
+    def flush(self):
+        """ Queue the access times collected since the last flush """
+        with self._lock:
+            touched, self._touched = self._touched, {}
+        if touched:
+            self.store.touch_assets(touched)
+
+
+class AssetProxy:
+    """
+    Forward HTTP proxy for the game window on its own asyncio loop.
+
+    Requests blocked(url) says yes to (netfilter.NetworkFilter.blocks) are
+    refused with 403 before anything leaves the machine. A CONNECT only shows
+    the host, so it is judged as https://host/: refused when every URL on
+    that host would be. HTTPS is otherwise tunnelled untouched, and WebView2
+    caches those bodies in its persistent profile. Plain HTTP GETs go through the AssetCache: fresh entries are served from disk, stale
+    ones are revalidated with their validators (and served stale if the
+    origin is unreachable), the rest is streamed to the window and stored on
+    the way when its headers allow it.
+    """
+
+    def __init__(self, cache=None, blocked=None, host="127.0.0.1", port=0, max_idle_per_origin=4):
+        self.cache = cache
+        self.blocked = blocked
+        self.host = host
+        self.port = port
+        self.max_idle_per_origin = max_idle_per_origin
+        self.loop = None
+        self._server = None
+        self._thread = None
+        self._idle = {}
+        self._clients = set()
+        self.stats = {"requests": 0, "hits": 0, "revalidated": 0, "misses": 0, "stored": 0, "blocked": 0,
+                      "tunnels": 0, "errors": 0, "bytes_from_cache": 0, "bytes_from_network": 0}
+
+    @property
+    def address(self):
+        return f"{self.host}:{self.port}"
+
+    def start(self):
+        ready = threading.Event()
+        errors = []
+
+        def run():
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            try:
+                self._server = self.loop.run_until_complete(asyncio.start_server(self._client, self.host, self.port))
+                self.port = self._server.sockets[0].getsockname()[1]
+            except OSError as e:
+                errors.append(e)
+                ready.set()
+                return
+            ready.set()
+            self.loop.run_forever()
+            # Connections still open at stop() were closed: let their handlers see it
+            tasks = asyncio.all_tasks(self.loop)
+            if tasks:
+                self.loop.run_until_complete(asyncio.wait(tasks, timeout=2))
+            self.loop.close()
+
+        self._thread = threading.Thread(target=run, name="asset-proxy", daemon=True)
+        self._thread.start()
+        ready.wait()
+        if errors:
+            raise errors[0]
+        return self
+
+    def stop(self):
+        def shutdown():
+            self._server.close()
+            for writer in self._clients:
+                writer.close()
+            for idle in self._idle.values():
+                for _, writer in idle:
+                    writer.close()
+            self._idle.clear()
+            self.loop.stop()
+
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(shutdown)
+            self._thread.join(timeout=5)
+        if self.cache is not None:
+            self.cache.flush()
+
+    def _count(self, name, value=1):
+        self.stats[name] += value
+        if not name.startswith("bytes"):
+            perf.count(f"proxy.{name}", value)
+
+    # --- Client side ---
+
+    async def _client(self, reader, writer):
+        self._clients.add(writer)
+        try:
+            while True:
+                request = await self._read_head(reader)
+                if request is None:
+                    break
+                method, target, version, headers = request
+                self._count("requests")
+                if method == "CONNECT":
+                    await self._tunnel(target, reader, writer)
+                    break
+                keep = version == "HTTP/1.1" and "close" not in headers.get("Connection", "").lower()
+                body = await self._read_request_body(reader, headers)
+                if not await self._handle(method, target, headers, body, writer, keep):
+                    break
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError):
+            pass
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+    @staticmethod
+    async def _read_head(reader):
+        line = await reader.readline()
+        if not line.strip():
+            return None
+        method, target, version = line.decode("latin-1").split()
+        raw = bytearray()
+        while True:
+            line = await asyncio.wait_for(reader.readline(), TIMEOUT)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            raw += line
+        return method.upper(), target, version.upper(), http.client.parse_headers(BytesIO(bytes(raw) + b"\r\n"))
+
+    @staticmethod
+    async def _read_request_body(reader, headers):
+        if "chunked" in headers.get("Transfer-Encoding", "").lower():
+            body = bytearray()
+            async for chunk in _chunked(reader):
+                body += chunk
+            return bytes(body)
+        length = int(headers.get("Content-Length") or 0)
+        return await reader.readexactly(length) if length else b""
+
+    async def _respond(self, writer, status, reason, header_list=(), body=b"", keep=True):
+        lines = [f"HTTP/1.1 {status} {reason}"]
+        lines += [f"{name}: {value}" for name, value in header_list]
+        lines += [f"Content-Length: {len(body)}", f"Connection: {'keep-alive' if keep else 'close'}"]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+        return keep
+
+    async def _tunnel(self, target, reader, writer):
+        host, _, port = target.rpartition(":")
+        host = host.strip("[]").lower()
+        if self.blocked is not None and self.blocked(f"https://{target}/"):
+            self._count("blocked")
+            await self._respond(writer, 403, "Forbidden", keep=False)
+            return
+        try:
+            up_reader, up_writer = await asyncio.wait_for(asyncio.open_connection(host, int(port or 443)), TIMEOUT)
+        except (OSError, asyncio.TimeoutError, ValueError):
+            self._count("errors")
+            await self._respond(writer, 502, "Bad Gateway", keep=False)
+            return
+        self._count("tunnels")
+        writer.write(b"HTTP/1.1 200 Connection Established\r\n\r\n")
+        await writer.drain()
+        await asyncio.gather(_pipe(reader, up_writer), _pipe(up_reader, writer))
+
+    async def _handle(self, method, target, headers, body, writer, keep):
+        parts = urlsplit(target)
+        if parts.scheme != "http" or not parts.hostname:
+            return await self._respond(writer, 400, "Bad Request", keep=False)
+        if self.blocked is not None and self.blocked(target):
+            self._count("blocked")
+            return await self._respond(writer, 403, "Forbidden", keep=keep)
+
+        request_cc = parse_cache_control(headers.get("Cache-Control"))
+        cacheable = (self.cache is not None and method == "GET" and not body and "no-store" not in request_cc
+                     and "Range" not in headers and "Authorization" not in headers)
+        if not cacheable:
+            return await self._forward(method, parts, headers, body, writer, keep)
+
+        key = self.cache.key(target, headers.get("Accept-Encoding", ""))
+        entry = self.cache.get(key)
+        reload = "no-cache" in request_cc or "no-cache" in headers.get("Pragma", "").lower()
+        if entry is not None and time.time() < entry["expires"] and not reload:
+            served = await self._serve_cached(key, entry, headers, writer, keep)
+            if served is not None:
+                self._count("hits")
+                return served
+            entry = None
+        return await self._fetch_into_cache(key, entry, parts, headers, writer, keep)
+
+    async def _serve_cached(self, key, entry, request_headers, writer, keep):
+        """ keep, or None when the body file is gone """
+        if _client_is_current(request_headers, entry["headers"]):
+            return await self._respond(writer, 304, "Not Modified", entry["headers"], keep=keep)
+        f = self.cache.open(key, entry)
+        if f is None:
+            return None
+        with f:
+            age = max(0, int(time.time() - entry["stored_at"]))
+            lines = ["HTTP/1.1 200 OK"] + [f"{name}: {value}" for name, value in entry["headers"]]
+            lines += [f"Age: {age}", f"Content-Length: {entry['size']}", f"Connection: {'keep-alive' if keep else 'close'}"]
+            writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+            while True:
+                data = f.read(CHUNK)
+                if not data:
+                    break
+                writer.write(data)
+                self.stats["bytes_from_cache"] += len(data)
+                await writer.drain()
+        return keep
+
+    async def _fetch_into_cache(self, key, entry, parts, request_headers, writer, keep):
+        upstream_headers = [(name, value) for name, value in request_headers.items() if name not in CONDITIONALS]
+        if entry is not None:
+            # Our validators, not the window's: a 304 then refreshes the stored entry
+            if _get(entry["headers"], "ETag"):
+                upstream_headers.append(("If-None-Match", _get(entry["headers"], "ETag")))
+            if _get(entry["headers"], "Last-Modified"):
+                upstream_headers.append(("If-Modified-Since", _get(entry["headers"], "Last-Modified")))
+        try:
+            response = await self._exchange("GET", parts, upstream_headers, b"")
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+            self._count("errors")
+            if entry is not None:
+                # Origin unreachable: the stale copy beats an error page
+                served = await self._serve_cached(key, entry, request_headers, writer, keep)
+                if served is not None:
+                    return served
+            return await self._respond(writer, 502, "Bad Gateway", keep=keep)
+        status, reason, headers, chunks = response
+        now = time.time()
+        stored_at = now - _age(headers)
+
+        if status == 304 and entry is not None:
+            async for _ in chunks:
+                pass
+            self._count("revalidated")
+            entry = self.cache.refresh(key, headers, stored_at, stored_at + freshness_lifetime(headers, now))
+            if entry is not None:
+                served = await self._serve_cached(key, entry, request_headers, writer, keep)
+                if served is not None:
+                    return served
+            # Dropped meanwhile: once more without validators
+            return await self._fetch_into_cache(key, None, parts, request_headers, writer, keep)
+
+        self._count("misses")
+        length = headers.get("Content-Length")
+        store = status == 200 and is_storable(headers) and \
+            (length is None or int(length) <= self.cache.max_entry_bytes)
+        header_list = _header_list(headers)
+        entry = {"url": parts.geturl(), "headers": header_list, "stored_at": stored_at,
+                 "expires": stored_at + freshness_lifetime(headers, now), "size": 0}
+        # The window sent validators we stripped: it gets a 304 if the new copy is what it has
+        quiet = store and _client_is_current(request_headers, header_list)
+        tmp_path = self.cache.temp_path(key) if store else None
+        out = open(tmp_path, "wb") if store else None
+        try:
+            if not quiet:
+                await self._write_head(writer, status, reason, headers, keep)
+            async for data in chunks:
+                self.stats["bytes_from_network"] += len(data)
+                if out is not None:
+                    entry["size"] += len(data)
+                    if entry["size"] > self.cache.max_entry_bytes:
+                        out.close()
+                        out = None
+                        os.remove(tmp_path)
+                    else:
+                        out.write(data)
+                if not quiet:
+                    await self._write_body(writer, headers, data)
+            if not quiet:
+                await self._write_body(writer, headers, b"", end=True)
+            if out is not None:
+                out.close()
+                out = None
+                await self.loop.run_in_executor(None, self.cache.put, key, entry, tmp_path)
+                self._count("stored")
+            elif quiet:
+                # Too big to keep after all: send it in full
+                return await self._forward("GET", parts, request_headers, b"", writer, keep)
+        finally:
+            if out is not None:
+                out.close()
+                os.remove(tmp_path)
+        if quiet:
+            return await self._respond(writer, 304, "Not Modified", header_list, keep=keep)
+        return keep
+
+    async def _forward(self, method, parts, request_headers, body, writer, keep):
+        """ Relay without the cache """
+        try:
+            status, reason, headers, chunks = await self._exchange(method, parts, list(request_headers.items()), body)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+            self._count("errors")
+            return await self._respond(writer, 502, "Bad Gateway", keep=keep)
+        await self._write_head(writer, status, reason, headers, keep, head=method == "HEAD")
+        async for data in chunks:
+            self.stats["bytes_from_network"] += len(data)
+            await self._write_body(writer, headers, data)
+        await self._write_body(writer, headers, b"", end=True)
+        return keep
+
+    @staticmethod
+    async def _write_head(writer, status, reason, headers, keep, head=False):
+        lines = [f"HTTP/1.1 {status} {reason}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()
+                  if name.lower() not in HOP_BY_HOP and name.lower() != "content-length"]
+        if headers.get("Content-Length") is not None:
+            lines.append(f"Content-Length: {headers['Content-Length']}")
+        elif not head and _has_body(status):
+            # Re-chunked, so the window's connection survives a close-delimited body
+            lines.append("Transfer-Encoding: chunked")
+        lines.append(f"Connection: {'keep-alive' if keep else 'close'}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+    @staticmethod
+    async def _write_body(writer, headers, data, end=False):
+        chunked = headers.get("Content-Length") is None
+        if chunked and (data or end):
+            writer.write(f"{len(data):X}\r\n".encode("latin-1") + data + b"\r\n")
+        elif data:
+            writer.write(data)
+        await writer.drain()
+
+    # --- Origin side ---
+
+    async def _exchange(self, method, parts, header_items, body):
+        """ (status, reason, headers, async iterator over the body) from the origin """
+        origin = (parts.hostname, parts.port or 80)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {parts.netloc}"]
+        lines += [f"{name}: {value}" for name, value in header_items
+                  if name.lower() not in HOP_BY_HOP and name.lower() not in ("host", "content-length")]
+        if body:
+            lines.append(f"Content-Length: {len(body)}")
+        lines.append("Connection: keep-alive")
+        request = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+        conn = self._take_idle(origin)
+        reused = conn is not None
+        if conn is None:
+            conn = await asyncio.wait_for(asyncio.open_connection(*origin), TIMEOUT)
+        reader, writer = conn
+        try:
+            writer.write(request)
+            await writer.drain()
+            status_line = await asyncio.wait_for(reader.readline(), TIMEOUT)
+            if not status_line and reused:
+                # The origin closed the idle connection meanwhile: once more on a new one
+                writer.close()
+                reader, writer = conn = await asyncio.wait_for(asyncio.open_connection(*origin), TIMEOUT)
+                writer.write(request)
+                await writer.drain()
+                status_line = await asyncio.wait_for(reader.readline(), TIMEOUT)
+            version, status, reason = (status_line.decode("latin-1").rstrip("\r\n").split(None, 2) + [""])[:3]
+            status = int(status)
+            raw = bytearray()
+            while True:
+                line = await asyncio.wait_for(reader.readline(), TIMEOUT)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                raw += line
+            headers = http.client.parse_headers(BytesIO(bytes(raw) + b"\r\n"))
+        except BaseException:
+            writer.close()
+            raise
+        reusable = version == "HTTP/1.1" and "close" not in headers.get("Connection", "").lower()
+        return status, reason, headers, self._body(conn, origin, method, status, headers, reusable)
+
+    async def _body(self, conn, origin, method, status, headers, reusable):
+        reader, writer = conn
+        complete = False
+        try:
+            if method == "HEAD" or not _has_body(status):
+                complete = True
+            elif "chunked" in headers.get("Transfer-Encoding", "").lower():
+                async for chunk in _chunked(reader):
+                    yield chunk
+                complete = True
+            elif headers.get("Content-Length") is not None:
+                remaining = int(headers["Content-Length"])
+                while remaining:
+                    data = await asyncio.wait_for(reader.read(min(CHUNK, remaining)), TIMEOUT)
+                    if not data:
+                        raise asyncio.IncompleteReadError(b"", remaining)
+                    remaining -= len(data)
+                    yield data
+                complete = True
+            else:
+                while True:
+                    data = await asyncio.wait_for(reader.read(CHUNK), TIMEOUT)
+                    if not data:
+                        break
+                    yield data
+        finally:
+            if complete and reusable:
+                self._put_idle(origin, conn)
+            else:
+                writer.close()
+
+    def _take_idle(self, origin):
+        idle = self._idle.get(origin, [])
+        while idle:
+            reader, writer = idle.pop()
+            if not reader.at_eof() and not writer.is_closing():
+                return reader, writer
+            writer.close()
+        return None
+
+    def _put_idle(self, origin, conn):
+        idle = self._idle.setdefault(origin, [])
+        if len(idle) < self.max_idle_per_origin:
+            idle.append(conn)
+        else:
+            conn[1].close()
+
+
+def _has_body(status):
+    return status not in (204, 304) and not 100 <= status < 200
+
+
+def _age(headers):
+    try:
+        return max(0, int(headers.get("Age") or 0))
+    except ValueError:
+        return 0
+
+
+def _client_is_current(request_headers, header_list):
+    """ Whether the window's own conditional request matches the stored response """
+    etag = _get(header_list, "ETag")
+    if_none_match = request_headers.get("If-None-Match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return etag is not None and ("*" in tags or etag.removeprefix("W/") in tags)
+    since = http_date(request_headers.get("If-Modified-Since"))
+    last_modified = http_date(_get(header_list, "Last-Modified"))
+    return since is not None and last_modified is not None and last_modified <= since
+
+
+async def _chunked(reader):
+    while True:
+        size = int((await asyncio.wait_for(reader.readline(), TIMEOUT)).split(b";")[0].strip() or b"0", 16)
+        if size == 0:
+            # Trailers up to the blank line
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            return
+        yield await reader.readexactly(size)
+        await reader.readline()
+
+
+async def _pipe(reader, writer):
+    try:
+        while True:
+            data = await reader.read(CHUNK)
+            if not data:
+                break
+            writer.write(data)
+            await writer.drain()
+    except (OSError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
@@ -0,0 +1,371 @@
+import asyncio
+import base64
+import gzip
+import http.client
+import socket
+import threading
+import zlib
+from io import BytesIO
+from urllib.parse import unquote, urljoin, urlsplit, urlunsplit
+from urllib.request import getproxies, proxy_bypass
+
+# Необязательный декодер Content-Encoding: br (pip install brotli)
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+REDIRECTS = (301, 302, 303, 307, 308)
+
+
+class HTTPResponse:
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        # http.client.HTTPMessage: case-insensitive get()
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self):
+        return self.content.decode(self.headers.get_content_charset() or "utf-8", errors="replace")
+
+
+class AsyncHTTPClient:
+    """
+    Small HTTP/1.1 GET client on asyncio streams, enough for catalog pages:
+    keep-alive connections per origin, chunked and gzip bodies, redirects.
+    Cancelling the task that awaits get() closes its connection, so an
+    abandoned request stops transferring at once.
+
+    Proxies are picked like requests does: HTTP(S)_PROXY or the system
+    settings (urllib.request.getproxies), except hosts NO_PROXY or the
+    bypass list exclude. Plain HTTP goes to the proxy with absolute URIs,
+    HTTPS through a CONNECT tunnel.
+    """
+
+    max_redirects = 5
+
+    def __init__(self, max_idle_per_origin=2):
+        self.max_idle_per_origin = max_idle_per_origin
+        self._idle = {}
+        self._ssl = None
+        self._proxies = getproxies()
+        self._bypass = {}
+        self.connections_opened = 0
+
+    async def get(self, url, headers=None, timeout=15):
+        for _ in range(self.max_redirects + 1):
+            response = await asyncio.wait_for(self._get_once(url, headers or {}), timeout)
+            location = response.headers.get("Location")
+            if response.status_code not in REDIRECTS or not location:
+                break
+            url = urljoin(url, location)
+        return response
+
+    def _ssl_context(self):
+        if self._ssl is None:
+            import ssl
+            self._ssl = ssl.create_default_context()
+        return self._ssl
+
+    def _proxy(self, parts):
+        """ urlsplit() of the proxy for this URL, or None to go direct """
+        proxy = self._proxies.get(parts.scheme) or self._proxies.get("all")
+        if not proxy:
+            return None
+        bypass = self._bypass.get(parts.hostname)
+        if bypass is None:
+            # On Windows this reads the registry: once per host
+            bypass = self._bypass[parts.hostname] = bool(proxy_bypass(parts.hostname))
+        if bypass:
+            return None
+        proxy = urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+        if proxy.scheme != "http":
+            raise OSError(f"Unsupported proxy: {proxy.geturl()}")
+        return proxy
+
+    async def _connect(self, origin, proxy=None):
+        scheme, host, port = origin
+        https = scheme == "https"
+        self.connections_opened += 1
+        if proxy is None:
+            return await asyncio.open_connection(host, port, ssl=self._ssl_context() if https else None,
+                                                 server_hostname=host if https else None)
+        if not https:
+            return await asyncio.open_connection(proxy.hostname, proxy.port or 8080)
+        # The tunnel is set up on a plain socket, then TLS to the origin goes over it
+        sock = await asyncio.get_running_loop().run_in_executor(None, _open_tunnel, proxy, host, port)
+        return await asyncio.open_connection(sock=sock, ssl=self._ssl_context(), server_hostname=host)
+
+    def _take_idle(self, origin):
+        idle = self._idle.get(origin, [])
+        while idle:
+            reader, writer = idle.pop()
+            if not reader.at_eof() and not writer.is_closing():
+                return reader, writer
+            writer.close()
+        return None
+
+    def _put_idle(self, origin, conn):
+        idle = self._idle.setdefault(origin, [])
+        if len(idle) < self.max_idle_per_origin:
+            idle.append(conn)
+        else:
+            conn[1].close()
+
+    async def _get_once(self, url, headers):
+        parts = urlsplit(url)
+        origin = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        proxy = self._proxy(parts)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        pool = origin
+        auth = None
+        if proxy is not None and parts.scheme == "http":
+            # Any plain HTTP origin over the same proxy connections
+            target = urlunsplit((parts.scheme, parts.netloc, parts.path or "/", parts.query, ""))
+            pool = ("proxy", proxy.hostname, proxy.port or 8080)
+            auth = _proxy_auth(proxy)
+        lines = [f"GET {target} HTTP/1.1", f"Host: {parts.netloc}"]
+        if auth:
+            lines.append(f"Proxy-Authorization: {auth}")
+        lines += [f"{name}: {value}" for name, value in headers.items() if name.lower() != "host"]
+        request = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+        conn = self._take_idle(pool)
+        reused = conn is not None
+        if conn is None:
+            conn = await self._connect(origin, proxy)
+        reader, writer = conn
+        keep = False
+        try:
+            writer.write(request)
+            await writer.drain()
+            status_line = await reader.readline()
+            if not status_line and reused:
+                # The server closed the idle connection meanwhile: once more on a new one
+                writer.close()
+                reader, writer = conn = await self._connect(origin, proxy)
+                writer.write(request)
+                await writer.drain()
+                status_line = await reader.readline()
+            version, status = status_line.decode("latin-1").split(None, 2)[:2]
+            status = int(status)
+            raw_headers = bytearray()
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                raw_headers += line
+            response_headers = http.client.parse_headers(BytesIO(bytes(raw_headers) + b"\r\n"))
+            body, complete = await self._read_body(reader, response_headers, status)
+            keep = complete and version == "HTTP/1.1" and response_headers.get("Connection", "").lower() != "close"
+            return HTTPResponse(url, status, response_headers, _decode(body, response_headers.get("Content-Encoding")))
+        finally:
+            if keep:
+                self._put_idle(pool, conn)
+            else:
+                writer.close()
+
+    @staticmethod
+    async def _read_body(reader, headers, status):
+        """ Body and whether its end was known without waiting for the connection to close """
+        if status in (204, 304) or 100 <= status < 200:
+            return b"", True
+        if "chunked" in headers.get("Transfer-Encoding", "").lower():
+            body = bytearray()
+            while True:
+                size = int((await reader.readline()).split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    # Trailers up to the blank line
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    return bytes(body), True
+                body += await reader.readexactly(size)
+                await reader.readline()
+        length = headers.get("Content-Length")
+        if length is not None:
+            return await reader.readexactly(int(length)), True
+        return await reader.read(), False
+
+    def close(self):
+        for idle in self._idle.values():
+            for _, writer in idle:
+                writer.close()
+        self._idle.clear()
+
+
+def _proxy_auth(proxy):
+    """ Proxy-Authorization for user:password in the proxy URL """
+    if proxy.username is None:
+        return None
+    credentials = f"{unquote(proxy.username)}:{unquote(proxy.password or '')}"
+    return "Basic " + base64.b64encode(credentials.encode("utf-8")).decode("ascii")
+
+
+def _open_tunnel(proxy, host, port, timeout=15):
+    """ Blocking: a socket to proxy on which CONNECT host:port succeeded (run on an executor) """
+    sock = socket.create_connection((proxy.hostname, proxy.port or 8080), timeout)
+    try:
+        authority = f"[{host}]:{port}" if ":" in host else f"{host}:{port}"
+        lines = [f"CONNECT {authority} HTTP/1.1", f"Host: {authority}"]
+        auth = _proxy_auth(proxy)
+        if auth:
+            lines.append(f"Proxy-Authorization: {auth}")
+        sock.sendall(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        head = b""
+        while b"\r\n\r\n" not in head:
+            data = sock.recv(4096)
+            if not data:
+                raise ConnectionError(f"Proxy closed the connection on CONNECT {authority}")
+            head += data
+        status_line = head.split(b"\r\n", 1)[0].decode("latin-1")
+        if status_line.split(None, 2)[1:2] != ["200"]:
+            raise ConnectionError(f"Proxy refused CONNECT {authority}: {status_line}")
+        sock.settimeout(None)
+        return sock
+    except BaseException:
+        sock.close()
+        raise
+
+
+def _decode(body, encoding):
+    encoding = (encoding or "").lower()
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "br" and brotli is not None:
+        return brotli.decompress(body)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+    return body
+
+
+class Token:
+    """ One generation of a view; results for older generations are dropped """
+
+    __slots__ = ("view", "generation")
+
+    def __init__(self, view, generation):
+        self.view = view
+        self.generation = generation
+
+    def __repr__(self):
+        return f"Token({self.view!r}, {self.generation})"
+
+
+class _Flight:
+    def __init__(self, task):
+        self.task = task
+        # (token, callback) of every request waiting for this result
+        self.waiters = []
+
+
+class AsyncLoader:
+    """
+    Owns all catalog I/O on one asyncio event loop in a background thread.
+
+    The UI starts a generation of a view with begin(view) and submits work
+    under the returned token. Requests with the same key share one running
+    coroutine; when every request of a key belongs to an old generation, the
+    coroutine is cancelled, which also aborts its network I/O. Callbacks run
+    through deliver (the Tk thread) and only while their token is current,
+    so a slow old response never reaches the widgets.
+    """
+
+    def __init__(self, deliver):
+        self.deliver = deliver
+        self.http = AsyncHTTPClient()
+        self.loop = asyncio.new_event_loop()
+        self._generations = {}
+        self._flights = {}
+        self.stats = {"started": 0, "merged": 0, "cancelled": 0, "delivered": 0, "dropped": 0}
+        self._thread = threading.Thread(target=self._run, name="catalog-io", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def begin(self, view):
+        """ New generation of view; everything older for it is abandoned """
+        generation = self._generations.get(view, 0) + 1
+        self._generations[view] = generation
+        self.loop.call_soon_threadsafe(self._abandon_stale)
+        return Token(view, generation)
+
+    def is_current(self, token):
+        return token is None or self._generations.get(token.view) == token.generation
+
+    def submit(self, token, key, factory, callback=None):
+        """
+        Run factory() (a coroutine function) unless the same key is already
+        running, then callback(result) on the UI thread if token is still
+        current. token=None is background work that never goes stale.
+        """
+        self.loop.call_soon_threadsafe(self._subscribe, token, key, factory, callback)
+
+    def _subscribe(self, token, key, factory, callback):
+        if not self.is_current(token):
+            self.stats["dropped"] += 1
+            return
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = _Flight(self.loop.create_task(factory()))
+            flight.task.add_done_callback(lambda task: self._finished(key, flight))
+            self.stats["started"] += 1
+        else:
+            self.stats["merged"] += 1
+        flight.waiters.append((token, callback))
+
+    def _abandon_stale(self):
+        for flight in self._flights.values():
+            flight.waiters = [(token, callback) for token, callback in flight.waiters if self.is_current(token)]
+        # One loop pass later, so a submit made right after begin() can still join a running flight
+        self.loop.call_soon(self._cancel_orphans)
+
+    def _cancel_orphans(self):
+        for flight in self._flights.values():
+            if not flight.waiters and not flight.task.done():
+                flight.task.cancel()
+
+    def _finished(self, key, flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if flight.task.cancelled():
+            self.stats["cancelled"] += 1
+            return
+        error = flight.task.exception()
+        if error is not None:
+            print(f"Catalog I/O error for {key}: {error!r}")
+            result = None
+        else:
+            result = flight.task.result()
+        for token, callback in flight.waiters:
+            if callback is not None:
+                self.deliver(lambda token=token, callback=callback: self._deliver(token, callback, result))
+
+    def _deliver(self, token, callback, result):
+        # Checked again on the UI thread: a newer generation may have started in between
+        if not self.is_current(token):
+            self.stats["dropped"] += 1
+            return
+        self.stats["delivered"] += 1
+        callback(result)
+
+    def run(self, coro):
+        """ Run a coroutine on the loop from any other thread and wait for its result """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def stop(self):
+        def shutdown():
+            for flight in self._flights.values():
+                flight.task.cancel()
+            self.http.close()
+            self.loop.stop()
+
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(shutdown)
+            self._thread.join(timeout=5)
@@ -0,0 +1,251 @@
+"""
+Size of the adblock injection script before and after adblock_bundle, plus a
+behaviour check: both scripts are run in node against recording stand-ins for
+window/document and must leave the same trace (styles injected, globals set,
+functions patched, observers started). Exits non-zero on a mismatch.
+
+    python benchmarks/bench_adblock_bundle.py [--hostname games.yandex.ru] [--lang ru]
+
+"Before" is what main.py's get_adblock_script produced: the f-string below,
+copied from it, around the content script as it is on disk, duplicate
+injectAntiAntiAdblock included. The first version of that f-string put the
+raw rules.json into window.adblockRules, which the content script never read
+(it fetched rules.json relative to the game page); compiled rules
+(adblock_rules.py) replaced it with window.adblockCompiled. Its size is
+reported too, but the behaviour check is against the adblockCompiled one:
+the adblockRules one hides no elements at all.
+"""
+import argparse
+import gzip
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import adblock_bundle
+import adblock_rules
+
+HARNESS = r"""
+const vm = require('vm');
+const fs = require('fs');
+const [code, hostname, lang] = [fs.readFileSync(process.argv[2], 'utf8'), process.argv[3], process.argv[4]];
+
+const trace = [];
+const paths = new WeakMap();
+let calls = 0;
+
+function describe(value, depth = 0) {
+  if (paths.has(value)) return '<' + paths.get(value) + '>';
+  if (typeof value === 'function') return '<function>';
+  if (value === null || typeof value !== 'object') return value === undefined ? '<undefined>' : value;
+  if (depth > 4) return '<deep>';
+  if (Array.isArray(value)) return value.map(v => describe(v, depth + 1));
+  const out = {};
+  for (const key of Object.keys(value)) out[key] = describe(value[key], depth + 1);
+  return out;
+}
+
+// Stand-in for any host object: reads give stable child stand-ins, writes are
+// stored and traced, calls and constructions are traced and numbered
+function recorder(path, initial = {}) {
+  const store = Object.assign({}, initial);
+  const children = {};
+  const proxy = new Proxy(function () {}, {
+    get(target, prop) {
+      if (prop === 'then' || typeof prop === 'symbol') return undefined;
+      if (prop in store) return store[prop];
+      if (!(prop in children)) children[prop] = recorder(path + '.' + prop);
+      return children[prop];
+    },
+    set(target, prop, value) {
+      store[prop] = value;
+      trace.push(['set', path + '.' + String(prop), describe(value)]);
+      return true;
+    },
+    has(target, prop) { return prop in store; },
+    apply(target, self, args) {
+      const id = ++calls;
+      trace.push(['call', path, args.map(a => describe(a))]);
+      return recorder(path + '()#' + id);
+    },
+    construct(target, args) {
+      const id = ++calls;
+      trace.push(['new', path, args.map(a => describe(a))]);
+      return recorder('new ' + path + '#' + id);
+    }
+  });
+  paths.set(proxy, path);
+  return proxy;
+}
+
+const documentElement = recorder('document.documentElement', { lang });
+const sandbox = {
+  document: recorder('document', { documentElement }),
+  location: { hostname, href: 'https://' + hostname + '/' },
+  console: { log: (...a) => trace.push(['console.log', a.map(x => describe(x))]), error: () => {}, warn: () => {} }
+};
+for (const name of ['setTimeout', 'setInterval', 'clearTimeout', 'requestAnimationFrame', 'MutationObserver', 'Event',
+                    'HTMLElement', 'CSSStyleDeclaration', 'Headers', 'Response', 'fetch', 'getComputedStyle', 'Node',
+                    'addEventListener', 'removeEventListener', 'open', 'postMessage', 'dispatchEvent']) {
+  sandbox[name] = recorder(name);
+}
+process.on('unhandledRejection', e => trace.push(['rejection', String(e)]));
+vm.createContext(sandbox);
+// window is the global object itself, as in a browser
+vm.runInContext('this.window = this;', sandbox);
+const stubs = new Set(Object.keys(sandbox));
+try {
+  vm.runInContext(code, sandbox);
+} catch (e) {
+  trace.push(['throw', String(e)]);
+}
+// main() is async: let its awaits settle before dumping the trace
+let ticks = 0;
+(function settle() {
+  if (++ticks < 50) return setImmediate(settle);
+  const globals = {};
+  for (const key of Object.keys(sandbox)) {
+    if (!stubs.has(key) || sandbox[key] !== undefined && !paths.has(sandbox[key])) globals[key] = describe(sandbox[key]);
+  }
+  trace.push(['globals', globals]);
+  process.stdout.write(JSON.stringify(trace));
+})();
+"""
+
+
+def legacy_script(rules_path, script_path, compiled=True):
+    """ get_adblock_script() of main.py before adblock_bundle, unchanged """
+    if compiled:
+        rules_data = "null"
+        if os.path.exists(rules_path):
+            rules_data = json.dumps(adblock_rules.compile_file(rules_path), ensure_ascii=False, separators=(",", ":"))
+        rules_global = "adblockCompiled"
+    else:
+        rules_data = "{}"
+        if os.path.exists(rules_path):
+            with open(rules_path, "r", encoding="utf-8") as f:
+                rules_data = f.read()
+        rules_global = "adblockRules"
+
+    content_script = ""
+    if os.path.exists(script_path):
+        with open(script_path, "r", encoding="utf-8") as f:
+            content_script = f.read()
+
+    polyfill = f"""
+                (function() {{
+                    if (window.__adblock_injected) return;
+                    window.__adblock_injected = true;
+                    
+                    window.{rules_global} = {rules_data};
+                    
+                    const chrome = {{
+                        storage: {{
+                            local: {{
+                                get: (keys) => Promise.resolve({{ enabled: true, whitelist: [] }}),
+                                set: (data) => Promise.resolve()
+                            }}
+                        }},
+                        runtime: {{
+                            getURL: (path) => path,
+                            onMessage: {{ addListener: () => {{}}, sendMessage: () => Promise.resolve() }}
+                        }}
+                    }};
+                    window.chrome = chrome;
+                    window.browser = chrome;
+                    
+                    {content_script}
+                    
+                    if(typeof injectAntiAntiAdblock === 'function') injectAntiAntiAdblock();
+                    console.log("Adblock polyfill and script executed");
+                }})();
+                """
+    return polyfill
+
+
+def run_traced(node, script, hostname, lang):
+    with tempfile.TemporaryDirectory() as tmp:
+        harness = os.path.join(tmp, "harness.js")
+        target = os.path.join(tmp, "payload.js")
+        with open(harness, "w", encoding="utf-8") as f:
+            f.write(HARNESS)
+        with open(target, "w", encoding="utf-8") as f:
+            f.write(script)
+        check = subprocess.run([node, "--check", target], capture_output=True, text=True)
+        if check.returncode:
+            raise SystemExit(f"Syntax error in payload:\n{check.stderr}")
+        proc = subprocess.run([node, harness, target, hostname, lang], capture_output=True, text=True, timeout=60)
+        if proc.returncode:
+            raise SystemExit(f"Harness failed:\n{proc.stderr}")
+        return json.loads(proc.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--adblock-dir", default=os.path.join(ROOT, "adblock"))
+    parser.add_argument("--hostname", default="games.yandex.ru")
+    parser.add_argument("--lang", default="ru")
+    args = parser.parse_args()
+
+    rules_path = os.path.join(args.adblock_dir, "rules.json")
+    script_path = os.path.join(args.adblock_dir, "adblock_content.js")
+    with open(rules_path, "rb") as f:
+        rules_data = f.read()
+    with open(script_path, "rb") as f:
+        script_data = f.read()
+
+    before = legacy_script(rules_path, script_path)
+    original = legacy_script(rules_path, script_path, compiled=False)
+    start = time.perf_counter()
+    after = adblock_bundle.build_bundle(rules_data, script_data)
+    build_ms = (time.perf_counter() - start) * 1000
+    _, dropped = adblock_bundle.minify(script_data.decode("utf-8"))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        adblock_bundle.load_bundle(args.adblock_dir, tmp)
+        start = time.perf_counter()
+        cached = adblock_bundle.load_bundle(args.adblock_dir, tmp)
+        cached_ms = (time.perf_counter() - start) * 1000
+    if cached != after:
+        raise SystemExit("Cached bundle differs from a fresh build")
+
+    size = lambda text: len(text.encode("utf-8"))
+    report = {
+        "adblock_rules_bytes": size(original),
+        "adblock_rules_gzip_bytes": len(gzip.compress(original.encode("utf-8"))),
+        "before_bytes": size(before),
+        "after_bytes": size(after),
+        "before_gzip_bytes": len(gzip.compress(before.encode("utf-8"))),
+        "after_gzip_bytes": len(gzip.compress(after.encode("utf-8"))),
+        "reduction": round(1 - size(after) / size(before), 3),
+        "dropped_functions": dropped,
+        "build_ms": round(build_ms, 2),
+        "cached_load_ms": round(cached_ms, 2)
+    }
+
+    node = shutil.which("node")
+    if node is None:
+        report["behaviour"] = "skipped: node is not installed"
+    else:
+        old_trace = run_traced(node, before, args.hostname, args.lang)
+        new_trace = run_traced(node, after, args.hostname, args.lang)
+        report["trace_events"] = len(new_trace)
+        report["behaviour"] = "identical" if old_trace == new_trace else "DIFFERENT"
+        if old_trace != new_trace:
+            for i, (a, b) in enumerate(zip(old_trace, new_trace)):
+                if a != b:
+                    report["first_difference"] = {"index": i, "before": a, "after": b}
+                    break
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if report["behaviour"] == "DIFFERENT":
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
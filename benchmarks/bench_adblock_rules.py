@@ -0,0 +1,129 @@
+"""
+Size of the adblock payload and of the per-frame stylesheet, inline rules.json
+(old) vs adblock_rules.compile_rules (new).
+
+    python benchmarks/bench_adblock_rules.py [--rules adblock/rules.json] [--html recalc.html]
+
+Style recalculation can only be timed in a browser: --html writes a page that
+applies each stylesheet to the same synthetic game page and measures forced
+recalcs with performance.now(). Open it in Edge (the WebView2 engine).
+"""
+import argparse
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import adblock_rules
+
+
+def legacy_css(rules, lang):
+    """ What injectCss used to build in every frame """
+    selectors = list(rules.get("globalElementHidingSelectors") or [])
+    selectors += (rules.get("languageSpecificElementHidingSelectors") or {}).get(lang) or []
+    return "\n".join(f"{s} {{ {adblock_rules.HIDE_DECLARATIONS} }}" for s in selectors), len(selectors)
+
+
+def utf8_len(text):
+    return len(text.encode("utf-8"))
+
+
+RECALC_PAGE = """<!DOCTYPE html>
+<html lang="ru"><head><meta charset="utf-8"><title>adblock style recalc</title></head>
+<body><pre id="out">running...</pre><div id="host"></div>
+<script>
+const SHEETS = %(sheets)s;
+const CLASSES = ["game-card", "game-card__title", "content", "grid", "row", "ad-slot", "banner", "popup-root",
+                 "sticky-footer", "player", "modal-layer", "info", "rating", "ya-ad-block-x", "title"];
+function buildPage(host, count) {
+  const frag = document.createDocumentFragment();
+  for (let i = 0; i < count; i++) {
+    const card = document.createElement(i %% 7 ? "div" : "section");
+    card.className = CLASSES[i %% CLASSES.length] + " " + CLASSES[(i * 7) %% CLASSES.length];
+    if (i %% 11 === 0) card.id = "block-" + i + (i %% 22 ? "-panel" : "-overlay");
+    const img = document.createElement("img");
+    img.setAttribute("src", "https://example.test/img/" + i + (i %% 5 ? ".webp" : ".gif"));
+    card.appendChild(img);
+    const span = document.createElement("span");
+    span.className = "title";
+    span.textContent = "Game " + i;
+    card.appendChild(span);
+    frag.appendChild(card);
+  }
+  host.appendChild(frag);
+}
+function measure(css, rounds) {
+  const host = document.getElementById("host");
+  host.textContent = "";
+  buildPage(host, 4000);
+  const style = document.createElement("style");
+  style.textContent = css;
+  document.head.appendChild(style);
+  getComputedStyle(host.lastElementChild).display;
+  const samples = [];
+  for (let r = 0; r < rounds; r++) {
+    const parent = host.parentNode;
+    parent.removeChild(host);
+    parent.appendChild(host);
+    const start = performance.now();
+    getComputedStyle(host.lastElementChild).display;
+    samples.push(performance.now() - start);
+  }
+  style.remove();
+  samples.sort((a, b) => a - b);
+  return samples[samples.length >> 1];
+}
+const lines = [];
+for (const [name, css] of Object.entries(SHEETS)) {
+  lines.push(name.padEnd(14) + measure(css, 30).toFixed(2) + " ms median full recalc");
+}
+document.getElementById("out").textContent = lines.join("\\n");
+</script></body></html>
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rules", default=os.path.join(ROOT, "adblock", "rules.json"))
+    parser.add_argument("--html", help="write the style recalc page here")
+    args = parser.parse_args()
+
+    with open(args.rules, "r", encoding="utf-8") as f:
+        raw = f.read()
+    rules = json.loads(raw)
+    report = {}
+    compiled = adblock_rules.compile_rules(rules, report)
+    compiled_json = json.dumps(compiled, ensure_ascii=False, separators=(",", ":"))
+
+    frames = {}
+    for lang in ["ru", "en", "other"]:
+        old_css, old_rules = legacy_css(rules, lang)
+        new_css = adblock_rules.select_css(compiled, "example.test", lang)
+        frames[lang] = {
+            "legacy_css_bytes": utf8_len(old_css),
+            "legacy_css_rules": old_rules,
+            "compiled_css_bytes": utf8_len(new_css),
+            "compiled_css_rules": new_css.count("{"),
+            "compiled_selectors": new_css.count(", ") + new_css.count("{")
+        }
+
+    print(json.dumps({
+        "payload": {
+            "legacy_rules_bytes": utf8_len(raw),
+            "compiled_rules_bytes": utf8_len(compiled_json)
+        },
+        "per_frame_stylesheet": frames,
+        "dropped": report
+    }, indent=2, ensure_ascii=False))
+
+    if args.html:
+        sheets = {"none": "", "legacy": legacy_css(rules, "ru")[0], "compiled": adblock_rules.select_css(compiled, "yandex.ru", "ru")}
+        with open(args.html, "w", encoding="utf-8") as f:
+            f.write(RECALC_PAGE % {"sheets": json.dumps(sheets, ensure_ascii=False).replace("</", "<\\/")})
+        print(f"Recalc page written to {args.html}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+Game asset proxy (asset_proxy.py) end to end against a local origin server:
+
+    python benchmarks/bench_asset_proxy.py [--wasm-mb 8] [--launches 3]
+
+A "launch" requests the assets of one game through a new proxy, cache and
+store over the same directory, like a new game process would:
+
+    - after the first launch the origin sends a small fraction of the bytes:
+      immutable and heuristically fresh assets are served from disk, the
+      no-cache bundle is revalidated with a 304, the no-store API is fetched
+    - every body arrives byte-identical, chunked and gzip variants included
+    - the window's own validators get a 304 from the cache
+    - with the origin down the stale bundle is still served
+    - URLs the adblock filters block (netfilter.py) get a 403, over HTTP and
+      CONNECT, and never reach the network; other CONNECTs are tunnelled
+    - LRU eviction keeps the cache under its cap, also with two game
+      processes filling the same directory at once
+
+Exits 1 if a check fails.
+"""
+import argparse
+import gzip
+import http.client
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import netfilter
+from asset_proxy import AssetCache, AssetProxy
+from store import LocalStore
+
+
+def make_assets(wasm_mb):
+    rng = random.Random(23)
+    wasm = rng.randbytes(wasm_mb * 1024 * 1024)
+    bundle = ("var game = {};\n" * 40000).encode()
+    sprites = rng.randbytes(512 * 1024)
+    level = json.dumps({"tiles": list(range(20000))}).encode()
+    long_ago = formatdate(time.time() - 30 * 86400, usegmt=True)
+    return {
+        "/game/engine.wasm": (wasm, {"Cache-Control": "public, max-age=31536000, immutable",
+                                     "Content-Type": "application/wasm"}),
+        "/game/bundle.js": (bundle, {"Cache-Control": "no-cache", "ETag": '"bundle-1"',
+                                     "Content-Type": "application/javascript"}),
+        "/game/sprites.png": (sprites, {"Last-Modified": long_ago, "Content-Type": "image/png"}),
+        "/game/level.json": (level, {"Cache-Control": "max-age=600", "Content-Type": "application/json",
+                                     "chunked": True}),
+        "/game/style.css": (b"body { margin: 0 }\n" * 2000, {"Cache-Control": "max-age=600", "Vary": "Accept-Encoding",
+                                                             "Content-Type": "text/css", "gzip": True}),
+        "/api/session": (b'{"session": "x"}', {"Cache-Control": "no-store", "Content-Type": "application/json"}),
+    }
+
+
+class Origin(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, assets):
+        super().__init__(("127.0.0.1", 0), OriginHandler)
+        self.assets = assets
+        self.log = []
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+class OriginHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        body, headers = server.assets.get(self.path, (None, {}))
+        if body is None:
+            self._send(404, {}, b"")
+            return
+        headers = dict(headers)
+        chunked = headers.pop("chunked", False)
+        if headers.pop("gzip", False) and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, mtime=0)
+            headers["Content-Encoding"] = "gzip"
+        headers["Date"] = formatdate(usegmt=True)
+        etag = headers.get("ETag")
+        if etag and self.headers.get("If-None-Match") == etag or \
+                headers.get("Last-Modified") and self.headers.get("If-Modified-Since") == headers["Last-Modified"]:
+            self._send(304, headers, b"")
+            return
+        self._send(200, headers, body, chunked)
+
+    def _send(self, status, headers, body, chunked=False):
+        with self.server.lock:
+            self.server.log.append((self.path, status))
+            self.server.bytes_sent += len(body)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for start in range(0, len(body), 16384):
+                chunk = body[start:start + 16384]
+                self.wfile.write(f"{len(chunk):X}\r\n".encode() + chunk + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            if status != 304:
+                self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+
+# What WebView2 sends: part of the cache key
+ACCEPT_ENCODING = {"Accept-Encoding": "gzip, deflate, br"}
+
+
+def get(proxy, url, headers=None):
+    conn = http.client.HTTPConnection("127.0.0.1", proxy.port, timeout=30)
+    try:
+        conn.request("GET", url, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        conn.close()
+
+
+def launch(directory, origin, assets, blocked, max_bytes=512 * 1024 * 1024):
+    """ One game process: a new proxy over the cache directory; returns its stats and the bodies """
+    store = LocalStore(os.path.join(directory, "Yblox.db"))
+    proxy = AssetProxy(AssetCache(os.path.join(directory, "assets"), store, max_bytes=max_bytes), blocked).start()
+    before = origin.bytes_sent
+    start = time.perf_counter()
+    bodies = {}
+    try:
+        for path in assets:
+            status, response_headers, body = get(proxy, origin.base_url + path, ACCEPT_ENCODING)
+            if response_headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            bodies[path] = (status, body)
+    finally:
+        seconds = time.perf_counter() - start
+        proxy.stop()
+        store.close()
+    return dict(proxy.stats, origin_bytes=origin.bytes_sent - before, ms=round(seconds * 1000, 1)), bodies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--wasm-mb", type=int, default=8)
+    parser.add_argument("--launches", type=int, default=3)
+    args = parser.parse_args()
+
+    assets = make_assets(args.wasm_mb)
+    blocked = netfilter.load(os.path.join(ROOT, "adblock"), cache_dir=None).blocks
+    checks = {}
+    report = {"checks": checks, "launches": []}
+
+    with tempfile.TemporaryDirectory() as directory, Origin(assets) as origin:
+        expected = {path: body for path, (body, _) in assets.items()}
+        for _ in range(args.launches):
+            stats, bodies = launch(directory, origin, assets, blocked)
+            report["launches"].append(stats)
+            checks.setdefault("bodies_identical", True)
+            checks["bodies_identical"] &= all(bodies[path] == (200, body) for path, body in expected.items())
+
+        cold, warm = report["launches"][0], report["launches"][-1]
+        report["relaunch_origin_fraction"] = round(warm["origin_bytes"] / max(1, cold["origin_bytes"]), 4)
+        checks["relaunch_mostly_from_disk"] = report["relaunch_origin_fraction"] < 0.05
+        checks["relaunch_hits"] = warm["hits"] == 4 and warm["revalidated"] == 1
+        origin_paths = [path for path, _ in origin.log]
+        checks["no_store_refetched"] = origin_paths.count("/api/session") == args.launches
+        checks["immutable_fetched_once"] = origin_paths.count("/game/engine.wasm") == 1
+        checks["revalidation_304"] = origin.log.count(("/game/bundle.js", 304)) == args.launches - 1
+
+        store = LocalStore(os.path.join(directory, "Yblox.db"))
+        proxy = AssetProxy(AssetCache(os.path.join(directory, "assets"), store), blocked).start()
+        try:
+            # The window's own validators: answered from the cache
+            status, _, body = get(proxy, origin.base_url + "/game/sprites.png",
+                                  dict(ACCEPT_ENCODING, **{"If-Modified-Since": assets["/game/sprites.png"][1]["Last-Modified"]}))
+            checks["client_conditional_304"] = status == 304 and not body
+
+            # Blocked before anything leaves the machine
+            requests_before = len(origin.log)
+            status, _, _ = get(proxy, "http://adfox.example/tag.js")
+            tunnel = http.client.HTTPConnection("127.0.0.1", proxy.port, timeout=10)
+            tunnel.set_tunnel("pagead2.googlesyndication.com", 443)
+            try:
+                tunnel.connect()
+                connect_status = 200
+            except OSError as e:
+                connect_status = 403 if "403" in str(e) else str(e)
+            finally:
+                tunnel.close()
+            checks["blocked_http_403"] = status == 403
+            checks["blocked_connect_403"] = connect_status == 403
+            checks["blocked_not_forwarded"] = len(origin.log) == requests_before and proxy.stats["blocked"] == 2
+
+            # CONNECT tunnel to the origin, HTTP inside it
+            tunnel = http.client.HTTPConnection("127.0.0.1", proxy.port, timeout=10)
+            tunnel.set_tunnel("127.0.0.1", origin.server_address[1])
+            try:
+                tunnel.request("GET", "/game/style.css")
+                response = tunnel.getresponse()
+                checks["connect_tunnel"] = response.status == 200 and response.read() == expected["/game/style.css"] \
+                    and proxy.stats["tunnels"] == 1
+            finally:
+                tunnel.close()
+        finally:
+            proxy.stop()
+            store.close()
+
+    # Origin gone: the no-cache bundle is served stale rather than failing
+    with tempfile.TemporaryDirectory() as directory:
+        with Origin(assets) as origin:
+            base_url = origin.base_url
+            launch(directory, origin, {"/game/bundle.js": assets["/game/bundle.js"]}, None)
+        store = LocalStore(os.path.join(directory, "Yblox.db"))
+        proxy = AssetProxy(AssetCache(os.path.join(directory, "assets"), store)).start()
+        try:
+            status, _, body = get(proxy, base_url + "/game/bundle.js", ACCEPT_ENCODING)
+            checks["stale_when_offline"] = status == 200 and body == expected["/game/bundle.js"]
+        finally:
+            proxy.stop()
+            store.close()
+
+    # LRU: a cap of two megabytes keeps the most recently used sprites
+    with tempfile.TemporaryDirectory() as directory:
+        sprites = {f"/sprites/{i}.png": (os.urandom(400 * 1024), {"Cache-Control": "max-age=600"}) for i in range(10)}
+        with Origin(sprites) as origin:
+            cap = 2 * 1024 * 1024
+            launch(directory, origin, sprites, None, max_bytes=cap)
+            store = LocalStore(os.path.join(directory, "Yblox.db"))
+            index = store.asset_index()
+            files = [name for name in os.listdir(os.path.join(directory, "assets")) if not name.endswith(".tmp")]
+            total = sum(entry["size"] for entry in index.values())
+            kept = sorted(entry["url"].rsplit("/", 1)[1] for entry in index.values())
+            store.close()
+        report["lru"] = {"cap": cap, "total": total, "kept": kept}
+        checks["lru_under_cap"] = 0 < total <= cap and len(files) == len(index)
+        checks["lru_keeps_recent"] = "9.png" in kept and "0.png" not in kept
+
+    # Two games open at once, each with its own store connection and index:
+    # together they still stay under the cap
+    with tempfile.TemporaryDirectory() as directory:
+        sprites = {f"/sprites/{i}.png": (os.urandom(400 * 1024), {"Cache-Control": "max-age=600"}) for i in range(20)}
+        with Origin(sprites) as origin:
+            cap = 2 * 1024 * 1024
+            games = []
+            for _ in range(2):
+                store = LocalStore(os.path.join(directory, "Yblox.db"))
+                games.append((store, AssetProxy(AssetCache(os.path.join(directory, "assets"), store, max_bytes=cap)).start()))
+            try:
+                for i, path in enumerate(sprites):
+                    get(games[i % 2][1], origin.base_url + path)
+            finally:
+                for store, proxy in games:
+                    proxy.stop()
+                    store.close()
+            store = LocalStore(os.path.join(directory, "Yblox.db"))
+            index = store.asset_index()
+            store.close()
+            files = [name for name in os.listdir(os.path.join(directory, "assets")) if not name.endswith(".tmp")]
+            total = sum(os.path.getsize(os.path.join(directory, "assets", name)) for name in files)
+        report["lru_shared"] = {"cap": cap, "total": total, "entries": len(index)}
+        checks["lru_shared_under_cap"] = 0 < total <= cap and len(files) == len(index)
+
+    print(json.dumps(report, indent=2))
+    if not all(checks.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
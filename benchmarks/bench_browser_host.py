@@ -0,0 +1,151 @@
+"""
+Browser host lifecycle and game-open latency, run against the stub window
+backend so it works without WebView2 or a display:
+
+    python benchmarks/bench_browser_host.py [--games 20]
+
+Checks, through the same BrowserHostClient the launcher uses:
+    - the host starts in the background and answers pings
+    - requests with a wrong token are refused
+    - a killed host is restarted by the health check
+    - after max_restarts failures open_game() returns False (process per game)
+    - the host exits when the launcher's lease connection drops
+    - the launcher stopping leaves open games running: shutdown is refused
+      while they are open and the host exits with the last of them
+
+and compares host open latency with a fresh `main.py --browser` process
+(spawn to browser_window probe). Exits 1 if a check fails.
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from browser_host import BrowserHostClient, _recv, _send
+from benchmarks.bench_startup import launch
+
+MAIN = os.path.join(ROOT, "main.py")
+HOST_COMMAND = [sys.executable, MAIN, "--browser-host", "--backend", "stub"]
+
+
+def wait_for(predicate, timeout=15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def raw_request(port, request):
+    with socket.create_connection(("127.0.0.1", port), timeout=5) as conn:
+        _send(conn, request)
+        with conn.makefile("r", encoding="utf-8") as stream:
+            return _recv(stream)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--spawn-repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    checks = {}
+    report = {"checks": checks}
+    with tempfile.TemporaryDirectory() as appdata:
+        env = dict(os.environ, APPDATA=appdata)
+        handshake = os.path.join(appdata, "browser_host.json")
+
+        client = BrowserHostClient(HOST_COMMAND, handshake, ping_interval=0.2, max_restarts=2, env=env)
+        start = time.perf_counter()
+        client.start()
+        checks["starts"] = wait_for(client.is_ready)
+        report["host_ready_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        if not checks["starts"]:
+            print(json.dumps(report, indent=2))
+            sys.exit(1)
+
+        checks["ping"] = (client.ping() or {}).get("pid") == client.process.pid
+        checks["rejects_bad_token"] = raw_request(client.port, {"token": "nope", "cmd": "ping"}).get("ok") is False
+
+        samples = []
+        for i in range(args.games):
+            start = time.perf_counter()
+            opened = client.open_game(f"https://yandex.ru/games/app/{i}", f"Game {i}")
+            samples.append((time.perf_counter() - start) * 1000)
+            if not opened:
+                break
+        checks["opens_games"] = len(samples) == args.games and client.stats["opened"] == args.games
+        checks["counts_windows"] = (client.ping() or {}).get("windows") == args.games
+
+        # Crash: the health check must bring up a new process
+        old_pid = client.process.pid
+        os.kill(old_pid, signal.SIGKILL)
+        checks["restarts_after_crash"] = wait_for(lambda: client.is_ready() and client.process.pid != old_pid)
+        checks["opens_after_restart"] = client.open_game("https://yandex.ru/games/app/restart", "Restarted")
+
+        # Keep crashing until the restart budget is spent: open_game must fall back
+        for _ in range(client.max_restarts + 1):
+            if client.state == "failed":
+                break
+            pid = client.process.pid
+            os.kill(pid, signal.SIGKILL)
+            wait_for(lambda: client.state == "failed" or (client.is_ready() and client.process.pid != pid))
+        checks["falls_back_after_restarts"] = wait_for(lambda: client.state == "failed") and not client.open_game("https://yandex.ru/games/app/x", "X")
+        client.stop()
+
+        # Launcher crash: the host notices the dropped lease and exits by itself
+        orphan = BrowserHostClient(HOST_COMMAND, handshake, ping_interval=60, env=env)
+        orphan.start()
+        wait_for(orphan.is_ready)
+        orphan._lease.close()
+        checks["exits_without_launcher"] = wait_for(lambda: orphan.process.poll() is not None, timeout=10)
+        orphan._closing = True
+        orphan._kill()
+
+        # Launcher closed with games open: they outlive it, the host leaves with the last one
+        kept = BrowserHostClient(HOST_COMMAND, handshake, ping_interval=60, env=env)
+        kept.start()
+        wait_for(kept.is_ready)
+        host, port = kept.process, kept.port
+        windows = [raw_request(port, {"token": kept.token, "cmd": "open", "url": f"https://yandex.ru/games/app/k{i}",
+                                      "title": f"Kept {i}"}).get("window") for i in range(2)]
+        kept.stop()
+        time.sleep(1.0)
+        checks["games_outlive_launcher"] = host.poll() is None and \
+            (raw_request(port, {"token": kept.token, "cmd": "ping"}) or {}).get("windows") == 2
+        checks["shutdown_refused_with_games"] = \
+            raw_request(port, {"token": kept.token, "cmd": "shutdown"}).get("ok") is False and host.poll() is None
+        raw_request(port, {"token": kept.token, "cmd": "close", "window": windows[0]})
+        time.sleep(0.5)
+        still_running = host.poll() is None
+        raw_request(port, {"token": kept.token, "cmd": "close", "window": windows[1]})
+        checks["exits_with_last_game"] = still_running and wait_for(lambda: host.poll() is not None, timeout=10)
+        if host.poll() is None:
+            host.kill()
+
+        spawn_samples = []
+        for _ in range(args.spawn_repeat):
+            elapsed, _ = launch(["--browser", "--url", "about:blank", "--title", "Probe"], env, "browser_window")
+            if elapsed is not None:
+                spawn_samples.append(elapsed)
+
+    report["host_open_ms"] = {"median": round(statistics.median(samples), 2), "max": round(max(samples), 2)}
+    if spawn_samples:
+        # The process is only ready to create its window here; WebView2 start comes on top
+        report["process_per_game_ms"] = {"median": round(statistics.median(spawn_samples), 1), "min": round(min(spawn_samples), 1)}
+    print(json.dumps(report, indent=2))
+    if not all(checks.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
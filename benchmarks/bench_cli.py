@@ -0,0 +1,116 @@
+"""
+Headless catalog modes (cli.py) against the fixture server, through main.py
+as a scheduled task would start them:
+
+    python benchmarks/bench_cli.py [--games 120] [--thumbnails 60]
+
+    - --catalog / --search print unique games as JSON lines, nothing else on stdout
+    - none of them imports tkinter, customtkinter or PIL.ImageTk (-X importtime)
+    - --prewarm refreshes the home page, crawls the sections and downloads the
+      first thumbnails at the size the launcher recorded (a 125% display
+      here); a second pass finds them all in the disk cache
+    - after it, --catalog is answered without a request and --offline works
+      from the crawled catalog
+
+Exits 1 if a check fails.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.fixture_server import FixtureServer
+from store import LocalStore
+from thumbnails import THUMB_SIZE, save_display_size
+
+UI_MODULES = ("tkinter", "_tkinter", "customtkinter", "PIL.ImageTk")
+
+
+def run(args, env):
+    """ (JSON lines, imported UI modules, exit code, seconds) of one main.py run """
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", os.path.join(ROOT, "main.py"), *args],
+                          env=env, capture_output=True, text=True, encoding="utf-8", timeout=300)
+    seconds = time.perf_counter() - start
+    records = [json.loads(line) for line in proc.stdout.splitlines() if line.strip()]
+    imported = {line.split("|")[-1].strip() for line in proc.stderr.splitlines() if line.startswith("import time:")}
+    return records, sorted(imported & set(UI_MODULES)), proc.returncode, round(seconds, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=120)
+    parser.add_argument("--thumbnails", type=int, default=60)
+    args = parser.parse_args()
+
+    checks = {}
+    report = {"checks": checks, "runs": {}}
+    with tempfile.TemporaryDirectory() as appdata, \
+            FixtureServer(game_count=args.games, categories=3, category_pages=2) as server:
+        with open(os.path.join(appdata, "Yblox_settings.json"), "w", encoding="utf-8") as f:
+            json.dump({"catalog_base_url": server.catalog_url, "catalog_crawl_delay": 0}, f)
+        env = dict(os.environ, APPDATA=appdata, PYTHONIOENCODING="utf-8")
+        ui_imports = set()
+
+        def step(name, *cli_args):
+            before = len(server.request_log)
+            records, imported, code, seconds = run(cli_args, env)
+            ui_imports.update(imported)
+            requests = [path for _, path in server.request_log[before:]]
+            report["runs"][name] = {"exit": code, "seconds": seconds, "lines": len(records), "requests": len(requests)}
+            return records, code, requests
+
+        games, code, _ = step("catalog", "--catalog", "--pages", "2")
+        keys = [game.get("app_id") or game.get("app_url") for game in games]
+        checks["catalog_games"] = code == 0 and len(games) >= 60 and all(game.get("name") for game in games)
+        checks["catalog_unique"] = len(set(keys)) == len(keys)
+
+        games, code, _ = step("search", "--search", "block", "--limit", "10")
+        checks["search_games"] = code == 0 and 0 < len(games) <= 10
+
+        # What the launcher records on a display scaled to 125%
+        scaled = [round(THUMB_SIZE[0] * 1.25), round(THUMB_SIZE[1] * 1.25)]
+        store = LocalStore(os.path.join(appdata, "Yblox", "Yblox.db"))
+        save_display_size(store, scaled)
+        store.close()
+
+        records, code, _ = step("prewarm", "--prewarm", "--thumbnails", str(args.thumbnails))
+        by_type = {record["type"]: record for record in records}
+        report["prewarm"] = by_type
+        checks["prewarm_steps"] = code == 0 and list(by_type) == ["catalog", "crawl", "thumbnails", "done"]
+        thumbs = by_type.get("thumbnails", {})
+        checks["prewarm_thumbnails"] = thumbs.get("wanted") == args.thumbnails and \
+            thumbs.get("fetched", 0) + thumbs.get("cached", 0) == args.thumbnails and not thumbs.get("failed")
+        checks["prewarm_launcher_size"] = thumbs.get("size") == scaled
+        checks["prewarm_crawl"] = by_type.get("crawl", {}).get("catalog_games", 0) > by_type.get("catalog", {}).get("games", 0)
+
+        records, code, requests = step("prewarm_again", "--prewarm", "--no-crawl", "--thumbnails", str(args.thumbnails))
+        thumbs = {record["type"]: record for record in records}.get("thumbnails", {})
+        checks["thumbnails_from_disk"] = thumbs.get("cached") == args.thumbnails and \
+            not any("/thumbs/" in path for path in requests)
+
+        games, code, requests = step("catalog_after_prewarm", "--catalog")
+        checks["catalog_from_cache"] = code == 0 and len(games) > 0 and not requests
+
+        games, code, requests = step("catalog_offline", "--catalog", "--offline")
+        checks["offline_catalog"] = code == 0 and len(games) >= report["prewarm"].get("crawl", {}).get("catalog_games", 1) \
+            and not requests
+        games, code, requests = step("search_offline", "--search", "block", "--offline")
+        checks["offline_search"] = code == 0 and len(games) > 0 and not requests
+
+        report["ui_imports"] = sorted(ui_imports)
+        checks["no_ui_imports"] = not ui_imports
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if not all(checks.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Catalog crawl against the local fixture server with category sections:
+
+    python benchmarks/bench_crawler.py [--categories 6] [--pages 5] [--latency-ms 40]
+
+    - every game of every section ends up once in the local catalog, home page first
+    - never more than max_per_host requests at once, request starts spaced by delay
+    - 503 answers are retried with backoff and nothing is lost
+    - an interrupted crawl resumes from its checkpoint without fetching done pages again
+    - a second pass fetches nothing; a stale section is the only one fetched again
+    - concurrent sections against one section at a time
+
+Exits 1 if a check fails.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import catalog
+from async_loader import AsyncHTTPClient
+from benchmarks.fixture_server import FixtureServer
+from benchmarks.fixtures import make_games
+from crawler import CatalogCrawler
+from store import LocalStore
+
+
+def parse(text):
+    games = catalog.extract_state_games(text)
+    if len(games) < 3:
+        games.extend(catalog.parse_html_games(text))
+    return catalog.dedupe_games(games)
+
+
+def expected_ids(server):
+    ids = []
+    listings = [("home", "", 0)] + [("category", slug, page) for slug in server.category_slugs
+                                     for page in range(server.category_pages)]
+    for kind, query, page in listings:
+        first_index, count = server.listing(kind, query, page)
+        ids += [str(g["appID"]) for g in make_games(count, first_index=first_index)]
+    return list(dict.fromkeys(ids))
+
+
+def crawl(store, server, **kwargs):
+    async def run():
+        http = AsyncHTTPClient()
+        try:
+            return await CatalogCrawler(store, http, server.catalog_url, parse, **kwargs).run()
+        finally:
+            http.close()
+
+    start = len(server.request_log)
+    t = time.perf_counter()
+    stats = asyncio.run(run())
+    store.flush()
+    return dict(stats), server.request_log[start:], time.perf_counter() - t
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--categories", type=int, default=6)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=40)
+    parser.add_argument("--delay-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    options = dict(concurrency=4, max_per_host=2, delay=args.delay_ms / 1000, backoff=0.05)
+    checks = {}
+    report = {"checks": checks}
+    with tempfile.TemporaryDirectory() as tmp, \
+            FixtureServer(game_count=120, search_count=40, latency=args.latency_ms / 1000,
+                          categories=args.categories, category_pages=args.pages, fail_every=7) as server:
+        expected = expected_ids(server)
+        report["expected_games"] = len(expected)
+
+        # Full crawl
+        store = LocalStore(os.path.join(tmp, "full.db"))
+        stats, log, elapsed = crawl(store, server, **options)
+        starts = sorted(t for t, _ in log)
+        gaps = [b - a for a, b in zip(starts, starts[1:])]
+        report["full"] = dict(stats, seconds=round(elapsed, 2), peak_in_flight=server.peak_in_flight,
+                              min_gap_ms=round(min(gaps) * 1000, 1))
+        crawled = [g["app_id"] for g in store.catalog_games(limit=None)]
+        checks["all_games_once"] = sorted(crawled) == sorted(expected)
+        checks["home_page_first"] = crawled[:10] == expected[:10]
+        checks["per_host_limit"] = server.peak_in_flight <= options["max_per_host"]
+        # Measured at the server: arrival times jitter a little around the spacing of the starts
+        checks["politeness_delay"] = min(gaps) >= options["delay"] * 0.75
+        checks["retried_503"] = stats["retries"] > 0 and stats["failed"] == 0
+        checks["sections_complete"] = all(s["complete"] for s in store.crawl_sections().values())
+
+        # Second pass: everything is fresh
+        stats, log, _ = crawl(store, server, **options)
+        checks["fresh_pass_fetches_nothing"] = not log and stats["skipped"] == args.categories + 1
+
+        # One stale section: only its pages are fetched
+        stale = next(s for s in store.crawl_sections().values() if s["kind"] == "category")
+        store.put_crawl_section(dict(stale, fetched_at=0))
+        store.flush()
+        stats, log, _ = crawl(store, server, **options)
+        stale_path = urlsplit(stale["url"]).path
+        checks["only_stale_section"] = bool(log) and all(urlsplit(path).path == stale_path for _, path in log)
+        store.close()
+
+        # Interrupted crawl resumes from the checkpoint
+        store = LocalStore(os.path.join(tmp, "resume.db"))
+        pages = []
+
+        async def interrupted():
+            http = AsyncHTTPClient()
+            crawler = CatalogCrawler(store, http, server.catalog_url, parse,
+                                     on_games=lambda games: pages.append(len(games)), **options)
+            task = asyncio.ensure_future(crawler.run())
+            while len(pages) < 10:
+                await asyncio.sleep(0.01)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            http.close()
+
+        asyncio.run(interrupted())
+        store.flush()
+        done = set()
+        for section in store.crawl_sections().values():
+            pages_done = range(args.pages + 1) if section["complete"] else range(section["next_page"])
+            done.update(CatalogCrawler.page_url(section["url"], page)[len(server.base_url):] for page in pages_done)
+        stats, log, _ = crawl(store, server, **options)
+        refetched = [path for _, path in log if path in done]
+        report["resume"] = {"pages_before_interrupt": len(pages), "pages_after": stats["pages"], "refetched": refetched}
+        checks["resume_skips_done_pages"] = not refetched and stats["pages"] > 0
+        checks["resume_complete"] = sorted(g["app_id"] for g in store.catalog_games(limit=None)) == sorted(expected)
+        store.close()
+
+        # One section at a time, for comparison
+        store = LocalStore(os.path.join(tmp, "serial.db"))
+        stats, _, serial = crawl(store, server, **dict(options, concurrency=1, max_per_host=1))
+        report["serial_seconds"] = round(serial, 2)
+        checks["concurrent_faster"] = report["full"]["seconds"] < serial
+        store.close()
+
+    print(json.dumps(report, indent=2))
+    if not all(checks.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
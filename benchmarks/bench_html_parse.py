@@ -0,0 +1,152 @@
+"""
+Compare the HTML fallback backends with the original BeautifulSoup parser and
+check that they produce identical records.
+
+    python benchmarks/bench_html_parse.py [--page saved_page.html ...] [--repeat 5] [--fuzz 3000]
+
+Besides the pages, --fuzz random snippets of broken card markup (unclosed and
+stray tags, nested links) are parsed by every backend. Exits 1 if the default
+backend differs from BeautifulSoup anywhere; the others are only reported.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import catalog
+from benchmarks.fixtures import make_page
+
+
+def legacy_parse_html_games(html_content):
+    """ YbloxApp._parse_html_games before catalog.parse_html_games, kept as the reference """
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html_content, 'html.parser')
+
+    links = soup.find_all('a', href=re.compile(r'/games/app/(\d+)'))
+    parsed = []
+
+    for link in links:
+        try:
+            href = link.get('href')
+            app_id_match = re.search(r'/app/(\d+)', href)
+            if not app_id_match: continue
+            app_id = app_id_match.group(1)
+
+            name = "Game"
+            img = ""
+
+            curr = link
+            for _ in range(5):
+                if not curr: break
+
+                if name == "Game":
+                    title_el = curr.find(re.compile(r'h\d')) or curr.select_one('[class*="title"]')
+                    if title_el:
+                        name = title_el.text.strip()
+
+                if not img:
+                    img_el = curr.find('img')
+                    if img_el:
+                        img = img_el.get('src') or img_el.get('data-src') or img_el.get('srcset', '').split(' ')[0]
+
+                if name != "Game" and img: break
+                curr = curr.parent
+
+            if img.startswith("//"): img = "https:" + img
+
+            parsed.append({
+                "name": name,
+                "app_id": app_id,
+                "plays": "10K+",
+                "rating": "4.8",
+                "thumb_url": img,
+                "app_url": f"https://yandex.ru/games/app/{app_id}"
+            })
+        except: continue
+    return parsed
+
+
+FUZZ_PIECES = ('<div class="card">', '</div>', '<a href="/games/app/{n}">', '<a href="/games/app/{n}/x">', '</a>',
+               '<a href="/other">', '<h3>Game {n}', '</h3>', '<h2>', '</h2>', '<span class="game-title">Title {n}</span>',
+               '<span class="title">', '</span>', '<img src="//img.example/{n}.png">', '<img data-src="/lazy/{n}.png">',
+               '<img srcset="/s/{n}.png 2x">', '<img>', '<p>', '</p>', '<li>', '<ul>', '</ul>', '<b>', ' text {n} ')
+
+
+def make_malformed(rnd):
+    """ A random run of card markup with tags left open, closed twice or nested where HTML forbids it """
+    return "".join(rnd.choice(FUZZ_PIECES).format(n=rnd.randint(1, 99)) for _ in range(rnd.randint(5, 60)))
+
+
+def timed(fn, text, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--page", action="append", default=[])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--fuzz", type=int, default=3000)
+    args = parser.parse_args()
+
+    pages = [(path, open(path, encoding="utf-8").read()) for path in args.page]
+    if not pages:
+        pages = [("synthetic-60", make_page(60, with_state=False, head_kb=200)),
+                 ("synthetic-600", make_page(600, with_state=False, head_kb=600))]
+
+    # The default backend, the one the launcher uses
+    backends = {"stdlib": catalog.parse_html_games}
+    if catalog.LexborHTMLParser is not None:
+        backends["lexbor"] = lambda t: catalog.parse_html_games(t, backend="lexbor")
+
+    report = []
+    mismatch = False
+    for name, text in pages:
+        row = {"page": name, "bytes": len(text.encode("utf-8"))}
+        reference = None
+        try:
+            legacy_time, reference = timed(legacy_parse_html_games, text, max(1, args.repeat // 2))
+            row["bs4_ms"] = round(legacy_time * 1000, 2)
+            row["games"] = len(reference)
+        except ImportError:
+            row["bs4_ms"] = None
+        for backend, fn in backends.items():
+            elapsed, result = timed(fn, text, args.repeat)
+            row[f"{backend}_ms"] = round(elapsed * 1000, 2)
+            if reference is not None:
+                same = result == reference
+                row[f"{backend}_matches_bs4"] = same
+                mismatch |= not same and backend == "stdlib"
+        report.append(row)
+
+    if importlib.util.find_spec("bs4") is None:
+        report.append({"page": "fuzz", "skipped": "beautifulsoup4 is not installed"})
+    else:
+        rnd = random.Random(1)
+        row = {"page": "fuzz", "cases": args.fuzz}
+        row.update({f"{backend}_mismatches": 0 for backend in backends})
+        for _ in range(args.fuzz):
+            text = make_malformed(rnd)
+            reference = legacy_parse_html_games(text)
+            for backend, fn in backends.items():
+                if fn(text) != reference:
+                    row[f"{backend}_mismatches"] += 1
+        mismatch |= row["stdlib_mismatches"] > 0
+        report.append(row)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    sys.exit(1 if mismatch else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Memory of the launcher's thumbnail path over many catalog refreshes:
+
+    python benchmarks/bench_image_cache.py [--refreshes 200] [--games 2000] [--page 60] [--cache-mb 32] [--rss-budget-mb 24]
+
+Each refresh shows a page of the catalog plus the Recently Played strip, the
+way load_games_async rebuilds the grid: every card asks the ImageCache first
+(app._request_thumbnail) and on a miss a decoded thumbnail is wrapped into a
+CTkImage and put back (app._apply_thumbnail). The cards keep only the images
+of the current refresh. PhotoImage itself needs a display, so the Tk copy of
+each image is not created here; the cost estimate still charges it.
+
+Exits 1 if the cache goes over its byte budget, its accounting drifts from
+its entries, or the process RSS keeps growing after the warm-up refreshes.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import customtkinter as ctk
+
+from benchmarks.fixtures import THUMB_SOURCE_SIZES, make_thumbnail
+from image_cache import ImageCache
+from thumb_decode import decode_thumbnail
+from thumbnails import THUMB_SIZE
+
+RECENT_GAMES = 10
+WARMUP = 20
+
+
+def rss_bytes():
+    """ Resident set size of this process, or None where /proc is not there """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--refreshes", type=int, default=200)
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--page", type=int, default=60)
+    parser.add_argument("--cache-mb", type=int, default=32)
+    parser.add_argument("--rss-budget-mb", type=int, default=24)
+    args = parser.parse_args()
+
+    # One encoded source per size: decoding on every miss is what allocates
+    sources = {i: make_thumbnail(i) for i in range(len(THUMB_SOURCE_SIZES))}
+    urls = [f"https://avatars.example/games/{i}/cover" for i in range(args.games)]
+    recent = urls[:RECENT_GAMES]
+
+    cache = ImageCache(max_bytes=args.cache_mb * 1024 * 1024)
+    cards = []
+    decoded = 0
+    samples = []
+    start = time.perf_counter()
+
+    for refresh in range(args.refreshes):
+        offset = (refresh * 37) % args.games
+        page = recent + [urls[(offset + i) % args.games] for i in range(args.page)]
+        shown = []
+        for index, url in enumerate(page):
+            key = (url, THUMB_SIZE)
+            ctk_img = cache.get(key)
+            if ctk_img is None:
+                thumb = decode_thumbnail(sources[index % len(sources)], THUMB_SIZE, encode_cache=False)[0]
+                decoded += 1
+                img = thumb.image()
+                ctk_img = ctk.CTkImage(light_image=img, dark_image=img, size=THUMB_SIZE)
+                cache.put(key, ctk_img, ImageCache.estimate_cost(THUMB_SIZE))
+            shown.append(ctk_img)
+        # The rebuilt grid: the previous refresh's cards let go of their images
+        cards = shown
+        samples.append(rss_bytes())
+
+    stats = cache.stats()
+    checks = {}
+    report = {
+        "checks": checks,
+        "refreshes": args.refreshes,
+        "cards_per_refresh": len(cards),
+        "decoded": decoded,
+        "seconds": round(time.perf_counter() - start, 2),
+        "cache": stats,
+    }
+    checks["cache_under_budget"] = stats["bytes"] <= stats["max_bytes"]
+    # Every entry is charged the same estimate
+    checks["cache_accounting"] = stats["bytes"] == stats["entries"] * ImageCache.estimate_cost(THUMB_SIZE)
+    checks["cache_reused"] = stats["hits"] > 0 and stats["evictions"] > 0
+    if samples[-1] is not None and args.refreshes > WARMUP:
+        warm, last = samples[WARMUP - 1], samples[-1]
+        mb = 1024 * 1024
+        report["rss_mb"] = {"after_warmup": round(warm / mb, 1), "last": round(last / mb, 1),
+                            "peak": round(max(samples) / mb, 1), "growth": round((last - warm) / mb, 1)}
+        checks["rss_flat"] = last - warm <= args.rss_budget_mb * mb
+    else:
+        report["rss_mb"] = "skipped: no /proc/self/statm"
+    print(json.dumps(report, indent=2))
+    if not all(checks.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Network filter matching (netfilter.py) over a synthetic corpus of request
+URLs from game pages:
+
+    python benchmarks/bench_netfilter.py [--urls 120000] [--rules adblock/rules.json]
+
+    - verdicts are those of the onBeforeRequest listener of adblock/background.js,
+      run in node against the same corpus (skipped when node is not installed)
+    - the token-hash index agrees with the linear scan it replaces
+    - matches per second: linear scan, index, index with the verdict LRU on a
+      page-load-like stream where URLs repeat
+    - memory of the matcher (tracemalloc) and compile vs load of netfilter.json
+
+Exits 1 if a check fails.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import adblock_rules
+import netfilter
+
+# Runs background.js with just enough of the extension API to reach its
+# webRequest listener, then asks it about every URL of the corpus
+HARNESS = r"""
+const fs = require('fs');
+const vm = require('vm');
+const [backgroundPath, rulesPath, urlsPath] = process.argv.slice(2);
+const rules = JSON.parse(fs.readFileSync(rulesPath, 'utf8'));
+const urls = JSON.parse(fs.readFileSync(urlsPath, 'utf8'));
+const event = { addListener: () => {} };
+let listener = null;
+const browser = {
+  storage: { local: { get: async () => ({}), set: async () => {} } },
+  runtime: { getURL: (path) => path, onInstalled: event, onMessage: event },
+  contextMenus: { create: () => {}, onClicked: event },
+  tabs: { get: async () => ({}), sendMessage: () => {}, query: () => {} },
+  webRequest: { onBeforeRequest: { addListener: (fn) => { listener = fn; } } },
+};
+const quiet = { log: () => {}, warn: () => {}, error: () => {} };
+const sandbox = { browser, chrome: browser, console: quiet, URL, fetch: async () => ({ json: async () => rules }) };
+vm.createContext(sandbox);
+vm.runInContext(fs.readFileSync(backgroundPath, 'utf8'), sandbox);
+// loadFilters() resolves on the next turns of the event loop
+setTimeout(async () => {
+  const verdicts = [];
+  for (const url of urls) verdicts.push((await listener({ url, tabId: -1 })).cancel ? '1' : '0');
+  const isBadUrl = vm.runInContext('isBadUrl', sandbox);
+  const start = process.hrtime.bigint();
+  for (const url of urls) isBadUrl(url);
+  const seconds = Number(process.hrtime.bigint() - start) / 1e9;
+  process.stdout.write(JSON.stringify({ verdicts: verdicts.join(''), isBadUrl_per_s: Math.round(urls.length / seconds) }));
+}, 50);
+"""
+
+GAME_HOSTS = ["yandex.ru", "games.s3.yandex.net", "avatars.mds.yandex.net", "yastatic.net", "playhop.com",
+              "app-{n}.games.s3.yandex.net", "cdn.jsdelivr.net", "fonts.gstatic.com", "www.google.com",
+              "an.yandex.ru", "mc.yandex.ru", "yabs.yandex.ru", "sdk.games.s3.yandex.net", "firefox.com",
+              "unpkg.com", "cdnjs.cloudflare.com", "www.gstatic.com", "static.crazygames.com", "readymag.com",
+              "uploads.example.org", "badge.playhop.com", "headshot-cdn.net"]
+AD_PREFIXES = ["", "cdn.", "static.", "pagead2.", "securepubads.g.", "s0.", "ads.", "tracking.", "api."]
+PATH_WORDS = ["game", "assets", "build", "img", "sdk", "loader", "v2", "static", "media", "sprites", "levels",
+              "ads", "ad", "banner", "banners", "promo", "sponsor", "tracking", "analytics", "pixel",
+              "telemetry", "adrec", "adservice", "adsystem", "adsdk", "reads", "uploads", "download",
+              "headshot", "pixelart", "promotion", "Ads", "BANNER", "recaptcha", "system", "context"]
+EXTENSIONS = ["", ".js", ".wasm", ".png", ".json", ".css", ".webp", ".data", "/"]
+# Where new URL() and the regexes are easy to get wrong
+EDGE_CASES = [
+    "/ads/banner.js", "//an.yandex.ru/page/1", "//cdn.example.com/game.js", "data:image/gif;base64,R0lGODlhAQABAA",
+    "blob:https://games.s3.yandex.net/5f1c", "javascript:void(0)", "about:blank", "", "ads", "ad banner",
+    "not a url", "sponsor", "https://x.com:99999/ads", "http://exa mple.com/", "https://реклама.рф/ad",
+    "https://%61dfox.ru/x", "file:///C:/ads/x", "foo://Ads.Host:80/x", "https://a..b/", "https://1.2.3.4./ads",
+    "http://0x7f.1/ads/", "https://[::ffff:127.0.0.1]:8080/banner", "https://user:pw@doubleclick.net@x.com/",
+    "https:\\\\adfox.ru\\x", "  https://yandex.ru/ads/system/context.js\t", "https:example.com/ads",
+    "wss://ads.x:443", "https://xn--zz/", "https://ex%2Fample.com/", "https://faß.de/promo",
+    "https://mc.yandex.ru/metrika/tag.js", "https://yandex.ru/ads/system/context.js", "https://www.google.com/recaptcha/api.js",
+    "https://ads.mozilla.net/x", "HTTPS://SECUREPUBADS.G.DOUBLECLICK.NET/TAG/JS/GPT.JS", "https://x.com/ads\n",
+    "https://x.com/a?ads", "https://x.com/a.ads.", "yandex.ru/ads", "ad.mail.ru/x", "https://x.com/%2Fads/",
+    "http://[::1]/ads", "https://example.com/path/Ads/", "mailto:ads@example.com", "https://ad.mail.ru.evil.com/",
+]
+
+
+def make_corpus(count, filters, seed=24):
+    rnd = random.Random(seed)
+    host_rules = [f for f in filters if "/" not in f]
+    urls = []
+    while len(urls) < count:
+        roll = rnd.random()
+        if roll < 0.03:
+            urls.append(rnd.choice(EDGE_CASES))
+            continue
+        if roll < 0.3:
+            rule = rnd.choice(host_rules)
+            host = rnd.choice(AD_PREFIXES) + (rule if "." in rule else f"{rule}.{rnd.choice(['com', 'net', 'io'])}")
+        else:
+            host = rnd.choice(GAME_HOSTS).format(n=rnd.randint(1, 400000))
+        words = [rnd.choice(PATH_WORDS) if rnd.random() < 0.3 else rnd.choice(PATH_WORDS[:11])
+                 for _ in range(rnd.randint(0, 4))]
+        path = "/" + "/".join(words) + (f"/{rnd.randint(0, 10**6)}" if rnd.random() < 0.7 else "") + rnd.choice(EXTENSIONS)
+        query = rnd.choice(["", "", f"?v={rnd.randint(1, 999)}", f"?ref={rnd.choice(PATH_WORDS)}", "?ads=1"])
+        scheme = rnd.choice(["https", "https", "https", "http", "wss"])
+        url = f"{scheme}://{host}{path}{query}"
+        if rnd.random() < 0.02:
+            url = url.upper()
+        urls.append(url)
+    return urls
+
+
+def page_stream(urls, length, seed=25):
+    """ URLs as a session requests them: a few hot ones over and over """
+    rnd = random.Random(seed)
+    hot = urls[:2000]
+    return [rnd.choice(hot) if rnd.random() < 0.8 else rnd.choice(urls) for _ in range(length)]
+
+
+def linear_blocks(url, filters):
+    """ background.js step by step, with a scan of every filter """
+    if any(e in url for e in netfilter.ESSENTIALS):
+        return False
+    try:
+        host = netfilter.url_hostname(url).lower()
+    except ValueError:
+        text = url.lower()
+        return any(f in text for f in filters) or netfilter.FALLBACK_PATTERN.search(text) is not None
+    return any(f in host for f in filters) or netfilter.AD_PATTERN.search(url) is not None
+
+
+def rate(fn, urls):
+    start = time.perf_counter()
+    for url in urls:
+        fn(url)
+    seconds = time.perf_counter() - start
+    return round(len(urls) / seconds)
+
+
+def run_node(node, urls, rules_path):
+    with tempfile.TemporaryDirectory() as tmp:
+        harness = os.path.join(tmp, "harness.js")
+        corpus = os.path.join(tmp, "urls.json")
+        with open(harness, "w", encoding="utf-8") as f:
+            f.write(HARNESS)
+        with open(corpus, "w", encoding="utf-8") as f:
+            json.dump(urls, f, ensure_ascii=False)
+        proc = subprocess.run([node, harness, os.path.join(ROOT, "adblock", "background.js"), rules_path, corpus],
+                              capture_output=True, text=True, encoding="utf-8", timeout=600)
+        if proc.returncode:
+            raise SystemExit(f"Harness failed:\n{proc.stderr}")
+        return json.loads(proc.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--urls", type=int, default=120000)
+    parser.add_argument("--rules", default=os.path.join(ROOT, "adblock", "rules.json"))
+    args = parser.parse_args()
+
+    with open(args.rules, "r", encoding="utf-8") as f:
+        filters = adblock_rules.compile_network_filters(json.load(f).get("networkFilters") or [])
+    urls = make_corpus(args.urls, filters)
+    checks = {}
+    report = {"checks": checks, "urls": len(urls), "unique_urls": len(set(urls)), "filters": len(filters)}
+
+    # Compile vs the serialized form
+    start = time.perf_counter()
+    compiled = netfilter.compile_filters(filters)
+    compile_ms = (time.perf_counter() - start) * 1000
+    serialized = json.dumps(compiled, separators=(",", ":"))
+    start = time.perf_counter()
+    loaded = json.loads(serialized)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    matcher = netfilter.NetworkFilter(json.loads(serialized), cache_size=0)
+    matcher_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    report["compiled"] = {"compile_ms": round(compile_ms, 3), "load_ms": round(load_ms, 3),
+                          "serialized_bytes": len(serialized), "matcher_bytes": matcher_bytes}
+
+    verdicts = [matcher.blocks(url) for url in urls]
+    report["blocked"] = sum(verdicts)
+    checks["index_matches_linear"] = verdicts == [linear_blocks(url, filters) for url in urls]
+    checks["serialized_roundtrip"] = verdicts == [netfilter.NetworkFilter(compiled, cache_size=0).blocks(url) for url in urls]
+
+    rates = report["matches_per_s"] = {}
+    rates["linear"] = rate(lambda url: linear_blocks(url, filters), urls)
+    rates["index"] = rate(matcher.blocks, urls)
+    hosts = [host for host in (urlhost(url) for url in urls) if host is not None]
+    rates["host_linear"] = rate(lambda host: any(f in host for f in filters), hosts)
+    rates["host_index"] = rate(matcher._has_filter, hosts)
+    stream = page_stream(urls, len(urls))
+    rates["index_page_stream"] = rate(matcher.blocks, stream)
+    cached = netfilter.NetworkFilter(loaded, cache_size=4096)
+    rates["index_lru_page_stream"] = rate(cached.blocks, stream)
+    tracemalloc.start()
+    full = netfilter.NetworkFilter(loaded, cache_size=4096)
+    for url in stream[:20000]:
+        full.blocks(url)
+    report["lru"] = dict(cached.blocks.cache_info()._asdict(), bytes=tracemalloc.get_traced_memory()[0])
+    tracemalloc.stop()
+    checks["index_faster_than_linear"] = rates["host_index"] > rates["host_linear"] and rates["index"] > rates["linear"]
+    checks["lru_faster_on_page_stream"] = rates["index_lru_page_stream"] > rates["index_page_stream"]
+    checks["lru_agrees"] = [cached.blocks(url) for url in stream[:20000]] == [matcher.blocks(url) for url in stream[:20000]]
+
+    node = shutil.which("node")
+    if node is None:
+        report["background_js"] = "skipped: node is not installed"
+    else:
+        js = run_node(node, urls, args.rules)
+        mismatches = [url for url, verdict, expected in zip(urls, verdicts, js["verdicts"]) if verdict != (expected == "1")]
+        report["background_js"] = {"isBadUrl_per_s": js["isBadUrl_per_s"], "mismatches": len(mismatches),
+                                   "examples": sorted(set(mismatches))[:10]}
+        checks["same_verdicts_as_background_js"] = not mismatches
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if not all(checks.values()):
+        sys.exit(1)
+
+
+def urlhost(url):
+    try:
+        return netfilter.url_hostname(url).lower()
+    except ValueError:
+        return None
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Start-up of the packaged app (build_exe.py), onefile against onedir: time
+from Popen to the browser_window probe of a game window process (see
+startup.probe), the step the launcher pays for every game.
+
+    python benchmarks/bench_packaging.py [--repeat 5] [--dist build-bench] [--no-build] [--drop-caches] [--app]
+
+    onefile/Yblox       what every game started before: the full exe, unpacked on each start
+    onefile/YbloxGame   the slim game-window exe next to it
+    onedir/Yblox        the one-folder build, nothing to unpack
+
+Builds keep the console so the probes reach stdout. Cold is the first start
+from a fresh copy of each build; --drop-caches (Linux, root) also drops the
+page cache before it, otherwise the files just copied are still in memory.
+Warm is the median of the next --repeat starts. --app adds the launcher's
+first frame (app_first_frame, under Xvfb on Linux).
+
+Exits 1 if onedir does not start faster than onefile warm, or YbloxGame is
+not smaller and faster than the full onefile exe.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from startup import GAME_EXECUTABLE
+
+EXE = ".exe" if sys.platform == "win32" else ""
+
+
+def build(dist, onedir):
+    """ Build one mode in its own process: PyInstaller keeps state between runs """
+    code = (f"import build_exe; build_exe.build(onedir={onedir}, console=True, "
+            f"workpath={os.path.join(dist, 'work')!r}, distpath={os.path.join(dist, 'dist')!r})")
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode:
+        raise SystemExit(f"Build failed:\n{proc.stderr[-4000:]}")
+    return round(time.perf_counter() - start, 1)
+
+
+def size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(d, name)) for d, _, names in os.walk(path) for name in names)
+
+
+def drop_caches():
+    try:
+        os.sync()
+        with open("/proc/sys/vm/drop_caches", "w") as f:
+            f.write("3\n")
+        return True
+    except OSError:
+        return False
+
+
+def launch(exe, args, env, stage):
+    """ Milliseconds from spawn to stage, or None """
+    start = time.time()
+    proc = subprocess.run([exe, *args], env=dict(env, YBLOX_STARTUP_PROBE="1"), capture_output=True, text=True,
+                          timeout=120)
+    for line in proc.stdout.splitlines():
+        parts = line.split()
+        if len(parts) == 3 and parts[0] == "YBLOX_PROBE" and parts[1] == stage:
+            return round((float(parts[2]) - start) * 1000, 1)
+    print(proc.stderr[-2000:], file=sys.stderr)
+    return None
+
+
+def measure(exe, args, env, stage, repeat, fresh, caches):
+    cold = None
+    if fresh is not None:
+        # A fresh copy: nothing of it has been started before
+        if caches:
+            drop_caches()
+        cold = launch(fresh, args, env, stage)
+    warm = [launch(exe, args, env, stage) for _ in range(repeat)]
+    warm = [ms for ms in warm if ms is not None]
+    return {"cold_ms": cold, "warm_ms": round(statistics.median(warm), 1) if warm else None,
+            "warm_min_ms": min(warm) if warm else None}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--dist", default=None, help="where to build (default: a temporary folder)")
+    parser.add_argument("--no-build", action="store_true", help="measure the builds already in --dist")
+    parser.add_argument("--drop-caches", action="store_true")
+    parser.add_argument("--app", action="store_true", help="also time the launcher's first frame")
+    args = parser.parse_args()
+
+    root = args.dist or tempfile.mkdtemp(prefix="yblox-packaging-")
+    checks = {}
+    report = {"checks": checks, "builds": {}, "browser_window": {}}
+    if args.drop_caches:
+        report["drop_caches"] = drop_caches()
+
+    layouts = {
+        "onefile": {"Yblox": os.path.join("dist", f"Yblox{EXE}"), GAME_EXECUTABLE: os.path.join("dist", f"{GAME_EXECUTABLE}{EXE}")},
+        "onedir": {"Yblox": os.path.join("dist", "Yblox", f"Yblox{EXE}")},
+    }
+    with tempfile.TemporaryDirectory() as appdata, tempfile.TemporaryDirectory() as copies:
+        env = dict(os.environ, APPDATA=appdata)
+        for mode, exes in layouts.items():
+            dist = os.path.join(root, mode)
+            info = report["builds"][mode] = {}
+            if not args.no_build:
+                info["build_s"] = build(dist, onedir=mode == "onedir")
+            fresh_root = os.path.join(copies, mode)
+            shutil.copytree(os.path.join(dist, "dist"), os.path.join(fresh_root, "dist"))
+            for name, relative in exes.items():
+                exe = os.path.join(dist, relative)
+                label = f"{mode}/{name}"
+                info[f"{name}_bytes"] = size(exe if mode == "onefile" else os.path.dirname(exe))
+                report["browser_window"][label] = measure(exe, ["--browser", "--url", "about:blank"], env,
+                                                          "browser_window", args.repeat,
+                                                          os.path.join(fresh_root, relative), args.drop_caches)
+
+        if args.app:
+            from benchmarks.run import start_display
+            display_env, xvfb = start_display()
+            if display_env is None:
+                report["app_first_frame"] = {"skipped": xvfb}
+            else:
+                try:
+                    app_env = dict(env, DISPLAY=display_env.get("DISPLAY", ""))
+                    report["app_first_frame"] = {
+                        mode: measure(os.path.join(root, mode, exes["Yblox"]), [], app_env, "app_first_frame",
+                                      args.repeat, None, False)
+                        for mode, exes in layouts.items()}
+                finally:
+                    if xvfb is not None:
+                        xvfb.kill()
+
+    timings = report["browser_window"]
+    onefile, game, onedir = timings["onefile/Yblox"], timings[f"onefile/{GAME_EXECUTABLE}"], timings["onedir/Yblox"]
+    checks["onedir_faster_than_onefile"] = None not in (onedir["warm_ms"], onefile["warm_ms"]) and \
+        onedir["warm_ms"] < onefile["warm_ms"]
+    checks["game_exe_smaller"] = report["builds"]["onefile"][f"{GAME_EXECUTABLE}_bytes"] < report["builds"]["onefile"]["Yblox_bytes"]
+    checks["game_exe_faster"] = None not in (game["warm_ms"], onefile["warm_ms"]) and game["warm_ms"] < onefile["warm_ms"]
+    report["dist"] = root
+    print(json.dumps(report, indent=2))
+    if not all(checks.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Cost and behaviour of the perf tracing layer:
+
+    python benchmarks/bench_perf.py [--iterations 200000] [--budget-ns 1000]
+
+    - per-span cost with tracing off (the default) and on
+    - the trace file rotates at max_bytes and keeps the configured number of backups
+    - summary() percentiles over known durations
+    - spans recorded by another process (a game window) are read back from its trace file,
+      and SpanReader (the diagnostics panel) picks up only what was appended since its last read
+
+Exits 1 if a check fails or a disabled span costs more than the budget.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import perf
+
+
+def span_cost_ns(tracer, iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        with tracer.span("bench.span", i=i):
+            pass
+    return (time.perf_counter() - start) * 1e9 / iterations
+
+
+def empty_loop_ns(iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        pass
+    return (time.perf_counter() - start) * 1e9 / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--budget-ns", type=float, default=1000)
+    args = parser.parse_args()
+
+    checks = {}
+    report = {"checks": checks}
+    with tempfile.TemporaryDirectory() as tmp:
+        # Overhead, tracing off and on
+        loop = empty_loop_ns(args.iterations)
+        tracer = perf.Tracer()
+        disabled = span_cost_ns(tracer, args.iterations) - loop
+        tracer.configure(os.path.join(tmp, "cost.jsonl"), max_bytes=64 * 1024 * 1024)
+        enabled = span_cost_ns(tracer, args.iterations // 10) - loop
+        tracer.disable()
+        report["span_ns"] = {"disabled": round(disabled, 1), "enabled": round(enabled, 1)}
+        checks["disabled_within_budget"] = disabled <= args.budget_ns
+
+        # Rotation
+        path = os.path.join(tmp, "rotate.jsonl")
+        tracer = perf.Tracer()
+        tracer.configure(path, max_bytes=20 * 1024, backups=2)
+        for i in range(2000):
+            tracer.record("bench.rotate", i, padding="x" * 40)
+        tracer.disable()
+        files = sorted(name for name in os.listdir(tmp) if name.startswith("rotate.jsonl"))
+        sizes = [os.path.getsize(os.path.join(tmp, name)) for name in files]
+        report["rotation"] = dict(zip(files, sizes))
+        checks["rotation_keeps_backups"] = files == ["rotate.jsonl", "rotate.jsonl.1", "rotate.jsonl.2"]
+        checks["rotation_bounded"] = max(sizes) <= 20 * 1024
+        with open(path, encoding="utf-8") as f:
+            last = [json.loads(line) for line in f][-1]
+        checks["summary_written_on_disable"] = last["type"] == "summary" and "bench.rotate" in last["spans"]
+
+        # Percentiles
+        tracer = perf.Tracer()
+        tracer.configure(os.path.join(tmp, "summary.jsonl"))
+        for ms in range(1, 101):
+            tracer.record("bench.known", ms)
+        tracer.count("bench.counter", 3)
+        summary = tracer.summary()["bench.known"]
+        tracer.disable()
+        report["summary"] = summary
+        checks["percentiles"] = (summary["count"], summary["p50"], summary["p95"], summary["max"]) == (100, 51, 96, 100)
+
+        # Another process, as a game window started with --spawn-ts
+        env = dict(os.environ, APPDATA=tmp)
+        code = ("import perf; perf.tracer.configure(perf.trace_path('browser'), process='browser'); "
+                "[perf.record('browser.spawn_to_shown', ms) for ms in (120.0, 180.0)]; perf.tracer.disable()")
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True)
+        browser_trace = os.path.join(tmp, "Yblox", "logs", "trace-browser.jsonl")
+        values = perf.read_spans(browser_trace, "browser.spawn_to_shown")
+        checks["cross_process_spans"] = values == [120.0, 180.0]
+
+        reader = perf.SpanReader(browser_trace, ["browser.spawn_to_shown", "browser.spawn_to_loaded"])
+        first = list(reader.read()["browser.spawn_to_shown"])
+        offset = reader._offset
+        subprocess.run([sys.executable, "-c", code.replace("(120.0, 180.0)", "(240.0,)")], cwd=ROOT, env=env, check=True)
+        appended = os.path.getsize(browser_trace) - offset
+        second = reader.read()
+        checks["span_reader_incremental"] = first == [120.0, 180.0] and \
+            second["browser.spawn_to_shown"] == [120.0, 180.0, 240.0] and reader._offset - offset == appended
+        # Rotated away: the reader starts over on the new file
+        os.replace(browser_trace, browser_trace + ".1")
+        subprocess.run([sys.executable, "-c", code.replace("(120.0, 180.0)", "(300.0,)")], cwd=ROOT, env=env, check=True)
+        checks["span_reader_rotation"] = reader.read()["browser.spawn_to_shown"] == [300.0]
+
+    print(json.dumps(report, indent=2))
+    if not all(checks.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Search-as-you-type over search_index.SearchIndex against the remote search
+it puts in the background (fetch of /games/search plus parsing, served by the
+local fixture server).
+
+    python benchmarks/bench_search.py [--games 10000] [--latency-ms 150] [--budget-ms 10]
+
+Every query is typed one character at a time, as the entry sees it. Reports
+the time to index the catalog page by page and the per-keystroke query time,
+and exits 1 if its p95 is over the budget.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import catalog
+from benchmarks.fixture_server import FixtureServer
+from benchmarks.fixtures import make_games, make_state
+from search_index import SearchIndex
+
+QUERIES = ["block", "Ферма", "ФЕРМА 1", "craft tow", "гонк", "шарик", "puzle", "слиян", "city 42"]
+
+
+def percentile(samples, p):
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--page-size", type=int, default=60)
+    parser.add_argument("--latency-ms", type=float, default=150)
+    parser.add_argument("--remote-repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=10)
+    args = parser.parse_args()
+
+    games = catalog.dedupe_games(catalog.games_from_state(make_state(make_games(args.games, tricky_strings=False))))
+    index = SearchIndex()
+    page_ms = []
+    for start in range(0, len(games), args.page_size):
+        t = time.perf_counter()
+        index.add(games[start:start + args.page_size])
+        page_ms.append((time.perf_counter() - t) * 1000)
+
+    keystroke_ms = []
+    results = {}
+    for query in QUERIES:
+        for end in range(1, len(query) + 1):
+            t = time.perf_counter()
+            found = index.search(query[:end])
+            keystroke_ms.append((time.perf_counter() - t) * 1000)
+        results[query] = {"results": len(found), "top": [g["name"] for g in found[:3]]}
+
+    remote_ms = []
+    with FixtureServer(search_count=args.page_size, latency=args.latency_ms / 1000) as server:
+        import requests
+        session = requests.Session()
+        for i in range(args.remote_repeat):
+            t = time.perf_counter()
+            r = session.get(f"{server.base_url}/games/search", params={"query": QUERIES[i % len(QUERIES)]}, timeout=15)
+            catalog.dedupe_games(catalog.extract_state_games(r.text))
+            remote_ms.append((time.perf_counter() - t) * 1000)
+
+    report = {
+        "indexed_games": len(index),
+        "index_page_ms": {"median": round(statistics.median(page_ms), 3), "max": round(max(page_ms), 3)},
+        "index_total_ms": round(sum(page_ms), 1),
+        "keystroke_ms": {
+            "median": round(statistics.median(keystroke_ms), 3),
+            "p95": round(percentile(keystroke_ms, 0.95), 3),
+            "max": round(max(keystroke_ms), 3)
+        },
+        "remote_search_ms": {"median": round(statistics.median(remote_ms), 1), "latency_ms": args.latency_ms},
+        "budget_ms": args.budget_ms,
+        "queries": results
+    }
+    report["ok"] = report["keystroke_ms"]["p95"] <= args.budget_ms
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if not report["ok"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Startup budgets for both processes, measured from the parent's Popen to the
+probe points in main.py / browser.py (see startup.probe):
+
+    browser_window    main.py --browser is ready to create the game window
+    app_first_frame   YbloxApp is built and drawn once (needs a display, Xvfb on Linux)
+
+    python benchmarks/bench_startup.py [--repeat 5] [--browser-budget-ms 600] [--app-budget-ms 2000] [--importtime]
+
+--importtime adds a breakdown of the slowest imports of each process taken
+from python -X importtime. Exits 1 if a median is over its budget.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.fixture_server import FixtureServer
+from benchmarks.run import start_display
+
+MAIN = os.path.join(ROOT, "main.py")
+
+
+def launch(args, env, stage, python_flags=()):
+    """ Milliseconds from spawn to stage, stderr of the child """
+    env = dict(env, YBLOX_STARTUP_PROBE="1")
+    start = time.time()
+    proc = subprocess.run([sys.executable, *python_flags, MAIN, *args], env=env, cwd=ROOT,
+                          capture_output=True, text=True, timeout=120)
+    for line in proc.stdout.splitlines():
+        parts = line.split()
+        if len(parts) == 3 and parts[0] == "YBLOX_PROBE" and parts[1] == stage:
+            return (float(parts[2]) - start) * 1000, proc.stderr
+    return None, proc.stderr
+
+
+def import_breakdown(stderr, top=12):
+    """ Top-level imports by cumulative time from -X importtime output """
+    rows = []
+    total = 0
+    for line in stderr.splitlines():
+        fields = line[len("import time:"):].split("|") if line.startswith("import time:") else []
+        if len(fields) != 3:
+            continue
+        self_us, cumulative_us, name = fields
+        try:
+            self_us, cumulative_us = int(self_us), int(cumulative_us)
+        except ValueError:
+            continue  # header line
+        total += self_us
+        if not name.startswith("  "):
+            rows.append((cumulative_us, name.strip()))
+    rows.sort(reverse=True)
+    return {"total_ms": round(total / 1000, 1), "top": [{"module": n, "cumulative_ms": round(c / 1000, 1)} for c, n in rows[:top]]}
+
+
+def measure(name, args, env, stage, repeat, budget_ms, importtime):
+    samples = []
+    for _ in range(repeat):
+        elapsed, stderr = launch(args, env, stage)
+        if elapsed is None:
+            tail = stderr.strip().splitlines()[-1:] or ["no probe output"]
+            return {"skipped": f"{name} did not reach {stage}: {tail[0]}"}
+        samples.append(elapsed)
+    median = statistics.median(samples)
+    result = {
+        "stage": stage,
+        "runs": repeat,
+        "min_ms": round(min(samples), 1),
+        "median_ms": round(median, 1),
+        "max_ms": round(max(samples), 1),
+        "budget_ms": budget_ms,
+        "ok": median <= budget_ms
+    }
+    if importtime:
+        result["imports"] = import_breakdown(launch(args, env, stage, ("-X", "importtime"))[1])
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--browser-budget-ms", type=float, default=600)
+    parser.add_argument("--app-budget-ms", type=float, default=2000)
+    parser.add_argument("--importtime", action="store_true")
+    args = parser.parse_args()
+
+    report = {}
+    with tempfile.TemporaryDirectory() as appdata, FixtureServer(game_count=60) as server:
+        # Throwaway profile; the catalog request of the launcher stays on this machine
+        with open(os.path.join(appdata, "Yblox_settings.json"), "w", encoding="utf-8") as f:
+            json.dump({"catalog_base_url": server.catalog_url}, f)
+        env = dict(os.environ, APPDATA=appdata)
+
+        report["browser"] = measure("browser", ["--browser", "--url", f"{server.base_url}/games/", "--title", "Probe"],
+                                    env, "browser_window", args.repeat, args.browser_budget_ms, args.importtime)
+
+        display_env, xvfb = start_display()
+        if display_env is None:
+            report["app"] = {"skipped": xvfb}
+        else:
+            try:
+                display_env["APPDATA"] = appdata
+                report["app"] = measure("app", [], display_env, "app_first_frame", args.repeat, args.app_budget_ms, args.importtime)
+            finally:
+                if xvfb is not None:
+                    xvfb.terminate()
+                    xvfb.wait()
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if any(entry.get("ok") is False for entry in report.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Compare the old four-regex state extraction with catalog.extract_state_games.
+
+    python benchmarks/bench_state_extract.py [--page saved_page.html ...] [--repeat 20]
+
+legacy_ms is the whole old path: the four regexes and, whenever they found
+fewer than 3 games, building the BeautifulSoup tree of the fallback (a lower
+bound of it: parsing the cards comes on top). Without bs4 installed the
+fallback cannot be timed and legacy_ms covers the regexes only.
+
+On the synthetic pages exits 1 if the single pass does not find every game.
+"""
+import argparse
+import html
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import catalog
+from benchmarks.fixtures import make_page
+
+# Маркеры без присваивания перед настоящим блоком состояния
+BARE_MARKERS = "<script>if (window.initialState) x(); var initialState; window.__INITIAL_STATE__ || 0;</script>"
+
+LEGACY_PATTERNS = [
+    r'initialState\s*=\s*({.*?});',
+    r'__INITIAL_STATE__\s*=\s*({.*?});',
+    r'data-state="({.*?})"',
+    r'<script type="application/json" id="initial-state">({.*?})</script>'
+]
+
+
+def legacy_extract(text):
+    """ The pre-catalog.py path: four lazy DOTALL regexes run one after another """
+    games = []
+    for pattern in LEGACY_PATTERNS:
+        match = re.search(pattern, text, re.DOTALL)
+        if not match:
+            continue
+        try:
+            raw_json = match.group(1)
+            if pattern == LEGACY_PATTERNS[2]:
+                raw_json = html.unescape(raw_json)
+            games.extend(catalog.games_from_state(json.loads(raw_json)))
+        except ValueError:
+            pass
+    return games
+
+
+def legacy_fallback(text):
+    """ Lower bound of what the old path paid whenever it found < 3 games: building the soup """
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(text, "html.parser")
+
+
+def timed(fn, text, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--page", action="append", default=[])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    # Games on each synthetic page; saved pages are only timed
+    expected = {"synthetic-300-plain": 300, "synthetic-300": 300, "synthetic-2000": 2000,
+                "synthetic-300-bare-markers": 300}
+    pages = [(path, open(path, encoding="utf-8").read()) for path in args.page]
+    if not pages:
+        pages = [
+            # Лучший случай для старого пути: в строках нет "};", regex захватывает блок целиком
+            ("synthetic-300-plain", make_page(300, tricky_strings=False)),
+            ("synthetic-300", make_page(300)),
+            ("synthetic-2000", make_page(2000, head_kb=1500)),
+            ("synthetic-300-bare-markers", make_page(300).replace("<body>", "<body>" + BARE_MARKERS, 1))
+        ]
+
+    report = []
+    failed = False
+    for name, text in pages:
+        regex_time, legacy_games = timed(legacy_extract, text, args.repeat)
+        new_time, new_games = timed(catalog.extract_state_games, text, args.repeat)
+        fallback_time = None
+        if len(legacy_games) < 3:
+            try:
+                fallback_time = timed(legacy_fallback, text, min(args.repeat, 3))[0]
+            except ImportError:
+                pass
+        legacy_time = regex_time + (fallback_time or 0)
+        report.append({
+            "page": name,
+            "bytes": len(text.encode("utf-8")),
+            "legacy_ms": round(legacy_time * 1000, 3),
+            "legacy_games": len(legacy_games),
+            "legacy_regex_ms": round(regex_time * 1000, 3),
+            # null when the old path did not need the fallback or bs4 is not installed
+            "legacy_fallback_ms": round(fallback_time * 1000, 3) if fallback_time is not None else None,
+            "single_pass_ms": round(new_time * 1000, 3),
+            "single_pass_games": len(new_games),
+            "speedup": round(legacy_time / new_time, 2) if new_time else None
+        })
+        if name in expected and len(new_games) != expected[name]:
+            failed = True
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+LocalStore (store.py) against the JSON files it replaces.
+
+    python benchmarks/bench_store.py [--history 5000] [--plays 500]
+
+Measures on the calling thread, which is the Tk thread in the app:
+    - play_game persistence: rewriting Yblox_recent.json vs LocalStore.record_play
+    - a settings change: rewriting Yblox_settings.json vs LocalStore.put_settings
+    - startup reads of settings and the recently played strip
+    - a catalog snapshot lookup
+
+and checks that migrate_json carries settings, history order, catalog
+snapshots and the thumbnail index over unchanged. Exits 1 if it does not.
+"""
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from store import LocalStore
+
+SETTINGS = {
+    "adblock_enabled": True,
+    "theme": "Dark",
+    "catalog_cache_ttl": 600,
+    "catalog_cache_max_stale": 86400,
+    "thumbnail_workers": 6,
+    "catalog_base_url": "https://yandex.ru/games"
+}
+
+
+def make_card(i):
+    app_id = 100000 + i * 7
+    return {
+        "name": f"Игра {i}",
+        "app_id": app_id,
+        "app_url": f"https://yandex.ru/games/app/{app_id}",
+        "thumb_url": f"https://avatars.mds.yandex.net/get-games/{app_id}/cover/pjpg256x256",
+        "rating": 4.5,
+        "plays": 1000 + i
+    }
+
+
+def timed(fn, repeat):
+    samples = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return {"median_us": round(statistics.median(samples), 1), "p95_us": round(sorted(samples)[int(len(samples) * 0.95)], 1)}
+
+
+def legacy_save_recent(path, recent, game):
+    """ The pre-store play_game path: move to front, cap at 8, rewrite the file """
+    recent[:] = [g for g in recent if g["app_url"] != game["app_url"]]
+    recent.insert(0, game)
+    del recent[8:]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(recent, f, ensure_ascii=False, indent=4)
+
+
+def legacy_load(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def check_migration(tmp):
+    settings_path = os.path.join(tmp, "Yblox_settings.json")
+    recent_path = os.path.join(tmp, "Yblox_recent.json")
+    catalog_dir = os.path.join(tmp, "catalog")
+    thumbs_dir = os.path.join(tmp, "thumbs")
+    os.makedirs(catalog_dir)
+    os.makedirs(thumbs_dir)
+
+    recent = [make_card(i) for i in range(8)]
+    entry = {"url": "https://yandex.ru/games/?page=1", "fetched_at": 1700000000.0, "etag": '"abc"',
+             "last_modified": None, "games": [make_card(i) for i in range(40)]}
+    index = {f"{i:064x}": {"file": f"{i:064x}.webp", "size": 1000 + i, "atime": 1700000000.0 + i} for i in range(20)}
+    with open(settings_path, "w", encoding="utf-8") as f:
+        json.dump(SETTINGS, f)
+    with open(recent_path, "w", encoding="utf-8") as f:
+        json.dump(recent, f)
+    with open(os.path.join(catalog_dir, "page.json"), "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+    with open(os.path.join(thumbs_dir, "index.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f)
+
+    store = LocalStore(os.path.join(tmp, "migrated.db"))
+    store.migrate_json(settings_path, recent_path, catalog_dir, thumbs_dir)
+    again = store.migrate_json(settings_path, recent_path, catalog_dir, thumbs_dir)
+    strip = lambda g: {k: v for k, v in g.items() if k not in ("play_count", "last_played")}
+    result = {
+        "settings": store.get_settings() == SETTINGS,
+        "history_order": [strip(g) for g in store.recent_games(8)] == recent,
+        "catalog": store.get_catalog(entry["url"]) == entry,
+        "thumbnails": store.thumbnail_index() == index,
+        "runs_once": again == {},
+        "cache_files_removed": not os.listdir(catalog_dir) and not os.path.exists(os.path.join(thumbs_dir, "index.json"))
+    }
+    store.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--history", type=int, default=5000)
+    parser.add_argument("--plays", type=int, default=500)
+    args = parser.parse_args()
+
+    report = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        games = [make_card(i) for i in range(args.history)]
+
+        # --- JSON files ---
+        recent_path = os.path.join(tmp, "Yblox_recent.json")
+        settings_path = os.path.join(tmp, "Yblox_settings.json")
+        catalog_path = os.path.join(tmp, "catalog.json")
+        recent = []
+
+        def save_settings(i):
+            with open(settings_path, "w", encoding="utf-8") as f:
+                json.dump(dict(SETTINGS, adblock_enabled=bool(i % 2)), f, ensure_ascii=False, indent=4)
+
+        with open(catalog_path, "w", encoding="utf-8") as f:
+            json.dump({"url": "u", "fetched_at": 0, "games": games[:60]}, f, ensure_ascii=False)
+        report["json"] = {
+            "play_game": timed(lambda i: legacy_save_recent(recent_path, recent, games[i % len(games)]), args.plays),
+            "save_settings": timed(save_settings, args.plays),
+            "startup_read": timed(lambda i: (legacy_load(settings_path), legacy_load(recent_path)), 200),
+            "catalog_lookup": timed(lambda i: legacy_load(catalog_path), 200),
+            "history_kept": len(recent)
+        }
+
+        # --- LocalStore ---
+        store = LocalStore(os.path.join(tmp, "Yblox.db"))
+        store.put_settings(SETTINGS)
+        store.put_catalog({"url": "u", "fetched_at": 0, "etag": None, "last_modified": None, "games": games[:60]})
+        for i, game in enumerate(games):
+            store.record_play(game, played_at=1700000000.0 + i)
+        store.flush()
+        batches = store.batches
+        report["store"] = {
+            "play_game": timed(lambda i: store.record_play(games[i % len(games)]), args.plays),
+            "save_settings": timed(lambda i: store.put_settings(dict(SETTINGS, adblock_enabled=bool(i % 2))), args.plays),
+            "startup_read": timed(lambda i: (store.get_settings(), store.recent_games(8)), 200),
+            "catalog_lookup": timed(lambda i: store.get_catalog("u"), 200)
+        }
+        start = time.perf_counter()
+        store.flush()
+        report["store"]["writer_drain_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        report["store"]["commits_for_first_batch"] = {"writes": args.history + 2, "transactions": batches}
+        report["store"]["history_kept"] = store._query("SELECT COUNT(*) FROM history")[0][0]
+        store.close()
+
+        migration_dir = os.path.join(tmp, "migration")
+        os.makedirs(migration_dir)
+        with contextlib.redirect_stdout(sys.stderr):
+            report["migration"] = check_migration(migration_dir)
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if not all(report["migration"].values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
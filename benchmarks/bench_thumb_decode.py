@@ -0,0 +1,159 @@
+"""
+Thumbnail decode/resize pipeline on a corpus of real-sized images
+(256x256 up to 1920x1080, JPEG and opaque PNG):
+
+    python benchmarks/bench_thumb_decode.py [--images 48] [--workers 6] [--processes N] [--budget-ms 0.1]
+
+    legacy     full decode, RGBA, LANCZOS in the download threads (the old loader)
+    threads    thumb_decode.decode_thumbnail in the download threads
+    processes  the same through ThumbnailLoader's process pool
+
+For each mode: throughput, the lag of a 5 ms ticker on the main thread while
+the corpus is processed (the Tk loop stand-in), and the main-thread time per
+thumbnail to turn the result into the image CTkImage scales (PhotoImage
+itself needs a display; it pastes RGBA as is, as the legacy images were).
+
+Exits 1 if a check fails, the pool does not lower the main-thread lag or the
+main-thread time per thumbnail exceeds the budget.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from PIL import Image, ImageChops, ImageStat
+
+import perf
+from benchmarks.fixtures import make_thumbnail
+from thumb_decode import decode_thumbnail
+from thumbnails import THUMB_SIZE, ThumbnailLoader, default_processes
+
+TICK_S = 0.005
+
+
+def corpus(count):
+    """ Same sizes as the fixture server, every fourth image a PNG """
+    return [make_thumbnail(i, "PNG" if i % 4 == 3 else "JPEG") for i in range(count)]
+
+
+def legacy_decode(data):
+    img = Image.open(BytesIO(data))
+    img.load()
+    if img.mode != "RGBA":
+        img = img.convert("RGBA")
+    return img.resize(THUMB_SIZE, Image.Resampling.LANCZOS)
+
+
+def run_mode(decode, images, workers):
+    """ (seconds, main-thread lags in ms, results in corpus order) """
+    results = [None] * len(images)
+    done = threading.Event()
+
+    def work():
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for index, result in enumerate(pool.map(decode, images)):
+                results[index] = result
+        done.set()
+
+    lags = []
+    start = time.perf_counter()
+    threading.Thread(target=work, daemon=True).start()
+    while not done.is_set():
+        tick = time.perf_counter()
+        time.sleep(TICK_S)
+        lags.append((time.perf_counter() - tick - TICK_S) * 1000)
+    return time.perf_counter() - start, lags, results
+
+
+def main_thread_ms(wrap, results, repeat=5):
+    """ Best of repeat: per-thumbnail cost of what the UI thread does with a result """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for result in results:
+            # CTkImage resizes to its size (a copy at scaling 1.0) before PhotoImage
+            wrap(result).resize(THUMB_SIZE)
+        elapsed = (time.perf_counter() - start) * 1000 / len(results)
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def mean_difference(a, b):
+    return sum(ImageStat.Stat(ImageChops.difference(a.convert("RGB"), b.convert("RGB"))).mean) / 3
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=48)
+    parser.add_argument("--workers", type=int, default=6, help="download threads, as thumbnail_workers")
+    parser.add_argument("--processes", type=int, default=default_processes())
+    parser.add_argument("--budget-ms", type=float, default=0.1, help="main-thread time per thumbnail")
+    args = parser.parse_args()
+
+    images = corpus(args.images)
+    in_thread = ThumbnailLoader(processes=0)
+    pooled = ThumbnailLoader(processes=args.processes)
+    # Workers start with the first image in the app; not part of the measurement here
+    pooled.decode(images[0])
+
+    modes = {
+        "legacy": (legacy_decode, lambda img: img),
+        "threads": (lambda data: in_thread.decode(data)[0], lambda thumb: thumb.image()),
+        "processes": (lambda data: pooled.decode(data)[0], lambda thumb: thumb.image())
+    }
+    report = {"images": len(images), "corpus_mb": round(sum(map(len, images)) / 1e6, 1),
+              "workers": args.workers, "processes": args.processes, "cpus": os.cpu_count(), "modes": {}}
+    outputs = {}
+    for name, (decode, wrap) in modes.items():
+        seconds, lags, results = run_mode(decode, images, args.workers)
+        outputs[name] = results
+        lags.sort()
+        report["modes"][name] = {
+            "images_per_s": round(len(images) / seconds, 1),
+            "main_thread_ms_per_thumb": round(main_thread_ms(wrap, results), 3),
+            "main_lag_p50_ms": round(perf.percentile(lags, 0.5), 2),
+            "main_lag_p95_ms": round(perf.percentile(lags, 0.95), 2),
+            "main_lag_max_ms": round(lags[-1], 2)
+        }
+    pooled.close()
+
+    legacy, threads, processes = (report["modes"][name] for name in ("legacy", "threads", "processes"))
+    differences = [mean_difference(old, new.image()) for old, new in zip(outputs["legacy"], outputs["threads"])]
+    report["max_mean_pixel_difference"] = round(max(differences), 2)
+
+    # Reduced-scale JPEG decoding: a 1920x1080 source never gets decoded at full size
+    big = Image.open(BytesIO(make_thumbnail(3)))
+    big.draft("RGB", THUMB_SIZE)
+    # Transparency survives, an opaque alpha channel is dropped
+    transparent = Image.new("RGBA", (640, 360), (255, 0, 0, 0))
+    buf = BytesIO()
+    transparent.save(buf, format="PNG")
+    transparent_thumb = decode_thumbnail(buf.getvalue(), THUMB_SIZE)[0]
+    opaque_png = decode_thumbnail(images[3], THUMB_SIZE)[1]
+
+    checks = {
+        "same_pixels_as_legacy": report["max_mean_pixel_difference"] <= 3,
+        "processes_match_threads": all(a == b for a, b in zip(outputs["threads"], outputs["processes"])),
+        "thumb_size": all(thumb.size == THUMB_SIZE for thumb in outputs["processes"]),
+        "opaque_png_resized_as_rgb": Image.open(BytesIO(opaque_png)).mode == "RGB",
+        "transparency_kept": transparent_thumb.image().getpixel((0, 0))[3] == 0,
+        "jpeg_draft_reduces": big.size[0] < 1920 and big.size[0] >= THUMB_SIZE[0],
+        "faster_than_legacy": max(threads["images_per_s"], processes["images_per_s"]) > legacy["images_per_s"],
+        "main_thread_within_budget": processes["main_thread_ms_per_thumb"] <= args.budget_ms,
+        "pool_keeps_main_thread_responsive": processes["main_lag_p95_ms"] < legacy["main_lag_p95_ms"]
+    }
+    report["checks"] = checks
+    print(json.dumps(report, indent=2))
+    if not all(checks.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
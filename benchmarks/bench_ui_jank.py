@@ -0,0 +1,130 @@
+"""
+UI jank gate built on stall_watchdog:
+
+    python benchmarks/bench_ui_jank.py [--lag-p95-ms 50] [--max-stalls 5] [--output report.json]
+
+1. Self-test on a bare Tcl interpreter (no display needed): slow after()
+   callbacks, a lambda and a block outside any callback must be recorded as
+   stalls, attributed and with a stack sample that shows the culprit.
+2. The launcher under a display (DISPLAY, or Xvfb on Linux; skipped without
+   one) driven by jank_probe.py against the fixture server. The heartbeat lag
+   p95 and the number of stalls are gated; the slowest callbacks are listed.
+
+Exits 1 if a check fails or a gate is exceeded.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tkinter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.fixture_server import FixtureServer
+from benchmarks.run import start_display
+from stall_watchdog import StallWatchdog
+
+
+def slow_render():
+    time.sleep(0.2)
+
+
+def blocked_outside_callbacks():
+    time.sleep(0.2)
+
+
+def self_test():
+    root = tkinter.Tcl()
+    original = tkinter.Misc._register
+    watchdog = StallWatchdog(root, threshold_ms=80, heartbeat_ms=20, sample_ms=10).start()
+    done = []
+    root.after(30, slow_render)
+    root.after(300, lambda: time.sleep(0.15))
+    for _ in range(200):
+        root.after(0, lambda: None)
+    root.after(900, lambda: done.append(True))
+
+    blocked = False
+    while not done:
+        root.tk.dooneevent()
+        if not blocked and watchdog.heartbeat.count > 25:
+            blocked = True
+            blocked_outside_callbacks()
+    watchdog.stop()
+
+    report = watchdog.export()
+    stalls = {stall["callback"].split(" (")[0]: stall for stall in report["stalls"]}
+    named = stalls.get(f"{__name__}.slow_render")
+    lambdas = [stall for name, stall in stalls.items() if "<lambda>" in name]
+    loop = stalls.get("(main loop)")
+
+    def sampled(stall, function):
+        return stall is not None and any(function in line for s in stall["stacks"] for line in s["stack"])
+
+    checks = {
+        "named_callback_stall": named is not None and named["ms"] >= 200,
+        "named_callback_stack": sampled(named, "slow_render"),
+        "lambda_attributed": bool(lambdas) and lambdas[0]["ms"] >= 150,
+        "main_loop_stall": loop is not None and sampled(loop, "blocked_outside_callbacks"),
+        "fast_callbacks_timed": sum(h["count"] for name, h in report["callbacks"].items() if "<lambda>" in name) >= 200,
+        "only_real_stalls": len(report["stalls"]) == 3,
+        "register_restored": tkinter.Misc._register is original
+    }
+    return checks, report["summary"]
+
+
+def app_run(lag_p95_ms, max_stalls, output):
+    env, xvfb = start_display()
+    if env is None:
+        return None, {"skipped": xvfb}
+    try:
+        with tempfile.TemporaryDirectory() as tmp, FixtureServer(game_count=120) as server:
+            path = os.path.join(tmp, "watchdog.json")
+            env["YBLOX_WATCHDOG"] = path
+            proc = subprocess.run([sys.executable, os.path.join(ROOT, "benchmarks", "jank_probe.py"),
+                                   "--base-url", server.base_url], env=env, capture_output=True, text=True, timeout=300)
+            if not os.path.exists(path):
+                tail = (proc.stderr or proc.stdout).strip().splitlines()[-1:] or [f"exit code {proc.returncode}"]
+                return None, {"skipped": f"jank probe failed: {tail[0]}"}
+            with open(path, encoding="utf-8") as f:
+                report = json.load(f)
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait()
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    summary = report["summary"]
+    slowest = [{"callback": name, "max_ms": h["max_ms"], "count": h["count"]}
+               for name, h in list(report["callbacks"].items())[:8]]
+    checks = {"lag_p95": summary["lag_p95_ms"] <= lag_p95_ms, "stalls": summary["stalls"] <= max_stalls}
+    return checks, {"summary": summary, "slowest_callbacks": slowest,
+                    "stalls": [{"callback": s["callback"], "ms": s["ms"]} for s in report["stalls"]]}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lag-p95-ms", type=float, default=50)
+    parser.add_argument("--max-stalls", type=int, default=5)
+    parser.add_argument("--output", help="full watchdog report of the app run (histograms, stacks)")
+    args = parser.parse_args()
+
+    checks, summary = self_test()
+    result = {"self_test": {"checks": checks, "summary": summary}}
+    app_checks, result["app"] = app_run(args.lag_p95_ms, args.max_stalls, args.output)
+    if app_checks is not None:
+        result["app"]["checks"] = app_checks
+        checks = dict(checks, **{f"app_{name}": ok for name, ok in app_checks.items()})
+
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    if not all(checks.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
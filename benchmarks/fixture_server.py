@@ -0,0 +1,211 @@
+"""
+Local stand-in for yandex.ru/games and avatars.mds.yandex.net.
+
+    /games/                       home page (?page=N for the next pages)
+    /games/search?query=...       search results
+    /games/category/<slug>        category listing (?page=N), with categories=N
+    /thumbs/<app_id>/cover/<any>  cover image, 256x256 up to 1920x1080, JPEG or PNG
+
+Pages are synthetic (see fixtures.py) unless a directory with recorded
+home.html / search.html is given. Image URLs in synthetic pages point back at
+this server, so nothing leaves the machine.
+
+With categories=N the home page links N categories of category_pages pages
+each; neighbouring listings overlap by a quarter, as real sections share
+games. fail_every=K answers every K-th category request with 503.
+"""
+import gzip
+import hashlib
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.fixtures import make_page, make_thumbnail
+
+
+class FixtureServer:
+    def __init__(self, game_count=300, search_count=60, fixtures_dir=None, latency=0.0, host="127.0.0.1", port=0,
+                 categories=0, category_pages=5, fail_every=0):
+        self.game_count = game_count
+        self.search_count = search_count
+        self.fixtures_dir = fixtures_dir
+        self.latency = latency
+        self.category_slugs = [f"category-{i}" for i in range(categories)]
+        self.category_pages = category_pages
+        self.fail_every = fail_every
+        self.category_requests = 0
+        # (monotonic start time, path) of every request, for politeness checks
+        self.request_log = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._pages = {}
+        self._thumbs = {}
+        self._gzipped = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+
+        self.httpd = ThreadingHTTPServer((host, port), type("Handler", (_Handler,), {"fixtures": self}))
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://{host}:{self.httpd.server_address[1]}"
+        self._thread = None
+
+    @property
+    def catalog_url(self):
+        return f"{self.base_url}/games"
+
+    @property
+    def image_base(self):
+        return f"{self.base_url}/thumbs"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fixture-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _recorded(self, name):
+        if not self.fixtures_dir:
+            return None
+        path = os.path.join(self.fixtures_dir, name)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+    def listing(self, kind, query="", page=0):
+        """ (first_index, count) of the games a page lists, see fixtures.make_games """
+        if kind != "category":
+            return 0, self.game_count if kind == "home" else self.search_count
+        if query not in self.category_slugs or page >= self.category_pages:
+            return 0, 0
+        step = self.search_count - self.search_count // 4
+        start = self.game_count // 2 + (self.category_slugs.index(query) * self.category_pages + page) * step
+        return start, self.search_count
+
+    def page(self, kind, query="", page=0):
+        """ Page body as bytes; built once per (kind, query, page) """
+        key = (kind, query, page)
+        with self._lock:
+            body = self._pages.get(key)
+        if body is not None:
+            return body
+        text = self._recorded(f"{kind}.html") if not page else None
+        if text is None:
+            seed = int(hashlib.sha1(f"{kind}:{query}:{page}".encode("utf-8")).hexdigest()[:8], 16)
+            first_index, count = self.listing(kind, query, page)
+            text = make_page(count, seed=seed, image_base=self.image_base, first_index=first_index,
+                             category_slugs=self.category_slugs if kind == "home" else ())
+        body = text.encode("utf-8")
+        with self._lock:
+            self._pages[key] = body
+        return body
+
+    def gzipped(self, body):
+        # Compressed once, so fetch timings do not include the server's gzip work
+        key = hashlib.sha1(body).digest()
+        with self._lock:
+            data = self._gzipped.get(key)
+        if data is None:
+            data = gzip.compress(body, compresslevel=6)
+            with self._lock:
+                self._gzipped[key] = data
+        return data
+
+    def thumbnail(self, app_id):
+        """ (content_type, bytes); every third size class is served as PNG """
+        with self._lock:
+            cached = self._thumbs.get(app_id)
+        if cached is not None:
+            return cached
+        fmt = "PNG" if (app_id // 4) % 3 == 0 else "JPEG"
+        cached = ("image/png" if fmt == "PNG" else "image/jpeg", make_thumbnail(app_id, fmt))
+        with self._lock:
+            self._thumbs[app_id] = cached
+        return cached
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    fixtures = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, content_type, body):
+        headers = {"Content-Type": content_type}
+        if content_type.startswith("text/") and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = self.fixtures.gzipped(body)
+            headers["Content-Encoding"] = "gzip"
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up on the request (cancelled crawl, stale search)
+            self.close_connection = True
+
+    def do_GET(self):
+        fixtures = self.fixtures
+        with fixtures._lock:
+            fixtures.requests += 1
+            fixtures.request_log.append((time.monotonic(), self.path))
+            fixtures.in_flight += 1
+            fixtures.peak_in_flight = max(fixtures.peak_in_flight, fixtures.in_flight)
+        try:
+            self._serve()
+        finally:
+            with fixtures._lock:
+                fixtures.in_flight -= 1
+
+    def _serve(self):
+        fixtures = self.fixtures
+        if fixtures.latency:
+            time.sleep(fixtures.latency)
+
+        parts = urlsplit(self.path)
+        params = parse_qs(parts.query)
+        path = parts.path.rstrip("/")
+        try:
+            page = int(params.get("page", ["0"])[0])
+        except ValueError:
+            page = 0
+
+        if path == "/games":
+            self._send(200, "text/html; charset=utf-8", fixtures.page("home", page=page))
+        elif path == "/games/search":
+            query = params.get("query", [""])[0]
+            self._send(200, "text/html; charset=utf-8", fixtures.page("search", query, page))
+        elif path.startswith("/games/category/"):
+            with fixtures._lock:
+                fixtures.category_requests += 1
+                fail = fixtures.fail_every and fixtures.category_requests % fixtures.fail_every == 0
+            if fail:
+                self._send(503, "text/plain", b"try again")
+            elif path.split("/")[3] in fixtures.category_slugs:
+                self._send(200, "text/html; charset=utf-8", fixtures.page("category", path.split("/")[3], page))
+            else:
+                self._send(404, "text/plain", b"not found")
+        elif path.startswith("/thumbs/"):
+            try:
+                app_id = int(path.split("/")[2])
+            except (IndexError, ValueError):
+                self._send(404, "text/plain", b"not found")
+                return
+            content_type, body = fixtures.thumbnail(app_id)
+            self._send(200, content_type, body)
+        else:
+            self._send(404, "text/plain", b"not found")
@@ -0,0 +1,99 @@
+"""
+Deterministic stand-ins for recorded yandex.ru/games pages.
+
+Pages mimic the real layout: a large <head> full of inline scripts, an embedded
+state object whose strings contain "};" (which truncates the old lazy regexes)
+and the card markup the HTML fallback parser reads.
+Pass a real saved page to the benchmarks with --page to use it instead.
+"""
+import json
+import random
+
+WORDS = ["Block", "Craft", "Race", "Puzzle", "Merge", "Tower", "Zombie", "Farm", "City", "Ninja",
+         "Пазл", "Гонки", "Ферма", "Башня", "Шарики", "Кубики", "Слияние", "Стрелялка"]
+
+
+IMAGE_BASE = "https://avatars.mds.yandex.net/get-games"
+
+
+def make_games(count, seed=1, tricky_strings=True, image_base=IMAGE_BASE, first_index=0):
+    """ Games first_index .. first_index + count of one endless catalog: ids depend on the index only """
+    rnd = random.Random(seed)
+    games = []
+    for i in range(first_index, first_index + count):
+        app_id = 100000 + i * 7
+        games.append({
+            "appID": app_id,
+            "title": {"ru": f"{rnd.choice(WORDS)} {rnd.choice(WORDS)} {i}"},
+            "media": {"cover": {"prefix-url": f"{image_base}/{app_id}/cover/"}},
+            "rating": round(rnd.uniform(3.5, 5.0), 2),
+            "playersCount": rnd.randint(100, 5_000_000),
+            # Встречается в описаниях и ломает ленивый regex ({.*?});
+            "description": "if (a) { b(); }; " * rnd.randint(1, 4) if tricky_strings else "Описание игры",
+        })
+    return games
+
+
+def make_state(games):
+    per_section = 12
+    sections = [{"id": f"section-{i}", "title": f"Section {i}", "items": [{"game": g} for g in games[i:i + per_section]]}
+                for i in range(0, len(games), per_section)]
+    return {"feed": {"items": []}, "catalog": {"sections": sections}, "experiments": {"flags": ["x"] * 200}}
+
+
+def make_cards_html(games):
+    cards = []
+    for g in games:
+        cover = g["media"]["cover"]["prefix-url"] + "pjpg256x256"
+        cards.append(
+            f'<div class="game-card"><div class="game-card__media"><a href="/games/app/{g["appID"]}?utm=feed">'
+            f'<img class="game-card__image" src="{cover}" alt=""></a></div>'
+            f'<div class="game-card__info"><span class="game-card__title">{g["title"]["ru"]}</span>'
+            f'<span class="game-card__rating">{g["rating"]}</span></div></div>'
+        )
+    return "\n".join(cards)
+
+
+def make_category_nav(slugs):
+    if not slugs:
+        return ""
+    links = "".join(f'<a class="category-link" href="/games/category/{slug}">{slug}</a>' for slug in slugs)
+    return f'<nav class="categories">{links}</nav>'
+
+
+def make_page(game_count=300, with_state=True, head_kb=400, seed=1, tricky_strings=True, image_base=IMAGE_BASE,
+              first_index=0, category_slugs=()):
+    games = make_games(game_count, seed, tricky_strings, image_base, first_index)
+    filler = "var t=function(){return 1};" * (head_kb * 1024 // 28)
+    state = ""
+    if with_state:
+        state = f"<script>window.__INITIAL_STATE__ = {json.dumps(make_state(games), ensure_ascii=False)};</script>"
+    return (f'<!DOCTYPE html><html lang="ru"><head><meta charset="utf-8"><title>Игры</title>'
+            f'<script>{filler}</script></head><body>{make_category_nav(category_slugs)}'
+            f'<div id="root">{make_cards_html(games)}</div>'
+            f'{state}</body></html>')
+
+
+# Размеры обложек, которые реально отдает avatars.mds.yandex.net
+THUMB_SOURCE_SIZES = ((256, 256), (640, 360), (1280, 720), (1920, 1080))
+
+
+def make_thumbnail(app_id, fmt="JPEG"):
+    """ Encoded test image; size and content depend on app_id only """
+    from io import BytesIO
+    from PIL import Image, ImageDraw
+
+    width, height = THUMB_SOURCE_SIZES[app_id % len(THUMB_SOURCE_SIZES)]
+    rnd = random.Random(app_id)
+    img = Image.new("RGB", (width, height), (rnd.randint(0, 255), rnd.randint(0, 255), rnd.randint(0, 255)))
+    draw = ImageDraw.Draw(img)
+    for _ in range(40):
+        x, y = rnd.randint(0, width), rnd.randint(0, height)
+        draw.ellipse((x, y, x + width // 6, y + height // 6), fill=(rnd.randint(0, 255), rnd.randint(0, 255), rnd.randint(0, 255)))
+    buf = BytesIO()
+    if fmt == "PNG":
+        img.putalpha(255)
+        img.save(buf, format="PNG")
+    else:
+        img.save(buf, format=fmt, quality=85)
+    return buf.getvalue()
@@ -0,0 +1,81 @@
+"""
+Drives YbloxApp the way a user does while the stall watchdog records:
+first catalog page with thumbnails, scrolling the grid step by step, then
+typing a search one key at a time. Started by bench_ui_jank.py in a
+subprocess that already has a display (DISPLAY or Xvfb); the app writes the
+watchdog report itself on close (YBLOX_WATCHDOG=<path>.json).
+
+    python benchmarks/jank_probe.py --base-url http://127.0.0.1:PORT
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SCROLL_STEPS = 20
+SCROLL_STEP_MS = 40
+TYPED_QUERY = "block"
+KEY_MS = 120
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", required=True)
+    parser.add_argument("--timeout", type=float, default=120)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="yblox-jank-", ignore_cleanup_errors=True) as appdata:
+        os.environ["APPDATA"] = appdata
+        with open(os.path.join(appdata, "Yblox_settings.json"), "w", encoding="utf-8") as f:
+            json.dump({"catalog_base_url": f"{args.base_url}/games", "catalog_crawl_enabled": False}, f)
+        run_probe(args)
+
+
+def run_probe(args):
+    import app as app_main
+
+    class JankProbe(app_main.YbloxApp):
+        def __init__(self):
+            self._started = False
+            super().__init__()
+            self.after(int(args.timeout * 1000), self.on_close)
+
+        def _on_games_loaded(self, games, token):
+            super()._on_games_loaded(games, token)
+            if not self._started:
+                self._started = True
+                self._wait_thumbnails()
+
+        def _wait_thumbnails(self):
+            stats = self.thumb_scheduler.snapshot()
+            if stats["queue_depth"] or stats["in_flight"]:
+                self.after(20, self._wait_thumbnails)
+                return
+            self._scroll(0)
+
+        def _scroll(self, step):
+            if step > SCROLL_STEPS:
+                self._type(1)
+                return
+            self.game_grid.canvas.yview_moveto(step / SCROLL_STEPS)
+            self.after(SCROLL_STEP_MS, lambda: self._scroll(step + 1))
+
+        def _type(self, length):
+            if length > len(TYPED_QUERY):
+                # Time for the last search to come back and render
+                self.after(1500, self.on_close)
+                return
+            self.search_entry.delete(0, "end")
+            self.search_entry.insert(0, TYPED_QUERY[:length])
+            self._on_search_typed()
+            self.after(KEY_MS, lambda: self._type(length + 1))
+
+    JankProbe().mainloop()
+
+
+if __name__ == "__main__":
+    main()
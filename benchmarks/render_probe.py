@@ -0,0 +1,94 @@
+"""
+Times YbloxApp.display_games against the fixture server.
+Started by run.py in a subprocess that already has a display (DISPLAY or Xvfb);
+the app gets a throwaway APPDATA whose settings point the catalog at the server.
+
+    python benchmarks/render_probe.py --base-url http://127.0.0.1:PORT --output samples.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", required=True)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--timeout", type=float, default=120)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="yblox-bench-", ignore_cleanup_errors=True) as appdata:
+        os.environ["APPDATA"] = appdata
+        with open(os.path.join(appdata, "Yblox_settings.json"), "w", encoding="utf-8") as f:
+            json.dump({"catalog_base_url": f"{args.base_url}/games"}, f)
+        run_probe(args)
+
+
+def run_probe(args):
+    import app as app_main
+
+    class ProbeApp(app_main.YbloxApp):
+        def __init__(self):
+            self.samples = {}
+            self.cards = 0
+            super().__init__()
+            self.after(int(args.timeout * 1000), lambda: self._finish("timeout"))
+
+        def _sample(self, name, seconds):
+            self.samples.setdefault(name, []).append(seconds)
+
+        def _on_games_loaded(self, games, request_id):
+            start = time.perf_counter()
+            super()._on_games_loaded(games, request_id)
+            self.update_idletasks()
+            self._sample("display.first", time.perf_counter() - start)
+            self._wait_thumbnails(start, games)
+
+        def _wait_thumbnails(self, start, games):
+            stats = self.thumb_scheduler.snapshot()
+            if stats["queue_depth"] or stats["in_flight"]:
+                self.after(5, lambda: self._wait_thumbnails(start, games))
+                return
+            self._sample("display.thumbnails_settled", time.perf_counter() - start)
+            self.after(50, lambda: self._run(games))
+
+        def _run(self, games):
+            # Same games in another order: every visible card is rebound, none created
+            for i in range(args.repeat):
+                order = games[::-1] if i % 2 == 0 else games
+                start = time.perf_counter()
+                self.display_games(order)
+                self.update_idletasks()
+                self._sample("display.rebind", time.perf_counter() - start)
+
+            grid = self.game_grid
+            steps = max(args.repeat, 2)
+            for i in range(steps + 1):
+                start = time.perf_counter()
+                grid.canvas.yview_moveto(i / steps)
+                grid._render()
+                self.update_idletasks()
+                self._sample("display.scroll_step", time.perf_counter() - start)
+            self.cards = len(grid._windows)
+            self._finish(None)
+
+        def _finish(self, error):
+            if getattr(self, "_finished", False):
+                return
+            self._finished = True
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump({"samples": self.samples, "cards": self.cards, "error": error}, f)
+            self.on_close()
+
+    ProbeApp().mainloop()
+
+
+if __name__ == "__main__":
+    main()
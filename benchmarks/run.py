@@ -0,0 +1,277 @@
+"""
+Offline end-to-end benchmark: catalog pages and thumbnails are served by a
+local fixture server, every pipeline stage is timed on its own and the result
+is written as JSON, so two commits can be compared.
+
+    python benchmarks/run.py --output before.json
+    python benchmarks/run.py --output after.json --compare before.json [--fail-over 1.25]
+    python benchmarks/run.py --fixtures saved_pages/   # recorded home.html / search.html
+
+Stages:
+    fetch.*        GET of the page from the local server (gzip, keep-alive session)
+    extract.*      catalog.extract_state_games
+    html_parse.*   catalog.parse_html_games for every installed backend
+    dedupe         catalog.dedupe_games
+    thumbnails.*   ThumbnailScheduler + ThumbnailLoader until every callback fired
+    display.*      YbloxApp.display_games, see render_probe.py; on Linux without
+                   DISPLAY it runs under Xvfb and is skipped if Xvfb is missing
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import requests
+
+import catalog
+from benchmarks.fixture_server import FixtureServer
+from thumbnails import ThumbnailLoader, ThumbnailScheduler
+from store import LocalStore
+from thumb_cache import ThumbnailDiskCache
+
+# Те же заголовки, что отправляет CatalogService (catalog_service.py), без Referer
+FETCH_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
+    "Accept-Language": "ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive"
+}
+
+
+def summarize(samples):
+    """ Seconds -> milliseconds statistics """
+    ordered = sorted(samples)
+    n = len(ordered)
+    ms = lambda value: round(value * 1000, 3)
+    return {
+        "runs": n,
+        "min_ms": ms(ordered[0]),
+        "median_ms": ms(ordered[n // 2] if n % 2 else (ordered[n // 2 - 1] + ordered[n // 2]) / 2),
+        "p95_ms": ms(ordered[min(n - 1, round(0.95 * (n - 1)))]),
+        "max_ms": ms(ordered[-1])
+    }
+
+
+def timed(fn, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return samples, result
+
+
+def run_thumbnails(urls, workers, disk_cache=None):
+    """ Seconds until every submitted thumbnail has been delivered, and the failure count """
+    loader = ThumbnailLoader(pool_size=workers, disk_cache=disk_cache)
+    scheduler = ThumbnailScheduler(loader, workers=workers)
+    remaining = [len(urls)]
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def delivered(img):
+        with lock:
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                done.set()
+
+    start = time.perf_counter()
+    for index, url in enumerate(urls):
+        # Same priority shape as the app: (-generation, index)
+        scheduler.submit(url, delivered, (-1, index))
+    finished = done.wait(timeout=300)
+    elapsed = time.perf_counter() - start
+    loader.close()
+    if not finished:
+        raise RuntimeError("thumbnail pipeline did not finish in 300 s")
+    return elapsed, scheduler.snapshot()["failed"]
+
+
+def start_display():
+    """ (env, xvfb_process) for the render probe, or (None, reason) """
+    env = dict(os.environ)
+    if not sys.platform.startswith("linux") or env.get("DISPLAY"):
+        return env, None
+    if shutil.which("Xvfb") is None:
+        return None, "no DISPLAY and Xvfb is not installed"
+    read_fd, write_fd = os.pipe()
+    xvfb = subprocess.Popen(["Xvfb", "-displayfd", str(write_fd), "-screen", "0", "1280x800x24", "-nolisten", "tcp"],
+                            pass_fds=(write_fd,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as f:
+        number = f.readline().strip()
+    if not number:
+        xvfb.kill()
+        return None, "Xvfb did not start"
+    env["DISPLAY"] = f":{number}"
+    return env, xvfb
+
+
+def run_display(server, repeat):
+    env, xvfb = start_display()
+    if env is None:
+        return {"display": {"skipped": xvfb}}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "samples.json")
+            proc = subprocess.run([sys.executable, os.path.join(ROOT, "benchmarks", "render_probe.py"),
+                                   "--base-url", server.base_url, "--repeat", str(repeat), "--output", output],
+                                  env=env, capture_output=True, text=True, timeout=300)
+            if not os.path.exists(output):
+                tail = (proc.stderr or proc.stdout).strip().splitlines()[-1:] or [f"exit code {proc.returncode}"]
+                return {"display": {"skipped": f"render probe failed: {tail[0]}"}}
+            with open(output, encoding="utf-8") as f:
+                probe = json.load(f)
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait()
+    if probe["error"]:
+        return {"display": {"skipped": f"render probe: {probe['error']}"}}
+    stages = {name: summarize(samples) for name, samples in probe["samples"].items()}
+    stages["display.rebind"]["cards"] = probe["cards"]
+    return stages
+
+
+def git_revision():
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+    return f"{rev}-dirty" if rev and dirty else rev or None
+
+
+def run_suite(args):
+    stages = {}
+    with FixtureServer(args.games, args.search_games, args.fixtures, args.latency_ms / 1000) as server:
+        session = requests.Session()
+        session.headers.update(FETCH_HEADERS)
+        pages = {"home": f"{server.catalog_url}/", "search": f"{server.catalog_url}/search?query=block"}
+        texts = {}
+        for name, url in pages.items():
+            session.get(url, timeout=15)  # соединение и генерация фикстуры не входят в замер
+            samples, response = timed(lambda: session.get(url, timeout=15).text, args.repeat)
+            texts[name] = response
+            stages[f"fetch.{name}"] = dict(summarize(samples), bytes=len(response.encode("utf-8")))
+
+        found = {}
+        for name, text in texts.items():
+            samples, found[name] = timed(lambda: catalog.extract_state_games(text), args.repeat)
+            stages[f"extract.{name}"] = dict(summarize(samples), games=len(found[name]))
+
+        # Резервный разбор HTML всегда меряется на главной странице
+        backends = ["stdlib"] + (["lexbor"] if catalog.LexborHTMLParser is not None else [])
+        for backend in backends:
+            samples, parsed = timed(lambda: catalog.parse_html_games(texts["home"], backend=backend), args.repeat)
+            stages[f"html_parse.{backend}"] = dict(summarize(samples), games=len(parsed))
+
+        combined = found["home"] + found["search"]
+        samples, unique = timed(lambda: catalog.dedupe_games(combined), args.repeat)
+        stages["dedupe"] = dict(summarize(samples), games=len(unique))
+
+        urls = [g["thumb_url"] for g in catalog.dedupe_games(found["home"])][:args.thumbnails]
+        for url in urls:
+            session.get(url, timeout=15)  # картинки генерируются сервером заранее
+        cold, failed = [], 0
+        for _ in range(args.thumbnail_repeat):
+            elapsed, errors = run_thumbnails(urls, args.workers)
+            cold.append(elapsed)
+            failed += errors
+        stages["thumbnails.network"] = dict(summarize(cold), thumbnails=len(urls), failed=failed)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            store = LocalStore(os.path.join(tmp, "Yblox.db"))
+            disk_cache = ThumbnailDiskCache(os.path.join(tmp, "thumbs"), store, max_bytes=512 * 1024 * 1024)
+            run_thumbnails(urls, args.workers, disk_cache)
+            warm = [run_thumbnails(urls, args.workers, disk_cache)[0] for _ in range(args.thumbnail_repeat)]
+            store.close()
+        stages["thumbnails.disk_cache"] = dict(summarize(warm), thumbnails=len(urls))
+
+        if args.skip_display:
+            stages["display"] = {"skipped": "--skip-display"}
+        else:
+            stages.update(run_display(server, args.repeat))
+
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "fixtures": args.fixtures or "synthetic",
+            "games": args.games,
+            "search_games": args.search_games,
+            "latency_ms": args.latency_ms,
+            "repeat": args.repeat
+        },
+        "stages": stages
+    }
+
+
+def compare(result, baseline, fail_over):
+    """ Print median deltas; returns the names of stages slower than fail_over x baseline """
+    regressions = []
+    print(f"{'stage':<28}{'baseline':>12}{'current':>12}{'ratio':>8}", file=sys.stderr)
+    for name, stage in result["stages"].items():
+        old = baseline.get("stages", {}).get(name, {})
+        if "median_ms" not in stage or "median_ms" not in old:
+            continue
+        ratio = stage["median_ms"] / old["median_ms"] if old["median_ms"] else 1.0
+        flag = ""
+        if fail_over and ratio > fail_over:
+            regressions.append(name)
+            flag = "  <-- regression"
+        print(f"{name:<28}{old['median_ms']:>10.2f}ms{stage['median_ms']:>10.2f}ms{ratio:>8.2f}{flag}", file=sys.stderr)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=300, help="games on the synthetic home page")
+    parser.add_argument("--search-games", type=int, default=60)
+    parser.add_argument("--fixtures", help="directory with recorded home.html / search.html")
+    parser.add_argument("--latency-ms", type=float, default=0, help="delay added to every server response")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--thumbnails", type=int, default=120)
+    parser.add_argument("--thumbnail-repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=6)
+    parser.add_argument("--skip-display", action="store_true")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    parser.add_argument("--compare", help="JSON of an earlier run")
+    parser.add_argument("--fail-over", type=float, default=0, help="exit 1 if a median grows by more than this factor")
+    args = parser.parse_args()
+
+    # Приложение и планировщик печатают диагностику; stdout оставляем для JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        result = run_suite(args)
+
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(result, baseline, args.fail_over):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import os
+import sys
+import time
+
+import perf
+from startup import probe, resource_path
+
+# Browser process using pywebview (Edge WebView2).
+# Started once per game, so everything the launcher UI needs stays out of here.
+
+
+def parse_args(argv):
+    url = ""
+    title = "Game"
+    adblock_enabled = True
+    asset_proxy = "--asset-proxy" in argv
+
+    if "--url" in argv:
+        url = argv[argv.index("--url") + 1]
+    if "--title" in argv:
+        title = argv[argv.index("--title") + 1]
+    if "--adblock-off" in argv:
+        adblock_enabled = False
+    return url, title, adblock_enabled, asset_proxy
+
+
+def spawn_timestamp(argv):
+    """ Wall-clock time the launcher started this process at (--spawn-ts), or None """
+    if "--spawn-ts" not in argv:
+        return None
+    try:
+        return float(argv[argv.index("--spawn-ts") + 1])
+    except (IndexError, ValueError):
+        return None
+
+
+def trace_startup(window, spawn_ts):
+    """ Time from the launcher's click to the window shown and to the first page load """
+    reported = set()
+
+    def report(name):
+        # loaded fires again on every navigation inside the game
+        if name not in reported:
+            reported.add(name)
+            perf.record(name, (time.time() - spawn_ts) * 1000)
+            perf.tracer.flush()
+
+    window.events.shown += lambda: report("browser.spawn_to_shown")
+    window.events.loaded += lambda: report("browser.spawn_to_loaded")
+
+
+# Load adblock scripts
+def get_adblock_script():
+    try:
+        import adblock_bundle
+
+        # Готовый бандл (build_exe.py) или собранный и закэшированный при первом запуске
+        cache_dir = os.path.join(os.environ.get('APPDATA', os.path.expanduser('~')), "Yblox", "adblock")
+        return adblock_bundle.load_bundle(resource_path("adblock"), cache_dir)
+    except Exception as e:
+        print(f"Adblock error: {e}")
+        return ""
+
+
+def start_asset_proxy(adblock_enabled):
+    """
+    Local caching proxy of the game window (asset_proxy.py), or None.
+    WebView2 appends WEBVIEW2_ADDITIONAL_BROWSER_ARGUMENTS to the switches
+    pywebview passes, so it has to be set before the window is created.
+    """
+    try:
+        import app_settings
+        from asset_proxy import AssetCache, AssetProxy
+
+        store = app_settings.open_store()
+        settings = app_settings.load_settings(store)
+        cache = AssetCache(os.path.join(app_settings.data_dir(), "assets"), store,
+                           max_bytes=settings.get("asset_cache_mb", 512) * 1024 * 1024)
+        blocked = None
+        if adblock_enabled:
+            import netfilter
+            blocked = netfilter.load(resource_path("adblock"), os.path.join(app_settings.data_dir(), "adblock")).blocks
+        proxy = AssetProxy(cache, blocked).start()
+    except Exception as e:
+        print(f"Asset proxy error: {e}")
+        return None
+
+    args = os.environ.get("WEBVIEW2_ADDITIONAL_BROWSER_ARGUMENTS", "")
+    os.environ["WEBVIEW2_ADDITIONAL_BROWSER_ARGUMENTS"] = f"{args} --proxy-server=http://{proxy.address}".strip()
+    print(f"Asset proxy on {proxy.address}")
+    return proxy
+
+
+def stop_asset_proxy(proxy):
+    if proxy is None:
+        return
+    proxy.stop()
+    proxy.cache.store.close()
+    print(f"Asset proxy: {proxy.stats}")
+
+
+_profile_lock = None
+
+
+def webview_storage(proxy):
+    """
+    webview.start() options: with the proxy the window keeps a persistent
+    profile, so HTTPS assets it cannot see into stay in WebView2's own cache.
+    One process at a time: WebView2 refuses a profile already open with
+    other switches (another proxy port), the rest stay in private mode.
+    """
+    global _profile_lock
+    if proxy is None:
+        return {}
+    import app_settings
+
+    path = os.path.join(app_settings.data_dir(), "webview")
+    os.makedirs(path, exist_ok=True)
+    f = open(os.path.join(path, "yblox.lock"), "a+b")
+    try:
+        if sys.platform == "win32":
+            import msvcrt
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        print("WebView2 profile in use, private mode")
+        return {}
+    # Held until the process exits
+    _profile_lock = f
+    return {"private_mode": False, "storage_path": path}
+
+
+def inject_adblock(window, adblock_js):
+    if adblock_js:
+        # Initial injection
+        window.evaluate_js(adblock_js)
+
+        # Try to set up persistent injection for all frames via WebView2 API
+        try:
+            # pywebview uses edgechromium on Windows.
+            # We can try to access the underlying CoreWebView2 to inject into all frames
+            # This works for Edge Chromium (WebView2)
+            if hasattr(window, 'gui') and hasattr(window.gui, 'browser'):
+                browser = window.gui.browser
+                if hasattr(browser, 'CoreWebView2'):
+                    core = browser.CoreWebView2
+                    # This ensures the script runs in every frame (including cross-domain iframes)
+                    core.AddScriptToExecuteOnDocumentCreatedAsync(adblock_js)
+                    print("Adblock enabled for all frames via WebView2 API")
+        except Exception as e:
+            print(f"Frame injection error: {e}")
+
+        print("Adblock injected into main frame")
+
+
+def main(argv=None):
+    argv = sys.argv if argv is None else argv
+    url, title, adblock_enabled, asset_proxy = parse_args(argv)
+    # The launcher only passes it while its tracing is on
+    spawn_ts = spawn_timestamp(argv)
+    if spawn_ts is not None:
+        perf.tracer.configure(perf.trace_path("browser"), process="browser")
+
+    import webview
+
+    with perf.span("browser.adblock_load", enabled=adblock_enabled):
+        adblock_js = get_adblock_script() if adblock_enabled else ""
+
+    def on_loaded(window):
+        inject_adblock(window, adblock_js)
+
+    if probe("browser_window"):
+        return
+    proxy = start_asset_proxy(adblock_enabled) if asset_proxy else None
+    window = webview.create_window(title, url, width=1280, height=720, background_color='#1B1D1F')
+    if spawn_ts is not None:
+        trace_startup(window, spawn_ts)
+    webview.start(on_loaded, window, gui='edgechromium', **webview_storage(proxy))
+    stop_asset_proxy(proxy)
+    perf.tracer.disable()
+
+
+if __name__ == "__main__":
+    main()
+    sys.exit(0)
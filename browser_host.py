@@ -0,0 +1,431 @@
+import json
+import os
+import secrets
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+# Long-lived browser process that opens game windows on request.
+#
+# Protocol: JSON lines over a localhost TCP connection. Every request carries
+# the token the launcher handed to the host through YBLOX_HOST_TOKEN; the host
+# writes {"port", "pid"} to the handshake file once it can open windows.
+#
+#   {"token": ..., "cmd": "ping"}                                   -> {"ok": true, "pid": ..., "windows": n}
+#   {"token": ..., "cmd": "open", "url": ..., "title": ..., "adblock": true} -> {"ok": true, "window": id}
+#   {"token": ..., "cmd": "close", "window": id}                    -> {"ok": true}
+#   {"token": ..., "cmd": "lease"}     kept open by the launcher; when it closes the host
+#                                      exits as soon as no game window is left
+#   {"token": ..., "cmd": "shutdown"}  -> {"ok": true}; refused while game windows are open
+
+TOKEN_ENV = "YBLOX_HOST_TOKEN"
+PROTOCOL_VERSION = 1
+
+
+def _send(conn, message):
+    conn.sendall((json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8"))
+
+
+def _recv(stream):
+    line = stream.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+
+# --- Window backends ---
+
+class WebviewBackend:
+    """ pywebview on the main thread; a hidden window keeps the runtime warm between games """
+
+    def __init__(self, on_closed, start_options=None):
+        self.on_closed = on_closed
+        self.start_options = start_options or {}
+        self._webview = None
+        self._keepalive = None
+        self._windows = {}
+
+    def run(self, ready):
+        import webview
+
+        self._webview = webview
+        self._keepalive = webview.create_window("Yblox", html="", hidden=True)
+        webview.start(ready, gui='edgechromium', **self.start_options)
+
+    def open(self, url, title, adblock_js):
+        from browser import inject_adblock
+
+        window = self._webview.create_window(title, url, width=1280, height=720, background_color='#1B1D1F')
+        injected = []
+
+        def on_loaded():
+            # Injected once; the document-created script then covers later navigations
+            if not injected:
+                injected.append(True)
+                inject_adblock(window, adblock_js)
+
+        window.events.loaded += on_loaded
+        window.events.closed += lambda: self._closed(id(window))
+        self._windows[id(window)] = window
+        return id(window)
+
+    def _closed(self, window_id):
+        self._windows.pop(window_id, None)
+        self.on_closed(window_id)
+
+    def close(self, window_id):
+        window = self._windows.get(window_id)
+        if window is not None:
+            window.destroy()
+
+    def stop(self):
+        for window in list(self._webview.windows):
+            window.destroy()
+
+
+class StubBackend:
+    """ No GUI: records requests so the protocol and lifecycle can be exercised anywhere """
+
+    def __init__(self, on_closed, start_options=None):
+        self.on_closed = on_closed
+        self.opened = []
+        self._stopped = threading.Event()
+
+    def run(self, ready):
+        threading.Thread(target=ready, daemon=True).start()
+        self._stopped.wait()
+
+    def open(self, url, title, adblock_js):
+        self.opened.append((url, title, len(adblock_js)))
+        print(f"Stub window {len(self.opened)}: {title} {url}")
+        return len(self.opened)
+
+    def close(self, window_id):
+        # What the user closing the window would report
+        self.on_closed(window_id)
+
+    def stop(self):
+        self._stopped.set()
+
+
+BACKENDS = {"webview": WebviewBackend, "stub": StubBackend}
+
+
+# --- Host ---
+
+class BrowserHost:
+    def __init__(self, token, backend="webview", adblock_loader=None, start_options=None):
+        self.token = token
+        self.backend = BACKENDS[backend](self._window_closed, start_options)
+        self.adblock_loader = adblock_loader
+        self.adblock_js = ""
+        self.windows = set()
+        self.leased = False
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stopping = False
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(8)
+        self.port = self.sock.getsockname()[1]
+
+    def serve(self, handshake_path):
+        """ Blocks on the window backend until shutdown """
+        def ready():
+            # Payload is prepared once for every window this host will open
+            if self.adblock_loader is not None:
+                self.adblock_js = self.adblock_loader()
+            self._ready.set()
+            _write_handshake(handshake_path, {"port": self.port, "pid": os.getpid(), "version": PROTOCOL_VERSION})
+
+        threading.Thread(target=self._accept_loop, name="browser-host", daemon=True).start()
+        self.backend.run(ready)
+        self.sock.close()
+
+    def _accept_loop(self):
+        while not self._stopping:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        with conn, conn.makefile("r", encoding="utf-8") as stream:
+            try:
+                request = _recv(stream)
+            except (OSError, ValueError):
+                return
+            if not isinstance(request, dict) or not secrets.compare_digest(str(request.get("token", "")), self.token):
+                _send(conn, {"ok": False, "error": "unauthorized"})
+                return
+            try:
+                self._dispatch(conn, stream, request)
+            except Exception as e:
+                print(f"Browser host error: {e}")
+                try:
+                    _send(conn, {"ok": False, "error": str(e)})
+                except OSError:
+                    pass
+
+    def _dispatch(self, conn, stream, request):
+        cmd = request.get("cmd")
+        if cmd == "ping":
+            with self._lock:
+                windows = len(self.windows)
+            _send(conn, {"ok": self._ready.is_set(), "pid": os.getpid(), "windows": windows})
+        elif cmd == "open":
+            if not self._ready.wait(timeout=10):
+                _send(conn, {"ok": False, "error": "not ready"})
+                return
+            adblock_js = self.adblock_js if request.get("adblock", True) else ""
+            window_id = self.backend.open(request["url"], request.get("title") or "Game", adblock_js)
+            with self._lock:
+                self.windows.add(window_id)
+            _send(conn, {"ok": True, "window": window_id})
+        elif cmd == "close":
+            with self._lock:
+                known = request.get("window") in self.windows
+            if not known:
+                _send(conn, {"ok": False, "error": "no such window"})
+                return
+            self.backend.close(request["window"])
+            _send(conn, {"ok": True})
+        elif cmd == "lease":
+            with self._lock:
+                self.leased = True
+            _send(conn, {"ok": True})
+            # Blocks until the launcher goes away, cleanly or not
+            try:
+                while stream.readline():
+                    pass
+            except OSError:
+                pass
+            print("Launcher disconnected")
+            self._release()
+        elif cmd == "shutdown":
+            # Games the user still has open are not closed from outside
+            with self._lock:
+                windows = len(self.windows)
+            if windows:
+                _send(conn, {"ok": False, "error": f"{windows} game windows open"})
+                return
+            _send(conn, {"ok": True})
+            self.shutdown()
+        else:
+            _send(conn, {"ok": False, "error": f"unknown command {cmd!r}"})
+
+    def _window_closed(self, window_id):
+        with self._lock:
+            self.windows.discard(window_id)
+            orphaned = not self.leased and not self.windows
+        if orphaned:
+            self.shutdown()
+
+    def _release(self):
+        # Open games keep running; the host leaves with the last of them
+        with self._lock:
+            self.leased = False
+            idle = not self.windows
+        if idle:
+            self.shutdown()
+
+    def shutdown(self):
+        if self._stopping:
+            return
+        self._stopping = True
+        self.backend.stop()
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+def _write_handshake(path, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def main(argv=None):
+    argv = sys.argv if argv is None else argv
+    token = os.environ.get(TOKEN_ENV)
+    if not token or "--handshake" not in argv:
+        print("browser host: missing token or --handshake")
+        sys.exit(2)
+    handshake_path = argv[argv.index("--handshake") + 1]
+    backend = argv[argv.index("--backend") + 1] if "--backend" in argv else "webview"
+
+    def load_adblock():
+        from browser import get_adblock_script
+        return get_adblock_script()
+
+    # One proxy for every window: its filter follows the adblock setting the host was started with
+    proxy = None
+    start_options = {}
+    if "--asset-proxy" in argv:
+        from browser import start_asset_proxy, webview_storage
+        proxy = start_asset_proxy("--adblock-off" not in argv)
+        start_options = webview_storage(proxy)
+
+    BrowserHost(token, backend, load_adblock, start_options).serve(handshake_path)
+    if proxy is not None:
+        from browser import stop_asset_proxy
+        stop_asset_proxy(proxy)
+
+
+# --- Launcher side ---
+
+class BrowserHostClient:
+    """
+    Starts the host in the background and keeps it healthy: it is pinged every
+    ping_interval seconds and restarted if it died or stopped answering, at
+    most max_restarts times. open_game() returns False whenever the host cannot
+    take the request, so the caller can fall back to a process per game.
+    """
+
+    def __init__(self, command, handshake_path, ping_interval=5.0, max_restarts=3, start_timeout=30.0, env=None):
+        self.command = list(command)
+        self.handshake_path = handshake_path
+        self.ping_interval = ping_interval
+        self.max_restarts = max_restarts
+        self.start_timeout = start_timeout
+        self.env = env
+        self.token = secrets.token_hex(16)
+        self.port = None
+        self.process = None
+        self.restarts = 0
+        self.state = "stopped"  # stopped, starting, ready, failed
+        self._lease = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closing = False
+        self.stats = {"opened": 0, "fallbacks": 0, "restarts": 0, "open_time_total": 0.0}
+
+    def start(self):
+        self._closing = False
+        threading.Thread(target=self._monitor, name="browser-host-monitor", daemon=True).start()
+
+    def is_ready(self):
+        return self.state == "ready"
+
+    def _spawn(self):
+        try:
+            os.remove(self.handshake_path)
+        except OSError:
+            pass
+        env = dict(self.env if self.env is not None else os.environ)
+        env[TOKEN_ENV] = self.token
+        self.state = "starting"
+        self.process = subprocess.Popen(self.command + ["--handshake", self.handshake_path], env=env)
+
+        deadline = time.monotonic() + self.start_timeout
+        while time.monotonic() < deadline and not self._closing:
+            if self.process.poll() is not None:
+                break
+            try:
+                with open(self.handshake_path, "r", encoding="utf-8") as f:
+                    handshake = json.load(f)
+                if handshake.get("pid") == self.process.pid:
+                    self.port = handshake["port"]
+                    self._lease = self._connect({"cmd": "lease"}, keep=True)
+                    self.state = "ready"
+                    print(f"Browser host ready on port {self.port} (pid {self.process.pid})")
+                    return True
+            except (OSError, ValueError, KeyError):
+                pass
+            time.sleep(0.05)
+        print("Browser host did not start")
+        self._kill()
+        return False
+
+    def _kill(self):
+        self.state = "stopped"
+        if self._lease is not None:
+            try:
+                self._lease.close()
+            except OSError:
+                pass
+            self._lease = None
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+
+    def _connect(self, request, keep=False, timeout=5.0):
+        conn = socket.create_connection(("127.0.0.1", self.port), timeout=timeout)
+        try:
+            _send(conn, dict(request, token=self.token))
+            with conn.makefile("r", encoding="utf-8") as stream:
+                response = _recv(stream)
+            if not response or not response.get("ok"):
+                raise OSError((response or {}).get("error", "no response"))
+        except BaseException:
+            conn.close()
+            raise
+        if keep:
+            conn.settimeout(None)
+            return conn
+        conn.close()
+        return response
+
+    def ping(self):
+        try:
+            return self._connect({"cmd": "ping"}, timeout=2.0)
+        except (OSError, ValueError):
+            return None
+
+    def _monitor(self):
+        while not self._closing:
+            healthy = (self.state == "ready" and self.process.poll() is None and self.ping() is not None)
+            if not healthy and not self._closing:
+                with self._lock:
+                    if self.process is not None:
+                        self._kill()
+                        if self.restarts >= self.max_restarts:
+                            self.state = "failed"
+                            print("Browser host keeps failing, falling back to a process per game")
+                            return
+                        self.restarts += 1
+                        self.stats["restarts"] += 1
+                    self._spawn()
+            self._wake.wait(self.ping_interval)
+            self._wake.clear()
+
+    def open_game(self, url, title, adblock=True):
+        if self.state != "ready":
+            self.stats["fallbacks"] += 1
+            return False
+        start = time.perf_counter()
+        try:
+            self._connect({"cmd": "open", "url": url, "title": title, "adblock": adblock}, timeout=15.0)
+        except (OSError, ValueError) as e:
+            print(f"Browser host request failed: {e}")
+            self.state = "starting"
+            self._wake.set()
+            self.stats["fallbacks"] += 1
+            return False
+        self.stats["opened"] += 1
+        self.stats["open_time_total"] += time.perf_counter() - start
+        return True
+
+    def stop(self):
+        """
+        Let go of the host: a ready one keeps the games that are open and
+        exits after the last of them is closed; one that never became ready
+        has no windows and is killed
+        """
+        self._closing = True
+        self._wake.set()
+        with self._lock:
+            if self.state == "ready" and self._lease is not None:
+                try:
+                    self._lease.close()
+                except OSError:
+                    pass
+                self._lease = None
+                self.state = "stopped"
+            else:
+                self._kill()
@@ -1,41 +1,79 @@
 import PyInstaller.__main__
+import argparse
 import os
 import shutil
 
-def build():
+import adblock_bundle
+import netfilter
+from startup import GAME_EXECUTABLE
+
+# python build_exe.py            dist/Yblox.exe and the slim dist/YbloxGame.exe
+# python build_exe.py --onedir   dist/Yblox/ unpacked once: game windows start without extracting anything
+#
+# A onefile exe unpacks itself into a new temp folder on every start, and the
+# launcher starts one more process per game. In onefile mode game windows run
+# YbloxGame.exe, built from game.py without the launcher UI, so each of them
+# unpacks a fraction of it. In onedir mode they run Yblox.exe itself.
+
+# Modules only the launcher UI and the catalog use: never imported by a game window
+BROWSER_EXCLUDES = ["tkinter", "_tkinter", "customtkinter", "darkdetect", "PIL", "selectolax",
+                    "requests", "urllib3", "certifi", "charset_normalizer"]
+
+
+def pyinstaller_args(name, script, onedir, console, excludes=(), workpath="build", distpath="dist"):
+    args = [
+        script,
+        f"--name={name}",
+        "--onedir" if onedir else "--onefile",
+        "--console" if console else "--noconsole",
+        "--noconfirm",
+        f"--workpath={workpath}",
+        f"--distpath={distpath}",
+        f"--specpath={workpath}",
+        f"--icon={os.path.abspath('icon.ico')}",
+        f"--add-data={os.path.abspath('icon.ico')}{os.pathsep}.",
+        f"--add-data={os.path.abspath('adblock')}{os.pathsep}adblock",
+        # Hidden imports for pywebview (Edge WebView2)
+        "--hidden-import=webview.platforms.winforms",
+        "--hidden-import=clr",
+    ]
+    args += [f"--exclude-module={module}" for module in excludes]
+    return args
+
+
+def build(onedir=False, console=False, workpath="build", distpath="dist"):
     # Name of the output executable
     name = "Yblox"
-    
+
     # Path to the main script
     script = "main.py"
-    
+
     # Cleanup before build to avoid "EndUpdateResourceW" errors
     print("Cleaning up old build files...")
-    for folder in ["build", "dist"]:
+    for folder in [workpath, distpath]:
         if os.path.exists(folder):
             try:
                 shutil.rmtree(folder)
                 print(f"Deleted {folder}")
             except Exception as e:
                 print(f"Warning: Could not delete {folder}: {e}")
-    
-    # PyInstaller arguments
-    args = [
-        script,
-        f"--name={name}",
-        "--onefile",
-        "--noconsole",
-        f"--icon=icon.ico",
-        "--add-data=icon.ico;.",
-        "--add-data=adblock;adblock",
-        # Hidden imports for pywebview (Edge WebView2)
-        "--hidden-import=webview.platforms.winforms",
-        "--hidden-import=clr",
-    ]
-    
-    print(f"Building {name}.exe...")
-    PyInstaller.__main__.run(args)
-    print("Build complete! Check the 'dist' folder.")
+
+    # Prebuilt adblock bundle and network filters, shipped inside the adblock folder
+    print(f"Adblock bundle: {adblock_bundle.write_prebuilt('adblock')}")
+    print(f"Network filters: {netfilter.write_prebuilt('adblock')}")
+
+    print(f"Building {name} ({'onedir' if onedir else 'onefile'})...")
+    PyInstaller.__main__.run(pyinstaller_args(name, script, onedir, console, workpath=workpath, distpath=distpath))
+    if not onedir:
+        print(f"Building {GAME_EXECUTABLE} (game windows only)...")
+        PyInstaller.__main__.run(pyinstaller_args(GAME_EXECUTABLE, "game.py", onedir, console, BROWSER_EXCLUDES,
+                                                  workpath=workpath, distpath=distpath))
+    print(f"Build complete! Check the '{distpath}' folder.")
+
 
 if __name__ == "__main__":
-    build()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--onedir", action="store_true", help="one folder, unpacked once instead of on every start")
+    parser.add_argument("--console", action="store_true", help="keep the console (startup measurements)")
+    args = parser.parse_args()
+    build(onedir=args.onedir, console=args.console)
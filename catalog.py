@@ -0,0 +1,361 @@
+import html
+import json
+import re
+from html.parser import HTMLParser
+
+# Необязательный бэкенд на lexbor (pip install selectolax), только по запросу: см. parse_html_games
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# Маркеры блоков состояния. Поиск литералов через str.find работает на скорости memchr
+# и заметно быстрее любого regex с альтернативой по всей странице.
+STATE_MARKERS = ("initialState", "__INITIAL_STATE__", 'data-state="', '<script type="application/json" id="initial-state">')
+_ASSIGNMENT = re.compile(r'\s*=\s*')
+_decoder = json.JSONDecoder()
+
+STATE_BRANCHES = (("feed", "items"), ("catalog", "sections"), ("search", "items"), ("popular", "items"))
+
+
+def _find_markers(text):
+    found = []
+    for marker in STATE_MARKERS:
+        pos = text.find(marker)
+        while pos != -1:
+            found.append((pos, marker))
+            pos = text.find(marker, pos + len(marker))
+    found.sort()
+    return found
+
+
+def iter_state_blocks(text):
+    """ Yield every decodable state object embedded in the page """
+    resume = 0
+    for pos, marker in _find_markers(text):
+        start = pos + len(marker)
+        # Marker found inside a block that was already decoded
+        if start < resume:
+            continue
+        if marker in ("initialState", "__INITIAL_STATE__"):
+            # "if (window.initialState)", "var initialState;": not an assignment
+            assignment = _ASSIGNMENT.match(text, start)
+            if assignment is None:
+                continue
+            start = assignment.end()
+        if not text.startswith("{", start):
+            continue
+        try:
+            if marker == 'data-state="':
+                end = text.index('"', start)
+                data = json.loads(html.unescape(text[start:end]))
+            else:
+                data, end = _decoder.raw_decode(text, start)
+        except ValueError as e:
+            print(f"JSON block parse error: {e}")
+            continue
+        resume = end
+        if isinstance(data, dict):
+            yield data
+
+
+def _first(data, *keys):
+    for key in keys:
+        value = data.get(key)
+        if value not in (None, "", [], {}):
+            return value
+    return None
+
+
+def _text(value):
+    # Локализованные поля приходят как {"ru": "...", "en": "..."}
+    if isinstance(value, dict):
+        value = value.get("ru") or value.get("en") or next(iter(value.values()), None)
+    return str(value).strip() if value not in (None, "") else None
+
+
+def _image_url(value):
+    if isinstance(value, dict):
+        prefix = value.get("prefix-url") or value.get("prefixUrl")
+        if prefix:
+            return prefix + "pjpg256x256" if prefix.endswith("/") else prefix
+        value = _first(value, "url", "src", "cover", "icon")
+        return _image_url(value) if isinstance(value, dict) else value
+    if isinstance(value, list):
+        return _image_url(value[0]) if value else None
+    return value
+
+
+def _format_plays(value):
+    try:
+        count = int(value)
+    except (TypeError, ValueError):
+        return str(value) if value else "10K+"
+    for limit, suffix in ((1_000_000, "M"), (1_000, "K")):
+        if count >= limit:
+            return f"{count // limit}{suffix}+"
+    return str(count)
+
+
+def format_game_from_json(data):
+    """ Normalize one game object from the embedded state into a game record """
+    app_id = _first(data, "app_id", "appID", "appId", "id")
+    app_id = str(app_id) if app_id is not None else None
+
+    media = data.get("media") if isinstance(data.get("media"), dict) else {}
+    thumb = _image_url(_first(data, "cover", "icon", "image", "thumbnail", "thumb_url") or _first(media, "cover", "icon", "images"))
+    thumb = thumb if isinstance(thumb, str) else ""
+    if thumb.startswith("//"):
+        thumb = "https:" + thumb
+
+    rating = _first(data, "rating", "ratingValue")
+    if isinstance(rating, (int, float)):
+        rating = f"{rating:.1f}"
+
+    return {
+        "name": _text(_first(data, "title", "name")) or "Unknown Game",
+        "app_id": app_id,
+        "plays": _format_plays(_first(data, "playersCount", "players", "plays")),
+        "rating": str(rating) if rating else "4.8",
+        "thumb_url": thumb,
+        "app_url": f"https://yandex.ru/games/app/{app_id}" if app_id else None
+    }
+
+
+def games_from_state(data):
+    games = []
+    for branch, key in STATE_BRANCHES:
+        node = data.get(branch)
+        path = node.get(key) if isinstance(node, dict) else None
+        if not isinstance(path, list):
+            continue
+        for item in path:
+            if not isinstance(item, dict):
+                continue
+            # Обработка разных структур: игра, обертка {"game": ...} или секция с вложенными играми
+            if isinstance(item.get("game"), dict):
+                games.append(format_game_from_json(item["game"]))
+            elif isinstance(item.get("items"), list):
+                for sub_item in item["items"]:
+                    if not isinstance(sub_item, dict):
+                        continue
+                    sg_data = sub_item.get("game") or sub_item
+                    if isinstance(sg_data, dict):
+                        games.append(format_game_from_json(sg_data))
+            elif "app_id" in item or "id" in item:
+                games.append(format_game_from_json(item))
+    return games
+
+
+def extract_state_games(text):
+    games = []
+    for data in iter_state_blocks(text):
+        games.extend(games_from_state(data))
+    return games
+
+
+_CATEGORY_LINK = re.compile(r'/games/category/([\w-]+)')
+
+
+def category_slugs(text):
+    """ Slugs of the categories a catalog page links to, in page order """
+    return list(dict.fromkeys(_CATEGORY_LINK.findall(text)))
+
+
+def dedupe_games(games):
+    # Удаляем дубликаты по App ID
+    seen_ids = set()
+    unique_games = []
+    for g in games:
+        app_id = g.get("app_id") or g.get("app_url")
+        if app_id and app_id not in seen_ids and g.get("name") != "Unknown Game":
+            seen_ids.add(app_id)
+            unique_games.append(g)
+    return unique_games
+
+
+# --- HTML fallback ---
+# Для каждой ссылки /games/app/<id> название и картинка берутся из ближайшего
+# из пяти уровней (сама ссылка и четыре предка), в котором они нашлись:
+# первый заголовок h\d, иначе первый элемент с "title" в классе, и первая <img>.
+
+_APP_LINK = re.compile(r'/games/app/(\d+)')
+_APP_ID = re.compile(r'/app/(\d+)')
+_HEADING = re.compile(r'h\d')
+_VOID_TAGS = frozenset(("area", "base", "br", "col", "embed", "hr", "img", "input", "keygen",
+                        "link", "meta", "param", "source", "track", "wbr"))
+HTML_SEARCH_DEPTH = 5
+
+
+def _img_value(get):
+    return get("src") or get("data-src") or (get("srcset") or "").split(" ")[0]
+
+
+def _html_game(app_id, name, img):
+    if img.startswith("//"): img = "https:" + img
+    return {
+        "name": name,
+        "app_id": app_id,
+        "plays": "10K+",
+        "rating": "4.8",
+        "thumb_url": img,
+        "app_url": f"https://yandex.ru/games/app/{app_id}"
+    }
+
+
+class _Frame:
+    """ An open element and what its descendants have shown so far """
+    __slots__ = ("tag", "parent", "heading", "title", "img", "owned")
+
+    def __init__(self, tag, parent):
+        self.tag = tag
+        self.parent = parent
+        self.heading = None  # text parts of the first h\d descendant
+        self.title = None  # text parts of the first [class*="title"] descendant
+        self.img = None  # value of the first <img> descendant
+        self.owned = None  # text collectors that end with this element
+
+
+class _GameLinkParser(HTMLParser):
+    """ Single pass over the html.parser event stream, no tree is built """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = _Frame(None, None)
+        self.stack = [self.root]
+        self.links = []
+        self.collectors = []
+
+    def _assign(self, slot, value):
+        # Frames still missing the value are always the innermost ones
+        for frame in reversed(self.stack):
+            if getattr(frame, slot) is not None:
+                break
+            setattr(frame, slot, value)
+
+    def _collector(self, slot):
+        if getattr(self.stack[-1], slot) is not None:
+            return None
+        parts = []
+        self._assign(slot, parts)
+        return parts
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {name: value or "" for name, value in attrs}
+        if tag == "img":
+            self._assign("img", _img_value(attrs.get))
+        if tag in _VOID_TAGS:
+            return
+
+        owned = []
+        if _HEADING.search(tag):
+            parts = self._collector("heading")
+            if parts is not None: owned.append(parts)
+        if "title" in attrs.get("class", ""):
+            parts = self._collector("title")
+            if parts is not None: owned.append(parts)
+
+        frame = _Frame(tag, self.stack[-1])
+        if owned:
+            frame.owned = owned
+            self.collectors.extend(owned)
+        self.stack.append(frame)
+
+        if tag == "a":
+            href = attrs.get("href", "")
+            if _APP_LINK.search(href):
+                app_id = _APP_ID.search(href)
+                if app_id:
+                    self.links.append((app_id.group(1), frame))
+
+    def handle_endtag(self, tag):
+        if tag in _VOID_TAGS:
+            return
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i].tag == tag:
+                closed = [id(parts) for frame in self.stack[i:] if frame.owned for parts in frame.owned]
+                if closed:
+                    # Collectors are compared by identity: two empty lists are equal
+                    self.collectors = [parts for parts in self.collectors if id(parts) not in closed]
+                del self.stack[i:]
+                return
+
+    def handle_data(self, data):
+        for parts in self.collectors:
+            parts.append(data)
+
+    def games(self):
+        parsed = []
+        for app_id, frame in self.links:
+            name = "Game"
+            img = ""
+            curr = frame
+            for _ in range(HTML_SEARCH_DEPTH):
+                if curr is None: break
+                if name == "Game":
+                    parts = curr.heading if curr.heading is not None else curr.title
+                    if parts is not None:
+                        name = "".join(parts).strip()
+                if not img and curr.img is not None:
+                    img = curr.img
+                if name != "Game" and img: break
+                curr = curr.parent
+            parsed.append(_html_game(app_id, name, img))
+        return parsed
+
+
+def _parse_html_games_stdlib(html_content):
+    parser = _GameLinkParser()
+    parser.feed(html_content)
+    parser.close()
+    return parser.games()
+
+
+def _lexbor_find(node, selector):
+    # css_first() also matches the node itself, BeautifulSoup's find() only looks at descendants
+    for child in node.iter():
+        found = child.css_first(selector)
+        if found is not None:
+            return found
+    return None
+
+
+def _parse_html_games_lexbor(html_content):
+    tree = LexborHTMLParser(html_content)
+    parsed = []
+    for link in tree.css("a[href]"):
+        href = link.attributes.get("href") or ""
+        if not _APP_LINK.search(href):
+            continue
+        app_id = _APP_ID.search(href)
+        if not app_id:
+            continue
+        name = "Game"
+        img = ""
+        curr = link
+        for _ in range(HTML_SEARCH_DEPTH):
+            if curr is None: break
+            if name == "Game":
+                title_el = _lexbor_find(curr, "h1, h2, h3, h4, h5, h6") or _lexbor_find(curr, '[class*="title"]')
+                if title_el is not None:
+                    name = title_el.text(deep=True).strip()
+            if not img:
+                img_el = _lexbor_find(curr, "img")
+                if img_el is not None:
+                    img = _img_value(lambda key: img_el.attributes.get(key) or "")
+            if name != "Game" and img: break
+            curr = curr.parent
+        parsed.append(_html_game(app_id.group(1), name, img))
+    return parsed
+
+
+def parse_html_games(html_content, backend="stdlib"):
+    """
+    backend: "stdlib" gives the records the BeautifulSoup code gave, malformed
+    markup included (benchmarks/bench_html_parse.py checks it). "lexbor" is
+    faster but builds the HTML5 tree where nesting is invalid (nested <a>,
+    stray closers), so its records can differ there.
+    """
+    if backend == "lexbor":
+        return _parse_html_games_lexbor(html_content)
+    return _parse_html_games_stdlib(html_content)
@@ -0,0 +1,74 @@
+import threading
+import time
+
+
+class CatalogCache:
+    """ Cache of parsed catalog pages keyed by the full request URL, persisted in the LocalStore """
+
+    def __init__(self, store, ttl=600, max_stale=86400):
+        self.store = store
+        # Entries younger than ttl are served without touching the network,
+        # older ones are served while a background revalidation runs.
+        # Past max_stale the caller should fetch synchronously.
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        with self._lock:
+            entry = self._entries.get(url)
+        if entry is not None:
+            return entry
+        entry = self.store.get_catalog(url)
+        if entry is None:
+            return None
+        with self._lock:
+            self._entries[url] = entry
+        return entry
+
+    def age(self, entry):
+        return time.time() - entry.get("fetched_at", 0)
+
+    def is_fresh(self, entry):
+        return self.age(entry) < self.ttl
+
+    def is_usable(self, entry):
+        return self.age(entry) < self.max_stale
+
+    def put(self, url, games, etag=None, last_modified=None):
+        entry = {
+            "url": url,
+            "fetched_at": time.time(),
+            "etag": etag,
+            "last_modified": last_modified,
+            "games": games
+        }
+        self._store(entry)
+        return entry
+
+    def touch(self, url):
+        """ Mark an entry as fresh again after a 304 Not Modified """
+        entry = self.get(url)
+        if entry is None:
+            return None
+        entry = dict(entry, fetched_at=time.time())
+        with self._lock:
+            self._entries[url] = entry
+        # Only the timestamp changes, the games stay as stored
+        self.store.touch_catalog(url, entry["fetched_at"])
+        return entry
+
+    def _store(self, entry):
+        with self._lock:
+            self._entries[entry["url"]] = entry
+        self.store.put_catalog(entry)
+
+    @staticmethod
+    def conditional_headers(entry):
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
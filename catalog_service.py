@@ -0,0 +1,150 @@
+import asyncio
+from urllib.parse import quote
+
+import perf
+from catalog_cache import CatalogCache
+
+# Fetch -> parse -> dedupe of the catalog, shared by the launcher and the
+# headless cli.py: no UI imports here
+
+CATALOG_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
+    "Accept-Language": "ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7",
+    "Accept-Encoding": "gzip, deflate",
+    "Referer": "https://yandex.ru/games/",
+    "Connection": "keep-alive",
+    "Upgrade-Insecure-Requests": "1"
+}
+
+
+def parse_catalog(page_text):
+    """ Catalog or search page -> unique games """
+    import catalog
+
+    # МЕТОД 1: Извлечение из встроенных JSON блоков (initialState, __INITIAL_STATE__, etc.)
+    with perf.span("parse.state", bytes=len(page_text)) as span:
+        games = catalog.extract_state_games(page_text)
+        span.set(games=len(games))
+
+    # МЕТОД 2 (РЕЗЕРВНЫЙ): Глубокий парсинг HTML
+    if len(games) < 3:
+        perf.event("parse.html_fallback", "Using deep HTML scraping fallback...")
+        with perf.span("parse.html", bytes=len(page_text)) as span:
+            games.extend(catalog.parse_html_games(page_text))
+            span.set(games=len(games))
+
+    with perf.span("parse.dedupe", games=len(games)):
+        unique_games = catalog.dedupe_games(games)
+    perf.event("parse.final_count", f"Final count: {len(unique_games)} unique games", games=len(unique_games))
+    return unique_games
+
+
+def thumb_url(game):
+    """ Absolute thumbnail URL of a game, or None """
+    url = game.get("thumb_url")
+    if url and url.startswith("//"):
+        url = "https:" + url
+    return url if url and url.startswith("http") else None
+
+
+class CatalogService:
+    """
+    Catalog pages through the CatalogCache: fresh entries are served as is,
+    stale but usable ones are served while a revalidation runs in the
+    background, everything else is fetched (conditionally when an old entry
+    exists). Coroutines run on the AsyncLoader's loop; on_games sees the
+    games of every page that came from the network.
+    """
+
+    def __init__(self, store, settings, loader, on_games=None):
+        self.store = store
+        self.settings = settings
+        self.loader = loader
+        self.on_games = on_games
+        self.cache = CatalogCache(store,
+                                  ttl=settings.get("catalog_cache_ttl", 600),
+                                  max_stale=settings.get("catalog_cache_max_stale", 86400))
+
+    @property
+    def base_url(self):
+        return self.settings.get("catalog_base_url", "https://yandex.ru/games").rstrip("/")
+
+    def url(self, query=None, page=0):
+        # Если есть запрос — идем на страницу поиска, если нет — на главную
+        url = f"{self.base_url}/search?query={quote(query)}" if query else f"{self.base_url}/"
+        if page:
+            url += ("&" if "?" in url else "?") + f"page={page}"
+        return url
+
+    async def fetch(self, url, background_revalidate=True):
+        """
+        Identical URLs requested together through the loader share one call.
+        Without background_revalidate a stale entry is revalidated before
+        returning (a short-lived process would not see it finish). None when
+        the page could not be fetched and nothing is cached for it, so a
+        failed request is not taken for an empty page.
+        """
+        try:
+            entry = self.cache.get(url)
+            if entry is not None and self.cache.is_usable(entry):
+                fresh = self.cache.is_fresh(entry)
+                if not fresh and background_revalidate:
+                    # In the background: no view waits for it and no newer request cancels it
+                    self.loader.submit(None, ("revalidate", url), lambda: self.revalidate(url))
+                if fresh or background_revalidate:
+                    print(f"Serving {len(entry['games'])} cached games for: {url}")
+                    return entry["games"]
+
+            games = await self._fetch(url, entry)
+            if games is None and entry is not None:
+                # Сеть недоступна — лучше показать старые данные, чем ничего
+                return entry["games"]
+            return games
+        except Exception as e:
+            print(f"Global fetch error: {e}")
+        return None
+
+    async def revalidate(self, url):
+        """ Fetch url whatever the cache holds (conditionally); None on error """
+        try:
+            return await self._fetch(url, self.cache.get(url))
+        except Exception as e:
+            print(f"Catalog revalidation error: {e}")
+        return None
+
+    async def _fetch(self, url, entry=None):
+        headers = dict(CATALOG_HEADERS)
+        if entry is not None:
+            headers.update(self.cache.conditional_headers(entry))
+
+        perf.event("catalog.fetch", f"Fetching games from: {url}", url=url)
+        with perf.span("catalog.fetch", url=url) as span:
+            r = await self.loader.http.get(url, headers=headers, timeout=15)
+            span.set(status=r.status_code, bytes=len(r.content))
+        if r.status_code == 304 and entry is not None:
+            print(f"Catalog not modified: {url}")
+            self.cache.touch(url)
+            return entry["games"]
+        if r.status_code != 200:
+            print(f"HTTP Error: {r.status_code}")
+            return None
+
+        # Parsing is CPU work: off the loop, so other requests keep flowing
+        games = await asyncio.get_running_loop().run_in_executor(None, parse_catalog, r.text)
+        if self.on_games is not None:
+            self.on_games(games)
+        # Пустой результат (капча, заглушка) не кэшируем
+        if games:
+            self.cache.put(url, games, etag=r.headers.get("ETag"), last_modified=r.headers.get("Last-Modified"))
+        return games
+
+    def crawler(self, **kwargs):
+        """ CatalogCrawler over every section of the catalog, configured from the settings """
+        from crawler import CatalogCrawler
+
+        kwargs.setdefault("delay", self.settings.get("catalog_crawl_delay", 1.0))
+        kwargs.setdefault("ttl", self.settings.get("catalog_crawl_ttl", 43200))
+        kwargs.setdefault("on_games", self.on_games)
+        return CatalogCrawler(self.store, self.loader.http, self.base_url, parse_catalog,
+                              headers=CATALOG_HEADERS, **kwargs)
@@ -0,0 +1,183 @@
+"""
+Headless catalog modes of Yblox: the fetch/parse/dedupe pipeline without
+Tk, one JSON object per line on stdout (diagnostics go to stderr).
+
+    Yblox --catalog [--pages N] [--offline] [--limit N]
+    Yblox --search QUERY [--pages N] [--offline] [--limit N]
+    Yblox --prewarm [--thumbnails N] [--no-crawl]
+
+--offline only reads what is stored locally: cached catalog pages and the
+crawled catalog. --prewarm refreshes the home page in the catalog cache,
+runs a crawl pass over stale sections and downloads the thumbnails of the
+first screen, so a launch after it (e.g. from a scheduled task at logon)
+shows the catalog from disk. Exit code 1 when nothing was found or fetched.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+
+import app_settings
+import perf
+from async_loader import AsyncLoader
+from catalog_service import CatalogService, thumb_url
+from search_index import SearchIndex
+
+# Games on the first screen of the launcher: the recent strip and the home page
+RECENT_GAMES = 8
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="Yblox", description="Yandex Games catalog without the window")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--catalog", action="store_true", help="games of the catalog home page")
+    mode.add_argument("--search", metavar="QUERY", help="games matching QUERY")
+    mode.add_argument("--prewarm", action="store_true", help="fill the catalog and thumbnail caches")
+    parser.add_argument("--pages", type=int, default=1, help="catalog or search pages to fetch")
+    parser.add_argument("--offline", action="store_true", help="no network: cached pages and the crawled catalog")
+    parser.add_argument("--limit", type=int, default=0, help="print at most this many games")
+    parser.add_argument("--thumbnails", type=int, default=120, help="--prewarm: thumbnails of the first games")
+    parser.add_argument("--no-crawl", action="store_true", help="--prewarm: skip the crawl of catalog sections")
+    return parser.parse_args(argv)
+
+
+class JsonLines:
+    def __init__(self, stream, limit=0):
+        self.stream = stream
+        self.limit = limit
+        self.keys = set()
+
+    @property
+    def full(self):
+        return bool(self.limit) and len(self.keys) >= self.limit
+
+    def write(self, record):
+        self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+    def games(self, games):
+        """ Print the games not printed yet; returns how many """
+        printed = 0
+        for game in games:
+            key = SearchIndex.key(game)
+            if self.full or not key or key in self.keys:
+                continue
+            self.keys.add(key)
+            self.write(game)
+            printed += 1
+        return printed
+
+
+def list_games(service, args, out):
+    query = args.search
+    for page in range(max(1, args.pages)):
+        url = service.url(query, page)
+        if args.offline:
+            entry = service.cache.get(url)
+            games = entry["games"] if entry is not None else []
+        else:
+            # A stale cached page is revalidated before it is printed
+            games = service.loader.run(service.fetch(url, background_revalidate=False)) or []
+        # Страница без новых игр — каталог закончился
+        if not out.games(games) or out.full:
+            break
+
+    if args.offline and not out.full:
+        # The crawled catalog goes well past the cached pages
+        if query:
+            index = SearchIndex()
+            for games in service.store.iter_catalog_games():
+                index.add(games)
+            index.add(service.store.catalog_games(limit=None))
+            index.add(service.store.recent_games(limit=None))
+            out.games(index.search(query))
+        else:
+            out.games(service.store.catalog_games(limit=None))
+    return 0 if out.keys else 1
+
+
+def prewarm(service, args, out):
+    start = time.perf_counter()
+    home = service.url()
+    games = service.loader.run(service.fetch(home, background_revalidate=False)) or []
+    out.write({"type": "catalog", "url": home, "games": len(games)})
+
+    if service.settings.get("catalog_crawl_enabled", True) and not args.no_crawl:
+        stats = service.loader.run(service.crawler().run())
+        out.write(dict(stats, type="crawl", catalog_games=service.store.catalog_game_count()))
+
+    thumbs = prewarm_thumbnails(service, service.store.recent_games(RECENT_GAMES) + games, args.thumbnails)
+    out.write(dict(thumbs, type="thumbnails"))
+    out.write({"type": "done", "seconds": round(time.perf_counter() - start, 2)})
+    return 0 if games else 1
+
+
+def prewarm_thumbnails(service, games, count):
+    """ Download what the disk cache does not have yet for the first count games """
+    from thumb_cache import ThumbnailDiskCache
+    from thumbnails import ThumbnailLoader, ThumbnailScheduler, display_size
+
+    settings = service.settings
+    disk_cache = ThumbnailDiskCache(os.path.join(app_settings.data_dir(), "thumbs"), service.store,
+                                    max_bytes=settings.get("thumbnail_cache_mb", 64) * 1024 * 1024)
+    urls = []
+    for game in games:
+        url = thumb_url(game)
+        if url and url not in urls:
+            urls.append(url)
+    urls = urls[:count]
+    # The launcher's size on this display
+    size = display_size(service.store)
+    missing = [url for url in urls if not disk_cache.has(url, size)]
+    stats = {"wanted": len(urls), "cached": len(urls) - len(missing), "fetched": 0, "failed": 0, "size": list(size)}
+    if not missing:
+        return stats
+
+    workers = settings.get("thumbnail_workers", 6)
+    loader = ThumbnailLoader(size=size, pool_size=workers, disk_cache=disk_cache,
+                             processes=settings.get("thumbnail_decode_processes"))
+    scheduler = ThumbnailScheduler(loader, workers=workers)
+    remaining = [len(missing)]
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def delivered(thumb):
+        with lock:
+            stats["fetched" if thumb is not None else "failed"] += 1
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                done.set()
+
+    for index, url in enumerate(missing):
+        # Same priority shape as the launcher: (-generation, index)
+        scheduler.submit(url, delivered, (0, index))
+    done.wait(timeout=600)
+    scheduler.close()
+    loader.close()
+    disk_cache.flush()
+    return stats
+
+
+def main(argv):
+    args = parse_args(argv)
+    # A --noconsole build has neither stream
+    devnull = open(os.devnull, "w")
+    out = JsonLines(sys.stdout or devnull, args.limit)
+    # The pipeline reports progress with print(): keep stdout for JSON lines
+    with devnull, contextlib.redirect_stdout(sys.stderr or devnull):
+        store = app_settings.open_store()
+        settings = app_settings.load_settings(store)
+        if settings.get("diagnostics_enabled", False) or os.environ.get("YBLOX_TRACE"):
+            perf.tracer.configure(perf.trace_path("cli"), process="cli")
+        # No UI thread: results are only ever awaited through loader.run()
+        loader = AsyncLoader(deliver=lambda fn: fn())
+        service = CatalogService(store, settings, loader)
+        try:
+            return prewarm(service, args, out) if args.prewarm else list_games(service, args, out)
+        finally:
+            loader.stop()
+            store.close()
+            perf.tracer.disable()
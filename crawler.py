@@ -0,0 +1,200 @@
+import asyncio
+import random
+import time
+from urllib.parse import urlsplit
+
+import catalog
+
+# Ответы, после которых имеет смысл повторить запрос позже
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+NETWORK_ERRORS = (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError)
+
+# Catalog order: home page first, then sections as discovered, then page and position
+RANK_SECTION = 1_000_000
+RANK_PAGE = 1_000
+
+
+class _Host:
+    """ Concurrency limit and spacing of request starts for one host """
+
+    def __init__(self, limit, delay):
+        self.slots = asyncio.Semaphore(limit)
+        self.delay = delay
+        self.next_start = 0.0
+
+    def hold_off(self, seconds):
+        """ Nothing starts on this host for the next seconds (Retry-After, 429) """
+        loop = asyncio.get_running_loop()
+        self.next_start = max(self.next_start, loop.time() + seconds)
+
+    async def wait_turn(self):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        start = max(now, self.next_start)
+        self.next_start = start + self.delay
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+class CatalogCrawler:
+    """
+    Builds the full local catalog in the background: the home page, every
+    category it links to, and each listing page by page until a page brings
+    no new games. Sections are crawled concurrently, at most max_per_host
+    requests at a time per host and delay seconds between request starts.
+
+    Progress is checkpointed in the LocalStore after every page, so an
+    interrupted crawl resumes where it stopped. A completed section is only
+    crawled again once it is older than ttl.
+    """
+
+    def __init__(self, store, http, base_url, parse, headers=None, concurrency=4, max_per_host=2, delay=1.0,
+                 retries=3, backoff=1.0, ttl=43200, max_pages=30, on_games=None):
+        self.store = store
+        self.http = http
+        self.base_url = base_url.rstrip("/")
+        # text -> list of games, CPU work that runs in the loop's executor
+        self.parse = parse
+        self.headers = headers or {}
+        self.concurrency = concurrency
+        self.max_per_host = max_per_host
+        self.delay = delay
+        self.retries = retries
+        self.backoff = backoff
+        self.ttl = ttl
+        self.max_pages = max_pages
+        # Called on the loop thread with the games of every fetched page
+        self.on_games = on_games
+        self._hosts = {}
+        self._sections = {}
+        self._queue = None
+        self.stats = {"sections": 0, "skipped": 0, "pages": 0, "games": 0, "retries": 0, "failed": 0}
+
+    def section_url(self, slug=None):
+        return f"{self.base_url}/category/{slug}" if slug else f"{self.base_url}/"
+
+    @staticmethod
+    def page_url(url, page):
+        return url if not page else url + ("&" if "?" in url else "?") + f"page={page}"
+
+    def is_fresh(self, section):
+        return section["complete"] and time.time() - section["fetched_at"] < self.ttl
+
+    async def run(self):
+        """ One crawl pass over every stale section; returns stats """
+        self._queue = asyncio.Queue()
+        self._sections = self.store.crawl_sections()
+        self._add_section(self.section_url(), "home")
+        for section in list(self._sections.values()):
+            self._schedule(section)
+
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        try:
+            await self._queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        print(f"Catalog crawl: {self.stats}")
+        return self.stats
+
+    def _add_section(self, url, kind):
+        if url in self._sections:
+            return None
+        section = {"url": url, "kind": kind, "position": len(self._sections), "next_page": 0,
+                   "complete": False, "fetched_at": 0, "error": None}
+        self._sections[url] = section
+        self.store.put_crawl_section(section)
+        return section
+
+    def _schedule(self, section):
+        if self.is_fresh(section):
+            self.stats["skipped"] += 1
+            return
+        if section["complete"]:
+            # Stale: a fresh pass from the first page
+            section.update(next_page=0, complete=False)
+        self._queue.put_nowait(section)
+
+    async def _worker(self):
+        while True:
+            section = await self._queue.get()
+            try:
+                await self._crawl_section(section)
+            except Exception as e:
+                print(f"Crawl error in {section['url']}: {e!r}")
+            finally:
+                self._queue.task_done()
+
+    async def _crawl_section(self, section):
+        self.stats["sections"] += 1
+        seen = set()
+        page = section["next_page"]
+        while page < self.max_pages:
+            text = await self._fetch(self.page_url(section["url"], page))
+            if text is None:
+                # Retries exhausted: the checkpoint stays, the next pass resumes here
+                section["error"] = "fetch failed"
+                self.store.put_crawl_section(section)
+                self.stats["failed"] += 1
+                return
+            if section["kind"] == "home" and page == 0:
+                for slug in catalog.category_slugs(text):
+                    new = self._add_section(self.section_url(slug), "category")
+                    if new is not None:
+                        self._schedule(new)
+
+            games = await asyncio.get_running_loop().run_in_executor(None, self.parse, text)
+            new_games = [g for g in games if g.get("app_id") and g["app_id"] not in seen]
+            seen.update(g["app_id"] for g in new_games)
+            self.stats["pages"] += 1
+            if new_games:
+                self.store.put_catalog_games(new_games, section["position"] * RANK_SECTION + page * RANK_PAGE)
+                self.stats["games"] += len(new_games)
+                if self.on_games is not None:
+                    self.on_games(new_games)
+            else:
+                # Пустая страница или повтор предыдущей — раздел закончился
+                break
+            page += 1
+            # Written after the games, in the same queue: a resumed crawl never skips a page
+            section.update(next_page=page, error=None)
+            self.store.put_crawl_section(section)
+
+        section.update(next_page=0, complete=True, fetched_at=time.time(), error=None)
+        self.store.put_crawl_section(section)
+
+    def _host(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = _Host(self.max_per_host, self.delay)
+        return self._hosts[host]
+
+    async def _fetch(self, url):
+        """ Page text, None once retries are exhausted; a missing page reads as empty """
+        host = self._host(url)
+        for attempt in range(self.retries + 1):
+            wait = self.backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+            async with host.slots:
+                await host.wait_turn()
+                try:
+                    r = await self.http.get(url, headers=self.headers, timeout=15)
+                except NETWORK_ERRORS as e:
+                    print(f"Crawl request failed ({attempt + 1}/{self.retries + 1}): {url}: {e!r}")
+                else:
+                    if r.status_code == 200:
+                        return r.text
+                    if r.status_code == 404:
+                        return ""
+                    if r.status_code not in RETRY_STATUSES:
+                        print(f"Crawl HTTP error {r.status_code}: {url}")
+                        return None
+                    retry_after = r.headers.get("Retry-After", "")
+                    if retry_after.isdigit():
+                        wait = max(wait, int(retry_after))
+                    if r.status_code == 429:
+                        host.hold_off(wait)
+            if attempt < self.retries:
+                self.stats["retries"] += 1
+                await asyncio.sleep(wait)
+        return None
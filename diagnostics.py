@@ -0,0 +1,84 @@
+import customtkinter as ctk
+
+import perf
+
+# Measured in the browser process and read back from its trace file
+BROWSER_SPANS = ("browser.spawn_to_shown", "browser.spawn_to_loaded")
+
+
+class DiagnosticsPanel(ctk.CTkToplevel):
+    """
+    Hidden window (Ctrl+Shift+D) with p50/p95 of every span the launcher has
+    measured since tracing was switched on, its counters, and the game window
+    start-up times reported by browser processes.
+    """
+
+    refresh_ms = 1000
+
+    def __init__(self, master, on_toggle):
+        super().__init__(master)
+        self.title("Yblox diagnostics")
+        self.geometry("640x480")
+        self.on_toggle = on_toggle
+
+        top = ctk.CTkFrame(self, fg_color="transparent")
+        top.pack(fill="x", padx=10, pady=(10, 0))
+        self.switch = ctk.CTkSwitch(top, text="Tracing", command=lambda: self.on_toggle(bool(self.switch.get())),
+                                    progress_color="#00A2FF")
+        self.switch.pack(side="left")
+        self.path_label = ctk.CTkLabel(top, text="", font=ctk.CTkFont(size=11), text_color="gray")
+        self.path_label.pack(side="right")
+
+        self.text = ctk.CTkTextbox(self, font=ctk.CTkFont(family="Consolas", size=12), wrap="none")
+        self.text.pack(fill="both", expand=True, padx=10, pady=10)
+        self._after = None
+        # Game windows keep appending to their trace: only the new lines are parsed on each refresh
+        self._browser_spans = perf.SpanReader(perf.trace_path("browser"), BROWSER_SPANS)
+        self.protocol("WM_DELETE_WINDOW", self.withdraw)
+        self.refresh()
+
+    def show(self):
+        self.deiconify()
+        self.lift()
+        self.refresh()
+
+    def refresh(self):
+        if self._after is not None:
+            self.after_cancel(self._after)
+            self._after = None
+        tracer = perf.tracer
+        if tracer.enabled:
+            self.switch.select()
+        else:
+            self.switch.deselect()
+        self.path_label.configure(text=tracer.path or "")
+
+        lines = [f"{'span':<28}{'count':>8}{'p50 ms':>11}{'p95 ms':>11}{'max ms':>11}"]
+        rows = tracer.summary()
+        for name, values in self._browser_spans.read().items():
+            values = sorted(values)
+            if values:
+                rows[name] = {"count": len(values), "p50": perf.percentile(values, 0.5),
+                              "p95": perf.percentile(values, 0.95), "max": values[-1]}
+        for name in sorted(rows):
+            row = rows[name]
+            lines.append(f"{name:<28}{row['count']:>8}{row['p50']:>11.1f}{row['p95']:>11.1f}{row['max']:>11.1f}")
+        if tracer.counters:
+            lines += ["", f"{'counter':<28}{'value':>8}"]
+            lines += [f"{name:<28}{value:>8}" for name, value in sorted(tracer.counters.items())]
+        if not tracer.enabled:
+            lines += ["", "Tracing is off: switch it on and use the launcher to collect figures."]
+
+        self.text.configure(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.insert("1.0", "\n".join(lines))
+        self.text.configure(state="disabled")
+        # Right after it is built the panel is not viewable yet: keep polling while it exists
+        if self.winfo_exists():
+            self._after = self.after(self.refresh_ms, self.refresh)
+
+    def destroy(self):
+        if self._after is not None:
+            self.after_cancel(self._after)
+            self._after = None
+        super().destroy()
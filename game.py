@@ -0,0 +1,13 @@
+import sys
+
+# Entry point of YbloxGame.exe (build_exe.py): the game window processes only,
+# so the executable unpacked for every game carries none of the launcher UI.
+
+if __name__ == "__main__":
+    if "--browser-host" in sys.argv:
+        import browser_host
+        browser_host.main(sys.argv)
+    else:
+        import browser
+        browser.main(sys.argv)
+    sys.exit(0)
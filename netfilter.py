@@ -0,0 +1,382 @@
+import functools
+import hashlib
+import ipaddress
+import json
+import os
+import re
+import sys
+import threading
+from encodings import idna
+from urllib.parse import unquote_to_bytes
+
+import adblock_rules
+
+# Python twin of the request check in adblock/background.js (onBeforeRequest):
+#
+#   essentials (url.includes)              -> allowed
+#   new URL(u) throws                      -> any filter in the lowercased string, or the short ad-word regex
+#   any filter in the hostname             -> blocked
+#   the ad-word regex on the whole URL     -> blocked
+#
+# The filters are compiled into a token-hash index: every filter is filed
+# under its first GRAM characters, a hostname is scanned once and only the
+# filters filed under its own GRAM-grams are compared. A filter with a "/"
+# can never be part of a hostname, so those path rules only matter when the
+# URL does not parse, like in background.js.
+
+# Bump when the compiled layout changes: it is part of the cache key
+NETFILTER_FORMAT = 1
+NETFILTER_NAME = "netfilter.json"
+_KEY_FIELD = "key"
+GRAM = 4
+
+# Never blocked, whatever the filters say
+ESSENTIALS = ("mozilla.net", "firefox.com", "google.com/recaptcha")
+
+# JavaScript regexes without the u flag: \b and /i are ASCII-only, $ is the end of the input
+AD_PATTERN = re.compile(r"(?:^|[./])(?:ads?|banners?|adrec|promo|sponsor|tracking|analytics|pixel|telemetry"
+                        r"|doubleclick|adservice|adsystem)(?:[./?]|\Z)", re.I | re.A)
+FALLBACK_PATTERN = re.compile(r"(?:^|\b)(?:ad|ads|banner|promo|sponsor)(?:\b|\Z)", re.A)
+
+
+# --- Hostnames the way new URL() sees them (WHATWG URL Standard) ---
+
+SPECIAL_SCHEMES = frozenset(("http", "https", "ws", "wss", "ftp", "file"))
+_SCHEME = re.compile(r"[A-Za-z][A-Za-z0-9+.\-]*:")
+_C0_OR_SPACE = "".join(map(chr, range(0x21)))
+_SPECIAL_AUTHORITY_END = re.compile(r"[/\\?#]")
+_AUTHORITY_END = re.compile(r"[/?#]")
+_DOTS = re.compile("[.。．｡]")
+_FORBIDDEN_HOST = frozenset("\x00\t\n\r #/:<>?@[\\]^|")
+_FORBIDDEN_DOMAIN = _FORBIDDEN_HOST | frozenset(map(chr, range(0x20))) | {"%", "\x7f"}
+_WINDOWS_DRIVE = re.compile(r"[A-Za-z][:|]\Z")
+_DEVIATIONS = frozenset("ßς")
+_DEVIATION_SPLIT = re.compile("([ßς])")
+
+
+# Almost every request: scheme://ascii.host[:port] and the path, nothing to decode or validate
+_PLAIN = re.compile(r"(?:https?|wss?|ftp)://([A-Za-z0-9\-._~]+)(?::(\d{1,5}))?(?:[/?#]|\Z)", re.I)
+
+
+def url_hostname(url):
+    """ new URL(url).hostname, ValueError where the constructor throws """
+    match = _PLAIN.match(url)
+    if match is not None:
+        host, port = match.groups()
+        last = host.rstrip(".").rpartition(".")[2]
+        if "xn--" not in host.lower() and not last[-1:].isdigit() and last[:2].lower() != "0x" \
+                and (port is None or int(port) <= 65535):
+            return host.lower()
+
+    url = url.strip(_C0_OR_SPACE).replace("\t", "").replace("\n", "").replace("\r", "")
+    match = _SCHEME.match(url)
+    if match is None:
+        # Relative: there is no base URL to resolve it against
+        raise ValueError("no scheme")
+    scheme = match.group()[:-1].lower()
+    rest = url[match.end():]
+
+    if scheme == "file":
+        if rest[:2] not in ("//", "\\\\", "/\\", "\\/"):
+            return ""
+        host = _SPECIAL_AUTHORITY_END.split(rest[2:], 1)[0]
+        if not host or _WINDOWS_DRIVE.match(host):
+            return ""
+        host = _host(host)
+        return "" if host == "localhost" else host
+    if scheme in SPECIAL_SCHEMES:
+        authority = _SPECIAL_AUTHORITY_END.split(rest.lstrip("/\\"), 1)[0]
+        host = _authority_host(authority)
+        if not host:
+            raise ValueError("empty host")
+        return _host(host)
+    if not rest.startswith("//"):
+        # data:, blob:, javascript:, about: ...
+        return ""
+    return _opaque_host(_authority_host(_AUTHORITY_END.split(rest[2:], 1)[0]))
+
+
+def _authority_host(authority):
+    """ The host of user:pass@host:port, port validated """
+    if "@" in authority:
+        authority = authority.rpartition("@")[2]
+        if not authority:
+            raise ValueError("credentials without a host")
+    # A port colon comes after the brackets of an IPv6 address
+    end = authority.rfind("]") + 1
+    host, colon, port = authority[end:].partition(":")
+    host = authority[:end] + host
+    if colon:
+        if not host:
+            raise ValueError("port without a host")
+        if port and (not port.isascii() or not port.isdigit() or int(port) > 65535):
+            raise ValueError("invalid port")
+    return host
+
+
+def _host(host):
+    if host.startswith("["):
+        if not host.endswith("]"):
+            raise ValueError("unclosed IPv6 address")
+        return f"[{_ipv6(host[1:-1])}]"
+    domain = unquote_to_bytes(host).decode("utf-8", "replace")
+    ascii_domain = ".".join(_label_to_ascii(label) for label in _DOTS.split(domain))
+    if any(c in _FORBIDDEN_DOMAIN for c in ascii_domain):
+        raise ValueError("forbidden domain code point")
+    if _ends_in_number(ascii_domain):
+        return _ipv4(ascii_domain)
+    return ascii_domain
+
+
+def _label_to_ascii(label):
+    if label.isascii():
+        label = label.lower()
+        if label.startswith("xn--"):
+            try:
+                label[4:].encode("ascii").decode("punycode")
+            except UnicodeError:
+                raise ValueError("invalid punycode label") from None
+        return label
+    try:
+        # UTS #46 keeps the deviation characters nameprep would fold (faß.de is not fass.de)
+        label = "".join(part if part in _DEVIATIONS else idna.nameprep(part)
+                        for part in _DEVIATION_SPLIT.split(label) if part)
+        return label if label.isascii() else "xn--" + label.encode("punycode").decode("ascii")
+    except UnicodeError:
+        raise ValueError("invalid international label") from None
+
+
+def _ends_in_number(domain):
+    parts = domain.split(".")
+    if parts[-1] == "" and len(parts) > 1:
+        parts.pop()
+    last = parts[-1]
+    if last and last.isascii() and last.isdigit():
+        return True
+    return last[:2] in ("0x", "0X") and all(c in "0123456789abcdefABCDEF" for c in last[2:])
+
+
+def _ipv4_number(part):
+    if not part:
+        raise ValueError("empty IPv4 part")
+    base = 10
+    if part[:2] in ("0x", "0X"):
+        part, base = part[2:], 16
+    elif len(part) > 1 and part[0] == "0":
+        part, base = part[1:], 8
+    if not part:
+        return 0
+    if not part.isascii() or not part.isalnum():
+        raise ValueError("invalid IPv4 part")
+    return int(part, base)
+
+
+def _ipv4(domain):
+    parts = domain.split(".")
+    if parts[-1] == "" and len(parts) > 1:
+        parts.pop()
+    if len(parts) > 4:
+        raise ValueError("too many IPv4 parts")
+    numbers = [_ipv4_number(part) for part in parts]
+    if any(n > 255 for n in numbers[:-1]) or numbers[-1] >= 256 ** (5 - len(numbers)):
+        raise ValueError("IPv4 part out of range")
+    address = numbers[-1] + sum(n << (8 * (3 - i)) for i, n in enumerate(numbers[:-1]))
+    return ".".join(str(address >> shift & 0xFF) for shift in (24, 16, 8, 0))
+
+
+def _ipv6(text):
+    if "%" in text:
+        raise ValueError("zone identifiers are not allowed")
+    try:
+        address = int(ipaddress.IPv6Address(text))
+    except ValueError:
+        raise ValueError("invalid IPv6 address") from None
+    pieces = [address >> shift & 0xFFFF for shift in range(112, -16, -16)]
+    # The first longest run of two or more zero pieces becomes ::
+    start, length = -1, 1
+    i = 0
+    while i < 8:
+        j = i
+        while j < 8 and pieces[j] == 0:
+            j += 1
+        if j - i > length:
+            start, length = i, j - i
+        i = j + 1
+    if start < 0:
+        return ":".join(f"{p:x}" for p in pieces)
+    head = ":".join(f"{p:x}" for p in pieces[:start])
+    tail = ":".join(f"{p:x}" for p in pieces[start + length:])
+    return f"{head}::{tail}"
+
+
+def _opaque_host(host):
+    if host.startswith("["):
+        if not host.endswith("]"):
+            raise ValueError("unclosed IPv6 address")
+        return f"[{_ipv6(host[1:-1])}]"
+    if any(c in _FORBIDDEN_HOST for c in host):
+        raise ValueError("forbidden host code point")
+    return "".join(c if " " < c < "\x7f" else "".join(f"%{b:02X}" for b in c.encode("utf-8")) for c in host)
+
+
+# --- Matcher ---
+
+def compile_filters(filters, exceptions=ESSENTIALS):
+    """ networkFilters -> the serializable form NetworkFilter is built from """
+    filters = adblock_rules.compile_network_filters(filters)
+    host_rules = [f for f in filters if "/" not in f]
+    index = {}
+    short = []
+    for rule in host_rules:
+        if len(rule) < GRAM:
+            short.append(rule)
+        else:
+            index.setdefault(rule[:GRAM], []).append(rule)
+    return {
+        "format": NETFILTER_FORMAT,
+        "gram": GRAM,
+        "host_index": index,
+        "host_short": short,
+        "path_rules": [f for f in filters if "/" in f],
+        "exceptions": list(exceptions)
+    }
+
+
+class NetworkFilter:
+    """
+    blocks(url) gives the verdict background.js would, from the compiled form
+    (compile_filters, or netfilter.json via load()). Recent verdicts are kept
+    in an LRU of cache_size URLs; the cache is thread-safe.
+    """
+
+    def __init__(self, compiled, cache_size=4096):
+        if compiled.get("format") != NETFILTER_FORMAT:
+            raise ValueError(f"unsupported netfilter format {compiled.get('format')!r}")
+        self.compiled = compiled
+        self.gram = compiled["gram"]
+        self.host_index = compiled["host_index"]
+        self.host_short = tuple(compiled["host_short"])
+        self.path_rules = tuple(compiled["path_rules"])
+        self.exceptions = tuple(compiled["exceptions"])
+        self.blocks = functools.lru_cache(maxsize=cache_size)(self._blocks) if cache_size else self._blocks
+
+    @classmethod
+    def from_filters(cls, filters, **kwargs):
+        return cls(compile_filters(filters), **kwargs)
+
+    def _blocks(self, url):
+        for exception in self.exceptions:
+            if exception in url:
+                return False
+        try:
+            host = url_hostname(url).lower()
+        except ValueError:
+            text = url.lower()
+            return self._has_filter(text) or any(rule in text for rule in self.path_rules) or \
+                FALLBACK_PATTERN.search(text) is not None
+        return self._has_filter(host) or AD_PATTERN.search(url) is not None
+
+    def _has_filter(self, text):
+        """ Whether a host rule is a substring of text """
+        get = self.host_index.get
+        gram = self.gram
+        for i in range(len(text) - gram + 1):
+            rules = get(text[i:i + gram])
+            if rules is not None:
+                for rule in rules:
+                    if text.startswith(rule, i):
+                        return True
+        for rule in self.host_short:
+            if rule in text:
+                return True
+        return False
+
+
+# --- Prebuilt / cached compiled form (same scheme as adblock_bundle) ---
+
+def netfilter_key(rules_data):
+    digest = hashlib.sha256(f"yblox-netfilter:{NETFILTER_FORMAT}:".encode("utf-8"))
+    digest.update(rules_data)
+    return digest.hexdigest()[:20]
+
+
+def _compile_rules_data(rules_data, key):
+    filters = (json.loads(rules_data).get("networkFilters") or []) if rules_data else []
+    return dict(compile_filters(filters), **{_KEY_FIELD: key})
+
+
+def _read_compiled(path, key=None):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            compiled = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(compiled, dict) or compiled.get("format") != NETFILTER_FORMAT:
+        return None
+    if key is not None and compiled.get(_KEY_FIELD) != key:
+        return None
+    return compiled
+
+
+def _write_atomic(path, compiled):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="\n") as f:
+        json.dump(compiled, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def _read(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return b""
+
+
+def write_prebuilt(adblock_dir):
+    """ Build step: writes adblock/netfilter.json next to rules.json, returns its path """
+    rules_data = _read(os.path.join(adblock_dir, "rules.json"))
+    path = os.path.join(adblock_dir, NETFILTER_NAME)
+    _write_atomic(path, _compile_rules_data(rules_data, netfilter_key(rules_data)))
+    return path
+
+
+def load_compiled(adblock_dir, cache_dir=None):
+    """
+    Compiled filters of adblock_dir/rules.json: the frozen app reads the
+    prebuilt file as is, a source checkout takes the prebuilt or cached file
+    whose key matches the rules, otherwise compiles and caches them.
+    """
+    prebuilt = os.path.join(adblock_dir, NETFILTER_NAME)
+    if getattr(sys, "frozen", False):
+        compiled = _read_compiled(prebuilt)
+        if compiled is not None:
+            return compiled
+
+    rules_data = _read(os.path.join(adblock_dir, "rules.json"))
+    key = netfilter_key(rules_data)
+    compiled = _read_compiled(prebuilt, key)
+    if compiled is not None:
+        return compiled
+    cached = os.path.join(cache_dir, f"netfilter-{key}.json") if cache_dir else None
+    if cached:
+        compiled = _read_compiled(cached, key)
+        if compiled is not None:
+            return compiled
+
+    compiled = _compile_rules_data(rules_data, key)
+    if cached:
+        try:
+            _write_atomic(cached, compiled)
+        except OSError as e:
+            print(f"Error caching network filters: {e}")
+    return compiled
+
+
+def load(adblock_dir, cache_dir=None, **kwargs):
+    return NetworkFilter(load_compiled(adblock_dir, cache_dir), **kwargs)
+
+
+if __name__ == "__main__":
+    print(f"Network filters written to {write_prebuilt(sys.argv[1] if len(sys.argv) > 1 else 'adblock')}")
@@ -0,0 +1,299 @@
+import json
+import os
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+
+# Imported by both processes and by hot paths: stdlib only, nothing happens at import
+
+# Durations kept per span name for the percentiles
+SAMPLES_KEPT = 512
+
+
+class _NoSpan:
+    """ What span() returns while tracing is off: one shared object, nothing measured """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+NO_SPAN = _NoSpan()
+
+
+class Span:
+    __slots__ = ("tracer", "name", "attrs", "start")
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.tracer.record(self.name, (time.perf_counter() - self.start) * 1000, **self.attrs)
+        return False
+
+    def set(self, **attrs):
+        """ Attributes known only inside the span: status, sizes, counts """
+        self.attrs.update(attrs)
+
+
+class _RotatingWriter:
+    """ Appends JSON lines from a background thread; past max_bytes the file moves to .1, .1 to .2 and so on """
+
+    def __init__(self, path, max_bytes, backups):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="perf-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, record):
+        self._queue.put(record)
+
+    def _rotate(self):
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def _write(self, lines):
+        # Opened per batch: game windows share their file and one of them may rotate it meanwhile
+        f = open(self.path, "ab")
+        try:
+            size = f.seek(0, os.SEEK_END)
+            for line in lines:
+                data = line.encode("utf-8")
+                if size and size + len(data) > self.max_bytes:
+                    f.close()
+                    self._rotate()
+                    f = open(self.path, "ab")
+                    size = 0
+                f.write(data)
+                size += len(data)
+        finally:
+            f.close()
+
+    def _run(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        stop = False
+        while not stop:
+            records = [self._queue.get()]
+            while True:
+                try:
+                    records.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            done = []
+            lines = []
+            for record in records:
+                if record is None:
+                    stop = True
+                elif isinstance(record, threading.Event):
+                    done.append(record)
+                else:
+                    lines.append(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            if lines:
+                try:
+                    self._write(lines)
+                except OSError as e:
+                    print(f"Trace write error: {e}")
+            for event in done:
+                event.set()
+
+    def flush(self, timeout=5):
+        event = threading.Event()
+        self._queue.put(event)
+        event.wait(timeout)
+
+    def close(self, timeout=5):
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+
+class Tracer:
+    """
+    Timed spans and counters. Off by default: span() then returns NO_SPAN and
+    count() returns at once, so instrumented code costs one attribute check.
+    Once configured, every span is written as a JSON line to a rotating file
+    and kept in memory for summary(), which the diagnostics panel shows.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.process = "app"
+        self.path = None
+        self._writer = None
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=SAMPLES_KEPT))
+        self._totals = defaultdict(int)
+        self.counters = defaultdict(int)
+
+    def configure(self, path, process="app", max_bytes=1024 * 1024, backups=3):
+        if self._writer is not None:
+            self._writer.close()
+        self.path = path
+        self.process = process
+        self._writer = _RotatingWriter(path, max_bytes, backups)
+        self.enabled = True
+
+    def disable(self):
+        """ Stops measuring; what was written stays on disk """
+        self.enabled = False
+        if self._writer is not None:
+            self._emit({"type": "summary", "spans": self.summary(), "counters": dict(self.counters)})
+            self._writer.close()
+            self._writer = None
+
+    def span(self, name, **attrs):
+        if not self.enabled:
+            return NO_SPAN
+        return Span(self, name, attrs)
+
+    def record(self, name, ms, **attrs):
+        """ A duration measured elsewhere, e.g. across processes """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._samples[name].append(ms)
+            self._totals[name] += 1
+        self._emit({"type": "span", "name": name, "ms": round(ms, 3), **attrs})
+
+    def count(self, name, n=1):
+        if self.enabled:
+            with self._lock:
+                self.counters[name] += n
+
+    def event(self, name, message=None, **attrs):
+        """ A diagnostic line: printed for the console, recorded for the --noconsole build """
+        if message is not None:
+            print(message)
+        if self.enabled:
+            self._emit({"type": "event", "name": name, "message": message, **attrs})
+
+    def _emit(self, record):
+        writer = self._writer
+        if writer is not None:
+            record["t"] = round(time.time(), 6)
+            record["process"] = self.process
+            writer.put(record)
+
+    def summary(self):
+        """ name -> count, p50, p95 and max in milliseconds """
+        with self._lock:
+            samples = {name: (sorted(values), self._totals[name]) for name, values in self._samples.items()}
+        return {name: {"count": total, "p50": percentile(values, 0.5), "p95": percentile(values, 0.95),
+                       "max": round(values[-1], 3)}
+                for name, (values, total) in samples.items() if values}
+
+    def flush(self):
+        if self._writer is not None:
+            self._writer.flush()
+
+
+def trace_path(process):
+    """ Where each process writes its trace; the launcher's panel reads the browser's too """
+    return os.path.join(os.environ.get('APPDATA', os.path.expanduser('~')), "Yblox", "logs", f"trace-{process}.jsonl")
+
+
+def percentile(sorted_values, p):
+    return round(sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))], 3)
+
+
+def _span_ms(line, name):
+    if f'"{name}"' not in line:
+        return None
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    if record.get("type") == "span" and record.get("name") == name:
+        return record["ms"]
+    return None
+
+
+def read_spans(path, name):
+    """ Durations of one span name from a trace file written by any process """
+    values = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                ms = _span_ms(line, name)
+                if ms is not None:
+                    values.append(ms)
+    except OSError:
+        pass
+    return values
+
+
+class SpanReader:
+    """
+    read_spans for a file that keeps growing: each read() parses only what was
+    appended since the last one, so a panel can poll it on the Tk thread.
+    Once the file is rotated it starts over on the new one.
+    """
+
+    def __init__(self, path, names):
+        self.path = path
+        self.values = {name: [] for name in names}
+        self._file_id = None
+        self._offset = 0
+        self._tail = b""
+
+    def read(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return self.values
+        file_id = (st.st_dev, st.st_ino)
+        if file_id != self._file_id or st.st_size < self._offset:
+            self._file_id = file_id
+            self._offset = 0
+            self._tail = b""
+            for values in self.values.values():
+                values.clear()
+        if st.st_size == self._offset:
+            return self.values
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read(st.st_size - self._offset)
+        except OSError:
+            return self.values
+        self._offset += len(data)
+        # A line still being written stays for the next read
+        lines = (self._tail + data).split(b"\n")
+        self._tail = lines.pop()
+        for line in lines:
+            line = line.decode("utf-8", "replace")
+            for name, values in self.values.items():
+                ms = _span_ms(line, name)
+                if ms is not None:
+                    values.append(ms)
+        return self.values
+
+
+tracer = Tracer()
+span = tracer.span
+record = tracer.record
+count = tracer.count
+event = tracer.event
@@ -0,0 +1,129 @@
+import bisect
+import re
+import threading
+from collections import Counter, defaultdict
+
+# A word that only matches through trigrams needs this share of its trigrams in the name
+TRIGRAM_THRESHOLD = 0.6
+
+_SEPARATORS = re.compile(r"[^\w]+")
+
+
+def normalize(text):
+    """ Case-folded words; ё and е are the same letter for search """
+    return [w for w in _SEPARATORS.split(text.casefold().replace("ё", "е")) if w]
+
+
+def trigrams(word):
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+def _starts_with(name, words):
+    """ name read as text begins with the query, the last query word being typed """
+    return (len(name) >= len(words) and name[:len(words) - 1] == words[:-1]
+            and name[len(words) - 1].startswith(words[-1]))
+
+
+class SearchIndex:
+    """
+    In-memory index of game names for search-as-you-type.
+    Every query word has to match a word of the name, either as its prefix
+    ("mine" -> "Minecraft") or, for words of three letters and more, by
+    trigrams anywhere in the name ("craft" -> "Minecraft", "mincraft" -> "Minecraft").
+    Games are added incrementally and keep the order they were first seen in,
+    which breaks ties: the catalog lists popular games first.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._games = {}
+        self._order = {}
+        self._names = {}
+        # Sorted distinct words for prefix lookups, word -> keys
+        self._words = []
+        self._postings = defaultdict(set)
+        self._trigrams = defaultdict(set)
+
+    def __len__(self):
+        return len(self._games)
+
+    @staticmethod
+    def key(game):
+        return game.get("app_id") or game.get("app_url")
+
+    def add(self, games):
+        """ Index games or refresh the ones already known; returns how many were new """
+        added = 0
+        with self._lock:
+            for game in games:
+                key = self.key(game)
+                if not key or not game.get("name"):
+                    continue
+                if key not in self._order:
+                    self._order[key] = len(self._order)
+                    added += 1
+                self._games[key] = game
+                words = normalize(game["name"])
+                old = self._names.get(key)
+                if old == words:
+                    continue
+                if old is not None:
+                    self._unindex_locked(key, old)
+                self._names[key] = words
+                for word in words:
+                    postings = self._postings[word]
+                    if not postings:
+                        i = bisect.bisect_left(self._words, word)
+                        if i == len(self._words) or self._words[i] != word:
+                            self._words.insert(i, word)
+                    postings.add(key)
+                for gram in trigrams(" ".join(words)):
+                    self._trigrams[gram].add(key)
+        return added
+
+    def _unindex_locked(self, key, words):
+        for word in words:
+            self._postings[word].discard(key)
+        for gram in trigrams(" ".join(words)):
+            self._trigrams[gram].discard(key)
+
+    def _prefix_matches(self, word):
+        keys = set()
+        i = bisect.bisect_left(self._words, word)
+        while i < len(self._words) and self._words[i].startswith(word):
+            keys.update(self._postings[self._words[i]])
+            i += 1
+        return keys
+
+    def _trigram_scores(self, word):
+        grams = trigrams(word)
+        if not grams:
+            return {}
+        hits = Counter()
+        for gram in grams:
+            hits.update(self._trigrams.get(gram, ()))
+        return {key: count / len(grams) for key, count in hits.items() if count / len(grams) >= TRIGRAM_THRESHOLD}
+
+    def search(self, query, limit=500):
+        words = normalize(query)
+        if not words:
+            return []
+        with self._lock:
+            scores = None
+            for word in words:
+                # Prefix matches of a word score higher than trigram ones
+                word_scores = {key: 0.8 * score for key, score in self._trigram_scores(word).items()}
+                for key in self._prefix_matches(word):
+                    word_scores[key] = 1.0
+                if scores is None:
+                    scores = word_scores
+                else:
+                    scores = {key: scores[key] + score for key, score in word_scores.items() if key in scores}
+                if not scores:
+                    return []
+            for key in scores:
+                # The whole name starting with the query ranks first
+                if _starts_with(self._names[key], words):
+                    scores[key] += 1.0
+            ranked = sorted(scores, key=lambda key: (-scores[key], self._order[key]))
+            return [self._games[key] for key in ranked[:limit]]
@@ -0,0 +1,236 @@
+import json
+import os
+import sys
+import threading
+import time
+import tkinter
+import traceback
+from collections import deque
+
+import perf
+
+# Upper bounds of the histogram buckets in ms; the last bucket is open-ended
+BUCKETS_MS = (1, 2, 4, 8, 16, 33, 50, 100, 250, 500, 1000)
+
+# Heartbeat lags kept for exact percentiles
+LAGS_KEPT = 10000
+
+
+class Histogram:
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, ms):
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def to_dict(self):
+        labels = [f"<={bound}" for bound in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}"]
+        return {"count": self.count, "total_ms": round(self.total, 3), "max_ms": round(self.max, 3),
+                "buckets": {label: n for label, n in zip(labels, self.buckets) if n}}
+
+
+def describe(func):
+    """ module.qualname (file:line) of the code a Tk callback runs """
+    code = getattr(func, "__code__", None)
+    # after() wraps the callback in a closure of its own
+    if code is not None and code.co_name == "callit" and "func" in code.co_freevars:
+        func = func.__closure__[code.co_freevars.index("func")].cell_contents
+    func = getattr(func, "__func__", func)
+    code = getattr(func, "__code__", None)
+    if code is None:
+        return f"{type(func).__module__}.{type(func).__qualname__}"
+    return f"{func.__module__}.{func.__qualname__} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class _Running:
+    """ A callback on the Tk thread right now """
+    __slots__ = ("name", "start", "stacks")
+
+    def __init__(self, name, start):
+        self.name = name
+        self.start = start
+        self.stacks = {}
+
+
+class StallWatchdog:
+    """
+    Opt-in jank finder for the Tk thread.
+
+    Every Python callback Tk runs (after(), widget commands, bindings) is
+    registered through Misc._register; while the watchdog is installed that
+    goes through a wrapper which times the call into a histogram per callback.
+    A heartbeat scheduled every heartbeat_ms measures how late the main loop
+    gets to it. While the loop is blocked longer than threshold_ms a monitor
+    thread samples the Tk thread's stack, and the stall is recorded with the
+    callback that was running and the stacks seen.
+
+    Callbacks registered before start() are not wrapped; start it before
+    building the widgets.
+    """
+
+    _active = None
+    _original_register = None
+
+    def __init__(self, root, threshold_ms=100, heartbeat_ms=50, sample_ms=20, max_stalls=200, stack_depth=20):
+        self.root = root
+        self.threshold_ms = threshold_ms
+        self.heartbeat_ms = heartbeat_ms
+        self.sample_ms = sample_ms
+        self.stack_depth = stack_depth
+        self.callbacks = {}
+        self.heartbeat = Histogram()
+        self.lags = deque(maxlen=LAGS_KEPT)
+        self.stalls = deque(maxlen=max_stalls)
+        self.stall_count = 0
+        self._running = []
+        self._loop_stacks = {}
+        self._last_beat = 0.0
+        self._last_stall_end = 0.0
+        self._beat_command = None
+        self._beat_id = None
+        self._tk_thread = None
+        self._stop = threading.Event()
+        self._monitor = None
+
+    # --- Lifecycle ---
+
+    def start(self):
+        if StallWatchdog._active is not None:
+            raise RuntimeError("a StallWatchdog is already running")
+        StallWatchdog._active = self
+        StallWatchdog._original_register = tkinter.Misc._register
+        tkinter.Misc._register = _register
+        self._tk_thread = threading.get_ident()
+        # A Tcl command of its own: the heartbeat is neither wrapped nor re-registered every beat
+        self._beat_command = f"yblox_watchdog_beat_{id(self)}"
+        self.root.tk.createcommand(self._beat_command, self._beat)
+        self._last_beat = self._expected = time.perf_counter()
+        self._schedule_beat()
+        self._stop.clear()
+        self._monitor = threading.Thread(target=self._monitor_loop, name="tk-watchdog", daemon=True)
+        self._monitor.start()
+        return self
+
+    def stop(self):
+        if StallWatchdog._active is not self:
+            return
+        tkinter.Misc._register = StallWatchdog._original_register
+        StallWatchdog._active = None
+        self._stop.set()
+        try:
+            if self._beat_id is not None:
+                self.root.tk.call("after", "cancel", self._beat_id)
+            self.root.tk.deletecommand(self._beat_command)
+        except tkinter.TclError:
+            pass
+
+    # --- Callback timing ---
+
+    def wrap(self, func):
+        name = describe(func)
+
+        def timed(*args):
+            running = _Running(name, time.perf_counter())
+            self._running.append(running)
+            try:
+                return func(*args)
+            finally:
+                end = time.perf_counter()
+                self._running.pop()
+                self._finished(running, (end - running.start) * 1000, end)
+
+        # _register names the Tcl command after the function
+        timed.__name__ = getattr(func, "__name__", "callback")
+        return timed
+
+    def _finished(self, running, ms, end):
+        histogram = self.callbacks.get(running.name)
+        if histogram is None:
+            histogram = self.callbacks[running.name] = Histogram()
+        histogram.add(ms)
+        if ms >= self.threshold_ms:
+            self._last_stall_end = end
+            self._record_stall(running.name, ms, running.stacks)
+
+    def _record_stall(self, name, ms, stacks):
+        self.stall_count += 1
+        stacks = sorted(stacks.items(), key=lambda item: -item[1])
+        self.stalls.append({"callback": name, "ms": round(ms, 3), "t": round(time.time(), 3),
+                            "stacks": [{"samples": n, "stack": list(stack)} for stack, n in stacks]})
+        perf.count("tk.stalls")
+        perf.record("tk.stall", ms, callback=name)
+
+    # --- Heartbeat ---
+
+    def _schedule_beat(self):
+        self._beat_id = self.root.tk.call("after", self.heartbeat_ms, self._beat_command)
+
+    def _beat(self):
+        now = time.perf_counter()
+        lag = max(0.0, (now - self._expected) * 1000)
+        self.heartbeat.add(lag)
+        self.lags.append(lag)
+        # A blocked loop no callback accounts for: Tk's own work, or code outside callbacks
+        if lag >= self.threshold_ms and self._last_stall_end < self._last_beat:
+            self._record_stall("(main loop)", lag, self._loop_stacks)
+        self._loop_stacks = {}
+        self._last_beat = now
+        self._expected = now + self.heartbeat_ms / 1000
+        self._schedule_beat()
+
+    # --- Stack sampling ---
+
+    def _monitor_loop(self):
+        while not self._stop.wait(self.sample_ms / 1000):
+            blocked = (time.perf_counter() - self._expected) * 1000
+            if blocked < self.threshold_ms:
+                continue
+            frame = sys._current_frames().get(self._tk_thread)
+            if frame is None:
+                continue
+            stack = tuple(f"{os.path.basename(entry.filename)}:{entry.lineno} {entry.name}"
+                          for entry in traceback.extract_stack(frame, limit=self.stack_depth)
+                          if not entry.filename.endswith("stall_watchdog.py"))
+            running = self._running[-1] if self._running else None
+            stacks = running.stacks if running is not None else self._loop_stacks
+            stacks[stack] = stacks.get(stack, 0) + 1
+
+    # --- Export ---
+
+    def summary(self):
+        lags = sorted(self.lags)
+        def pick(p):
+            return round(lags[min(len(lags) - 1, int(len(lags) * p))], 3) if lags else 0.0
+        return {"heartbeat_ms": self.heartbeat_ms, "threshold_ms": self.threshold_ms,
+                "lag_p50_ms": pick(0.5), "lag_p95_ms": pick(0.95), "lag_p99_ms": pick(0.99),
+                "lag_max_ms": round(self.heartbeat.max, 3), "stalls": self.stall_count}
+
+    def export(self):
+        callbacks = sorted(self.callbacks.items(), key=lambda item: -item[1].max)
+        return {"summary": self.summary(), "heartbeat": self.heartbeat.to_dict(),
+                "callbacks": {name: histogram.to_dict() for name, histogram in callbacks},
+                "stalls": list(self.stalls)}
+
+    def write(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.export(), f, indent=2, ensure_ascii=False)
+
+
+def _register(widget, func, subst=None, needcleanup=1):
+    watchdog = StallWatchdog._active
+    if watchdog is not None:
+        func = watchdog.wrap(func)
+    return StallWatchdog._original_register(widget, func, subst, needcleanup)
@@ -0,0 +1,31 @@
+import os
+import sys
+import time
+
+# Imported by both entry points before anything else: keep it stdlib-only
+
+# Slim executable for game windows next to a onefile build (build_exe.py, game.py)
+GAME_EXECUTABLE = "YbloxGame"
+
+
+def resource_path(relative_path):
+    """ Get absolute path to resource, works for dev and for PyInstaller """
+    try:
+        # PyInstaller creates a temp folder and stores path in _MEIPASS
+        base_path = sys._MEIPASS
+    except Exception:
+        base_path = os.path.abspath(".")
+
+    return os.path.join(base_path, relative_path)
+
+
+def probe(stage):
+    """
+    Startup benchmarks (benchmarks/bench_startup.py) set YBLOX_STARTUP_PROBE;
+    the process then reports the wall-clock time it reached stage and the
+    caller is expected to stop there. Returns False in normal runs.
+    """
+    if not os.environ.get("YBLOX_STARTUP_PROBE"):
+        return False
+    print(f"YBLOX_PROBE {stage} {time.time():.6f}", flush=True)
+    return True
@@ -0,0 +1,366 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS history (
+    app_url TEXT PRIMARY KEY,
+    game TEXT NOT NULL,
+    play_count INTEGER NOT NULL DEFAULT 1,
+    first_played REAL NOT NULL,
+    last_played REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS history_last_played ON history (last_played);
+CREATE TABLE IF NOT EXISTS catalog (
+    url TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    games TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS catalog_games (
+    app_id TEXT PRIMARY KEY,
+    game TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS catalog_games_rank ON catalog_games (rank);
+CREATE TABLE IF NOT EXISTS crawl_sections (
+    url TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    next_page INTEGER NOT NULL DEFAULT 0,
+    complete INTEGER NOT NULL DEFAULT 0,
+    fetched_at REAL NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS thumbnails (
+    key TEXT PRIMARY KEY,
+    file TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    atime REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS assets (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    file TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    atime REAL NOT NULL,
+    stored_at REAL NOT NULL,
+    expires REAL NOT NULL,
+    headers TEXT NOT NULL
+);
+"""
+
+SCHEMA_VERSION = 1
+
+
+class LocalStore:
+    """
+    Local database of the launcher: settings, play history, catalog snapshots,
+    the thumbnail cache index and the game asset cache index, in one SQLite
+    file in WAL mode.
+    Reads are primary-key or index lookups on the calling thread. Writes are
+    queued and committed by a background thread, everything that arrived
+    within batch_delay in one transaction, so the Tk thread never waits on disk.
+    """
+
+    def __init__(self, path, batch_delay=0.05):
+        self.path = path
+        self.batch_delay = batch_delay
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._read = self._connect(check_same_thread=False)
+        self._read_lock = threading.Lock()
+        with self._read_lock, self._read:
+            self._read.executescript(SCHEMA)
+            self._read.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+        self._queue = queue.Queue()
+        self._closed = False
+        self.batches = 0
+        self.writes = 0
+        self._writer = threading.Thread(target=self._writer_loop, name="store-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self, check_same_thread=True):
+        conn = sqlite3.connect(self.path, timeout=10, check_same_thread=check_same_thread)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # WAL keeps the database consistent without an fsync per commit
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # --- Writer ---
+
+    def _write(self, sql, params=(), many=False):
+        # After close() nobody commits it: a late write from a background thread is dropped
+        if self._closed:
+            return
+        self._queue.put((sql, params, many))
+
+    def _writer_loop(self):
+        conn = self._connect()
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            if self.batch_delay:
+                time.sleep(self.batch_delay)
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            done = []
+            with conn:
+                for item in batch:
+                    if item is None:
+                        stop = True
+                    elif isinstance(item, threading.Event):
+                        done.append(item)
+                    else:
+                        sql, params, many = item
+                        try:
+                            if many:
+                                conn.executemany(sql, params)
+                            else:
+                                conn.execute(sql, params)
+                            self.writes += 1
+                        except sqlite3.Error as e:
+                            print(f"Store write error: {e}")
+            self.batches += 1
+            for event in done:
+                event.set()
+        conn.close()
+
+    def flush(self, timeout=10):
+        """ Wait until every write queued so far is committed """
+        if not self._writer.is_alive():
+            return
+        event = threading.Event()
+        self._queue.put(event)
+        event.wait(timeout)
+
+    def close(self):
+        self._closed = True
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join(timeout=10)
+        with self._read_lock:
+            self._read.close()
+
+    def _query(self, sql, params=()):
+        with self._read_lock:
+            return self._read.execute(sql, params).fetchall()
+
+    # --- Meta ---
+
+    def get_meta(self, key):
+        rows = self._query("SELECT value FROM meta WHERE key = ?", (key,))
+        return rows[0][0] if rows else None
+
+    def set_meta(self, key, value):
+        self._write("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    # --- Settings ---
+
+    def get_settings(self):
+        return {key: json.loads(value) for key, value in self._query("SELECT key, value FROM settings")}
+
+    def put_settings(self, settings):
+        self._write("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                    [(key, json.dumps(value, ensure_ascii=False)) for key, value in settings.items()], many=True)
+
+    # --- History ---
+
+    def recent_games(self, limit=8):
+        """ Newest first; limit=None returns the whole history """
+        rows = self._query("SELECT game, play_count, last_played FROM history ORDER BY last_played DESC LIMIT ?",
+                           (-1 if limit is None else limit,))
+        games = []
+        for game, play_count, last_played in rows:
+            game = json.loads(game)
+            game["play_count"] = play_count
+            game["last_played"] = last_played
+            games.append(game)
+        return games
+
+    def record_play(self, game, played_at=None):
+        played_at = time.time() if played_at is None else played_at
+        data = {k: v for k, v in game.items() if k not in ("play_count", "last_played")}
+        self._write("INSERT INTO history (app_url, game, play_count, first_played, last_played) VALUES (?, ?, 1, ?, ?) "
+                    "ON CONFLICT (app_url) DO UPDATE SET game = excluded.game, play_count = play_count + 1, "
+                    "last_played = excluded.last_played",
+                    (game["app_url"], json.dumps(data, ensure_ascii=False), played_at, played_at))
+
+    def clear_history(self):
+        self._write("DELETE FROM history")
+
+    # --- Catalog snapshots ---
+
+    def get_catalog(self, url):
+        rows = self._query("SELECT fetched_at, etag, last_modified, games FROM catalog WHERE url = ?", (url,))
+        if not rows:
+            return None
+        fetched_at, etag, last_modified, games = rows[0]
+        return {"url": url, "fetched_at": fetched_at, "etag": etag, "last_modified": last_modified, "games": json.loads(games)}
+
+    def put_catalog(self, entry):
+        self._write("INSERT OR REPLACE INTO catalog (url, fetched_at, etag, last_modified, games) VALUES (?, ?, ?, ?, ?)",
+                    (entry["url"], entry["fetched_at"], entry.get("etag"), entry.get("last_modified"),
+                     json.dumps(entry["games"], ensure_ascii=False)))
+
+    def iter_catalog_games(self):
+        """ Games of every stored snapshot, one page at a time """
+        for (games,) in self._query("SELECT games FROM catalog ORDER BY fetched_at DESC"):
+            yield json.loads(games)
+
+    def touch_catalog(self, url, fetched_at):
+        self._write("UPDATE catalog SET fetched_at = ? WHERE url = ?", (fetched_at, url))
+
+    # --- Crawled catalog ---
+
+    def catalog_games(self, offset=0, limit=60):
+        """ Games merged from every crawled section, catalog order; limit=None returns all """
+        rows = self._query("SELECT game FROM catalog_games ORDER BY rank LIMIT ? OFFSET ?",
+                           (-1 if limit is None else limit, offset))
+        return [json.loads(game) for (game,) in rows]
+
+    def catalog_game_count(self):
+        return self._query("SELECT COUNT(*) FROM catalog_games")[0][0]
+
+    def put_catalog_games(self, games, rank, seen_at=None):
+        """ Upsert by app_id; rank of a game is the best (lowest) it was listed at, rank + i here """
+        seen_at = time.time() if seen_at is None else seen_at
+        self._write("INSERT INTO catalog_games (app_id, game, rank, first_seen, last_seen) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (app_id) DO UPDATE SET game = excluded.game, rank = MIN(rank, excluded.rank), "
+                    "last_seen = excluded.last_seen",
+                    [(g["app_id"], json.dumps(g, ensure_ascii=False), rank + i, seen_at, seen_at)
+                     for i, g in enumerate(games) if g.get("app_id")], many=True)
+
+    def crawl_sections(self):
+        """ Crawl checkpoints by section URL, in discovery order """
+        rows = self._query("SELECT url, kind, position, next_page, complete, fetched_at, error "
+                           "FROM crawl_sections ORDER BY position")
+        return {url: {"url": url, "kind": kind, "position": position, "next_page": next_page,
+                      "complete": bool(complete), "fetched_at": fetched_at, "error": error}
+                for url, kind, position, next_page, complete, fetched_at, error in rows}
+
+    def put_crawl_section(self, section):
+        self._write("INSERT OR REPLACE INTO crawl_sections (url, kind, position, next_page, complete, fetched_at, error) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (section["url"], section["kind"], section["position"], section["next_page"],
+                     int(section["complete"]), section["fetched_at"], section.get("error")))
+
+    # --- Thumbnail cache index ---
+
+    def thumbnail_index(self):
+        return {key: {"file": file, "size": size, "atime": atime}
+                for key, file, size, atime in self._query("SELECT key, file, size, atime FROM thumbnails")}
+
+    def put_thumbnail(self, key, entry):
+        self._write("INSERT OR REPLACE INTO thumbnails (key, file, size, atime) VALUES (?, ?, ?, ?)",
+                    (key, entry["file"], entry["size"], entry["atime"]))
+
+    def touch_thumbnails(self, atimes):
+        self._write("UPDATE thumbnails SET atime = ? WHERE key = ?", [(atime, key) for key, atime in atimes.items()], many=True)
+
+    def delete_thumbnails(self, keys):
+        self._write("DELETE FROM thumbnails WHERE key = ?", [(key,) for key in keys], many=True)
+
+    # --- Game asset cache index (asset_proxy.py) ---
+
+    def asset_index(self):
+        return {key: {"url": url, "file": file, "size": size, "atime": atime, "stored_at": stored_at,
+                      "expires": expires, "headers": json.loads(headers)}
+                for key, url, file, size, atime, stored_at, expires, headers in self._query(
+                    "SELECT key, url, file, size, atime, stored_at, expires, headers FROM assets")}
+
+    def asset_sizes(self):
+        """ (key, file, size) of every committed entry, least recently used first """
+        return self._query("SELECT key, file, size FROM assets ORDER BY atime")
+
+    def put_asset(self, key, entry):
+        self._write("INSERT OR REPLACE INTO assets (key, url, file, size, atime, stored_at, expires, headers) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, entry["url"], entry["file"], entry["size"], entry["atime"], entry["stored_at"],
+                     entry["expires"], json.dumps(entry["headers"], ensure_ascii=False)))
+
+    def touch_assets(self, atimes):
+        self._write("UPDATE assets SET atime = ? WHERE key = ?", [(atime, key) for key, atime in atimes.items()], many=True)
+
+    def delete_assets(self, keys):
+        self._write("DELETE FROM assets WHERE key = ?", [(key,) for key in keys], many=True)
+
+    # --- Migration from the JSON files of earlier versions ---
+
+    def migrate_json(self, settings_path, recent_path, catalog_dir, thumbs_dir):
+        """ One-time import on the first run with a database; returns what was imported """
+        if self.get_meta("json_migrated"):
+            return {}
+        imported = {}
+        settings = _read_json(settings_path)
+        recent = _read_json(recent_path)
+        with self._read_lock, self._read:
+            if isinstance(settings, dict):
+                self._read.executemany("INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)",
+                                       [(k, json.dumps(v, ensure_ascii=False)) for k, v in settings.items()])
+                imported["settings"] = len(settings)
+            if isinstance(recent, list):
+                # The old file only kept the order, newest first
+                now = time.time()
+                rows = [(g["app_url"], json.dumps(g, ensure_ascii=False), now - i, now - i)
+                        for i, g in enumerate(recent) if isinstance(g, dict) and g.get("app_url")]
+                self._read.executemany("INSERT OR IGNORE INTO history (app_url, game, play_count, first_played, last_played) "
+                                       "VALUES (?, ?, 1, ?, ?)", rows)
+                imported["history"] = len(rows)
+            catalog_files = _json_files(catalog_dir)
+            for path in catalog_files:
+                entry = _read_json(path)
+                if isinstance(entry, dict) and entry.get("url") and isinstance(entry.get("games"), list):
+                    self._read.execute("INSERT OR IGNORE INTO catalog (url, fetched_at, etag, last_modified, games) "
+                                       "VALUES (?, ?, ?, ?, ?)",
+                                       (entry["url"], entry.get("fetched_at", 0), entry.get("etag"),
+                                        entry.get("last_modified"), json.dumps(entry["games"], ensure_ascii=False)))
+                    imported["catalog"] = imported.get("catalog", 0) + 1
+            thumbs_index_path = os.path.join(thumbs_dir, "index.json")
+            index = _read_json(thumbs_index_path)
+            if isinstance(index, dict):
+                self._read.executemany("INSERT OR IGNORE INTO thumbnails (key, file, size, atime) VALUES (?, ?, ?, ?)",
+                                       [(k, e["file"], e["size"], e["atime"]) for k, e in index.items()])
+                imported["thumbnails"] = len(index)
+            self._read.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', ?)", (str(time.time()),))
+
+        # Caches now live in the database; the settings and history files stay as they were
+        for path in catalog_files + [thumbs_index_path]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        if imported:
+            print(f"Migrated JSON data into {self.path}: {imported}")
+        return imported
+
+
+def _read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _json_files(directory):
+    try:
+        return [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".json")]
+    except OSError:
+        return []
@@ -0,0 +1,120 @@
+import hashlib
+import os
+import threading
+import time
+
+from PIL import Image
+
+from thumb_decode import encode_for_cache
+
+
+class ThumbnailDiskCache:
+    """
+    Content-addressed store of already resized thumbnails.
+    Files are named by the SHA-256 of the thumbnail URL and the size it was
+    resized to (the launcher's depends on the display scaling); the
+    thumbnails table of the LocalStore keeps size and last access time of
+    every entry so lookups and LRU eviction never have to list the directory.
+    """
+
+    def __init__(self, directory, store, max_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.store = store
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Access times not written yet, by key
+        self._touched = {}
+        os.makedirs(directory, exist_ok=True)
+        self._index = store.thumbnail_index()
+        self._total = sum(e["size"] for e in self._index.values())
+
+    @staticmethod
+    def key(url, size):
+        width, height = size
+        return hashlib.sha256(f"{url}\n{width}x{height}".encode("utf-8")).hexdigest()
+
+    def _write_atomic(self, name, data):
+        path = os.path.join(self.directory, name)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def has(self, url, size):
+        with self._lock:
+            return self.key(url, size) in self._index
+
+    def get(self, url, size):
+        key = self.key(url, size)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+            entry["atime"] = time.time()
+            self._touched[key] = entry["atime"]
+        try:
+            img = Image.open(os.path.join(self.directory, entry["file"]))
+            img.load()
+            return img
+        except (OSError, ValueError):
+            # Файл пропал или поврежден — забываем запись
+            with self._lock:
+                if self._index.pop(key, None) is not None:
+                    self._total -= entry["size"]
+                    self._touched.pop(key, None)
+            self.store.delete_thumbnails([key])
+            return None
+
+    def put(self, url, img):
+        self.put_encoded(url, img.size, *encode_for_cache(img))
+
+    def put_encoded(self, url, size, data, ext):
+        """ Store a thumbnail already encoded (by a decode worker process) """
+        key = self.key(url, size)
+        file_name = f"{key}.{ext}"
+        try:
+            self._write_atomic(file_name, data)
+        except OSError as e:
+            print(f"Error saving thumbnail cache entry: {e}")
+            return
+
+        with self._lock:
+            old = self._index.get(key)
+            if old is not None:
+                self._total -= old["size"]
+            entry = self._index[key] = {"file": file_name, "size": len(data), "atime": time.time()}
+            self._total += len(data)
+            evicted = self._evict_locked()
+        self.store.put_thumbnail(key, entry)
+        if evicted:
+            self.store.delete_thumbnails(evicted)
+        removed = list(evicted.values())
+        # Stored again in another format: the old file is no longer in the index
+        if old is not None and old["file"] != file_name:
+            removed.append(old["file"])
+        for name in removed:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+        self.flush()
+
+    def _evict_locked(self):
+        if self._total <= self.max_bytes:
+            return {}
+        evicted = {}
+        for key, entry in sorted(self._index.items(), key=lambda kv: kv[1]["atime"]):
+            if self._total <= self.max_bytes:
+                break
+            del self._index[key]
+            self._touched.pop(key, None)
+            self._total -= entry["size"]
+            evicted[key] = entry["file"]
+        return evicted
+
+    def flush(self):
+        """ Queue the access times collected since the last flush """
+        with self._lock:
+            touched, self._touched = self._touched, {}
+        if touched:
+            self.store.touch_thumbnails(touched)
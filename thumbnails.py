@@ -0,0 +1,261 @@
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import urlsplit
+
+import perf
+from thumb_decode import Thumbnail, decode_thumbnail
+
+THUMB_SIZE = (180, 140)
+
+# Meta key of the size the launcher last decoded thumbnails at (THUMB_SIZE times the display scaling)
+DISPLAY_SIZE_KEY = "thumbnail_display_size"
+
+
+def save_display_size(store, size):
+    store.set_meta(DISPLAY_SIZE_KEY, json.dumps(list(size)))
+
+
+def display_size(store):
+    """ The launcher's thumbnail size, so the disk cache can be filled for it; THUMB_SIZE before its first start """
+    try:
+        width, height = json.loads(store.get_meta(DISPLAY_SIZE_KEY) or "null")
+        return int(width), int(height)
+    except (TypeError, ValueError):
+        return THUMB_SIZE
+
+
+def default_processes():
+    return min(4, os.cpu_count() or 1)
+
+
+class ThumbnailLoader:
+    """
+    Downloads thumbnails over one keep-alive session per host; decoding and
+    resizing run in a small process pool so they hold neither the GIL nor the
+    UI thread, and come back as raw pixel buffers (thumb_decode.Thumbnail)
+    """
+
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
+        "Accept": "image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8",
+        "Referer": "https://yandex.ru/"
+    }
+
+    def __init__(self, size=THUMB_SIZE, pool_size=6, disk_cache=None, processes=None):
+        self.size = tuple(size)
+        self.pool_size = pool_size
+        self.disk_cache = disk_cache
+        # None: default_processes(); 0: decode in the calling (download) thread
+        self.processes = default_processes() if processes is None else processes
+        self._executor = None
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def session_for(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                # Imported with the first download: requests is slow to import and
+                # the launcher should not pay for it before its first frame
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                session.headers.update(self.headers)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[host] = session
+            return session
+
+    def executor(self):
+        with self._lock:
+            if self._executor is None and self.processes > 0:
+                # Started with the first image, not with the launcher
+                self._executor = ProcessPoolExecutor(max_workers=self.processes)
+            return self._executor
+
+    def decode(self, data):
+        encode_cache = self.disk_cache is not None
+        executor = self.executor()
+        if executor is not None:
+            try:
+                return executor.submit(decode_thumbnail, data, self.size, encode_cache).result()
+            except BrokenProcessPool:
+                # A worker died (out of memory, killed): carry on in this thread
+                print("Thumbnail decode pool is broken, decoding in threads")
+                with self._lock:
+                    self.processes = 0
+                    self._executor = None
+        return decode_thumbnail(data, self.size, encode_cache)
+
+    def load(self, url):
+        if self.disk_cache is not None:
+            img = self.disk_cache.get(url, self.size)
+            if img is not None:
+                perf.count("thumb.disk_hit")
+                return Thumbnail.from_image(img)
+
+        with perf.span("thumb.download") as span:
+            response = self.session_for(url).get(url, timeout=15, allow_redirects=True)
+            span.set(status=response.status_code, bytes=len(response.content))
+        if response.status_code != 200:
+            perf.count("thumb.http_error")
+            perf.event("thumb.error", f"Thumb error {response.status_code} for {url}", url=url, status=response.status_code)
+            return None
+
+        thumb, cache_data, cache_ext, decode_ms, resize_ms = self.decode(response.content)
+        perf.record("thumb.decode", decode_ms)
+        perf.record("thumb.resize", resize_ms)
+        if cache_data is not None:
+            self.disk_cache.put_encoded(url, self.size, cache_data, cache_ext)
+        return thumb
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ThumbnailTicket:
+    def __init__(self, url, callback):
+        self.url = url
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class ThumbnailScheduler:
+    """
+    Fixed pool of workers fed from a priority queue.
+    Lower priority values are served first; requests for a URL that is already
+    queued or downloading are attached to the existing job instead of refetching.
+    """
+
+    def __init__(self, loader, workers=6):
+        self.loader = loader
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._jobs = {}  # url -> tickets waiting for that url
+        self._best_priority = {}
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self.stats = {
+            "submitted": 0,
+            "coalesced": 0,
+            "cancelled": 0,
+            "fetched": 0,
+            "failed": 0,
+            "fetch_time_total": 0.0,
+            "fetch_time_max": 0.0
+        }
+        self._threads = [threading.Thread(target=self._worker, name=f"thumb-worker-{i}", daemon=True)
+                         for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, url, callback, priority=0):
+        """ Queue url; callback(Thumbnail or None) is called from a worker thread """
+        ticket = ThumbnailTicket(url, callback)
+        with self._lock:
+            self.stats["submitted"] += 1
+            tickets = self._jobs.get(url)
+            if tickets is not None:
+                tickets.append(ticket)
+                self.stats["coalesced"] += 1
+                # A more urgent duplicate bumps the queued job ahead
+                if url not in self._in_flight and priority < self._best_priority[url]:
+                    self._best_priority[url] = priority
+                    self._queue.put((1, priority, next(self._seq), url))
+                return ticket
+            self._jobs[url] = [ticket]
+            self._best_priority[url] = priority
+        self._queue.put((1, priority, next(self._seq), url))
+        return ticket
+
+    def close(self, timeout=2.0):
+        """
+        Stop the workers once their current download is done; queued jobs are
+        dropped. Waits up to timeout for them, so nothing they finish later
+        (a disk cache write) runs after the caller closed what it uses.
+        """
+        # Stop markers sort before every job: (0, ...) against (1, priority, ...)
+        for _ in self._threads:
+            self._queue.put((0, 0, next(self._seq), None))
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+
+    def queue_depth(self):
+        with self._lock:
+            return len(self._jobs) - len(self._in_flight)
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats["queue_depth"] = len(self._jobs) - len(self._in_flight)
+            stats["in_flight"] = len(self._in_flight)
+        done = stats["fetched"] + stats["failed"]
+        stats["fetch_time_avg"] = stats["fetch_time_total"] / done if done else 0.0
+        return stats
+
+    def _take(self, url):
+        with self._lock:
+            tickets = self._jobs.get(url)
+            # Stale duplicate of a job that was bumped or already taken
+            if tickets is None or url in self._in_flight:
+                return False
+            if all(t.cancelled for t in tickets):
+                self.stats["cancelled"] += len(tickets)
+                del self._jobs[url]
+                del self._best_priority[url]
+                return False
+            self._in_flight.add(url)
+            return True
+
+    def _finish(self, url, image, elapsed, ok):
+        with self._lock:
+            tickets = self._jobs.pop(url, [])
+            self._best_priority.pop(url, None)
+            self._in_flight.discard(url)
+            self.stats["fetched" if ok else "failed"] += 1
+            self.stats["fetch_time_total"] += elapsed
+            self.stats["fetch_time_max"] = max(self.stats["fetch_time_max"], elapsed)
+            idle = not self._jobs
+        for ticket in tickets:
+            if ticket.cancelled:
+                continue
+            try:
+                ticket.callback(image)
+            except Exception as e:
+                print(f"Thumbnail callback error: {e}")
+        if idle:
+            stats = self.snapshot()
+            print(f"Thumbnails idle: {stats['fetched']} fetched, {stats['failed']} failed, "
+                  f"{stats['coalesced']} coalesced, {stats['cancelled']} cancelled, "
+                  f"avg {stats['fetch_time_avg'] * 1000:.0f} ms, max {stats['fetch_time_max'] * 1000:.0f} ms")
+
+    def _worker(self):
+        while True:
+            _, _, _, url = self._queue.get()
+            if url is None:
+                return
+            if not self._take(url):
+                continue
+            start = time.perf_counter()
+            image = None
+            try:
+                image = self.loader.load(url)
+            except Exception as e:
+                print(f"Error loading thumbnail {url}: {e}")
+            self._finish(url, image, time.perf_counter() - start, image is not None)
@@ -0,0 +1,212 @@
+import customtkinter as ctk
+
+
+class VirtualGrid(ctk.CTkFrame):
+    """
+    Scrollable grid that only keeps widgets for the rows in or near the viewport.
+
+    Cards are created with card_factory(parent, item, index) and later rebound
+    to other items with bind_card(card, item, index) as the user scrolls, so the
+    number of widgets depends on the window size, not on the number of items.
+    A header widget (a child of self.canvas) can be shown above the first row.
+    on_need_more() is called once the last rows come into view; call
+    more_loaded() after appending the next page.
+    """
+
+    def __init__(self, master, card_factory, bind_card, key=None, on_need_more=None, on_render=None,
+                 overscan=1, padding=10, fg_color=("#F2F4F5", "#1B1D1F"), **kwargs):
+        super().__init__(master, fg_color=fg_color, corner_radius=0, **kwargs)
+        self.card_factory = card_factory
+        self.bind_card = bind_card
+        self.key = key or (lambda item: id(item))
+        self.on_need_more = on_need_more
+        self.on_render = on_render
+        self.overscan = overscan
+        self.padding = padding
+
+        self.items = []
+        self.first_visible = 0
+        self.exhausted = False
+        self._bound = {}  # item index -> card
+        self._free = {}  # item key the card last showed -> card
+        self._windows = {}  # card -> canvas window id
+        self._cell = None
+        self._columns = 1
+        self._header = None
+        self._header_window = None
+        self._render_pending = False
+        self._relayout_pending = False
+        self._more_requested = False
+
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.canvas = ctk.CTkCanvas(self, highlightthickness=0, bd=0, bg=self._apply_appearance_mode(self._fg_color))
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.canvas.yview)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.canvas.configure(yscrollcommand=self._on_yscroll)
+        self.canvas.bind("<Configure>", lambda e: self._relayout())
+
+        self.canvas.bind_all("<MouseWheel>", self._on_mousewheel, add="+")
+        self.canvas.bind_all("<Button-4>", self._on_mousewheel, add="+")
+        self.canvas.bind_all("<Button-5>", self._on_mousewheel, add="+")
+
+    def _set_appearance_mode(self, mode_string):
+        super()._set_appearance_mode(mode_string)
+        self.canvas.configure(bg=self._apply_appearance_mode(self._fg_color))
+
+    # --- Public API ---
+
+    def set_header(self, widget):
+        self._header = widget
+        self._header_window = self.canvas.create_window(0, 0, window=widget, anchor="nw")
+        widget.bind("<Configure>", lambda e: self._schedule_relayout(), add="+")
+        self._schedule_relayout()
+
+    def set_items(self, items, reset_scroll=True):
+        # Unbind everything but remember which item each card showed,
+        # so the same game lands on the same card again if possible
+        self._release_all()
+        self.items = list(items)
+        self.exhausted = False
+        self._more_requested = False
+        if reset_scroll:
+            self.canvas.yview_moveto(0)
+        self._relayout()
+
+    def append_items(self, items):
+        self.items.extend(items)
+        self._relayout()
+
+    def more_loaded(self, has_more=True):
+        self._more_requested = False
+        if not has_more:
+            self.exhausted = True
+
+    # --- Layout ---
+
+    def _release(self, card, item):
+        self.canvas.itemconfigure(self._windows[card], state="hidden")
+        key = self.key(item)
+        if key in self._free:
+            key = ("free", id(card))
+        self._free[key] = card
+
+    def _release_all(self):
+        for index, card in self._bound.items():
+            self._release(card, self.items[index])
+        self._bound = {}
+
+    def _acquire(self, item, index):
+        card = self._free.pop(self.key(item), None)
+        if card is None and self._free:
+            card = self._free.pop(next(iter(self._free)))
+        if card is None:
+            card = self.card_factory(self.canvas, item, index)
+            self._windows[card] = self.canvas.create_window(0, 0, window=card, anchor="nw")
+        else:
+            self.bind_card(card, item, index)
+        return card
+
+    def _measure_cell(self):
+        if self._cell is not None or not self.items:
+            return
+        card = self._acquire(self.items[0], 0)
+        card.update_idletasks()
+        self._cell = (card.winfo_reqwidth() + 2 * self.padding, card.winfo_reqheight() + 2 * self.padding)
+        self._release(card, self.items[0])
+
+    def _header_height(self):
+        return self._header.winfo_reqheight() if self._header is not None else 0
+
+    def _schedule_relayout(self):
+        if not self._relayout_pending:
+            self._relayout_pending = True
+            self.after_idle(self._relayout)
+
+    def _relayout(self):
+        self._relayout_pending = False
+        width = max(self.canvas.winfo_width(), 1)
+        if self._header_window is not None:
+            self.canvas.itemconfigure(self._header_window, width=width)
+        self._measure_cell()
+        top = self._header_height()
+        if self._cell is None:
+            self.canvas.configure(scrollregion=(0, 0, width, top))
+            self._render()
+            return
+
+        columns = max(1, width // self._cell[0])
+        if columns != self._columns:
+            # Reflow: every card moves, so rebind from scratch
+            self._columns = columns
+            self._release_all()
+        rows = -(-len(self.items) // self._columns)
+        self.canvas.configure(scrollregion=(0, 0, width, top + rows * self._cell[1]))
+        self._render()
+
+    def _render(self):
+        if self.on_render:
+            self.on_render()
+        if self._cell is None or not self.items:
+            self._release_all()
+            return
+
+        cell_w, cell_h = self._cell
+        width = max(self.canvas.winfo_width(), 1)
+        height = max(self.canvas.winfo_height(), 1)
+        top = self._header_height()
+        y0 = self.canvas.canvasy(0)
+        first_row = max(0, int((y0 - top) // cell_h) - self.overscan)
+        last_row = int((y0 + height - top) // cell_h) + self.overscan
+        first = first_row * self._columns
+        last = min(len(self.items), (last_row + 1) * self._columns)
+        self.first_visible = first
+
+        for index in [i for i in self._bound if i < first or i >= last]:
+            self._release(self._bound.pop(index), self.items[index])
+
+        x_offset = (width - self._columns * cell_w) // 2
+        for index in range(first, last):
+            card = self._bound.get(index)
+            if card is None:
+                card = self._bound[index] = self._acquire(self.items[index], index)
+            row, col = divmod(index, self._columns)
+            window = self._windows[card]
+            self.canvas.coords(window, x_offset + col * cell_w + self.padding, top + row * cell_h + self.padding)
+            self.canvas.itemconfigure(window, state="normal")
+
+        if (last >= len(self.items) - self._columns and self.on_need_more
+                and not self._more_requested and not self.exhausted):
+            self._more_requested = True
+            self.on_need_more()
+
+    # --- Scrolling ---
+
+    def _on_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if not self._render_pending:
+            self._render_pending = True
+            self.after_idle(self._render_idle)
+
+    def _render_idle(self):
+        self._render_pending = False
+        self._render()
+
+    def _on_mousewheel(self, event):
+        widget = self.winfo_containing(event.x_root, event.y_root)
+        while widget is not None and widget is not self:
+            # Horizontal strips inside the header scroll themselves
+            if isinstance(widget, ctk.CTkScrollableFrame):
+                return
+            widget = getattr(widget, "master", None)
+        if widget is None or not self.winfo_ismapped():
+            return
+        if event.num == 4:
+            delta = -1
+        elif event.num == 5:
+            delta = 1
+        else:
+            delta = -1 if event.delta > 0 else 1
+        self.canvas.yview_scroll(delta, "units")